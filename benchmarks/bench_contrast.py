@@ -0,0 +1,109 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Benchmark of the contrast audits of contrast.py: builds a palette of random colors in every
+input format, then times the whole contrast matrix, the AA/AAA pass counts and the pairs above
+and below a ratio, against checking every pair one convert() call at a time (timed on a sample
+of the pairs and extrapolated) and against scanning the matrix, whose results must match.
+
+Usage (from the repository root):
+    python benchmarks/bench_contrast.py [--colors 3000] [--sample 20000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from contrast import LEVELS, ContrastPalette, relative_luminance  # noqa: E402
+from corpus import generate_inputs  # noqa: E402
+from service import conversion_cache, convert  # noqa: E402
+
+
+def _pair_by_convert(first: str, second: str) -> float:
+    """
+    The contrast ratio of two inputs, converted and measured from scratch
+    """
+    first_luminance = relative_luminance(convert(first).packed_hex) + 0.05
+    second_luminance = relative_luminance(convert(second).packed_hex) + 0.05
+    return max(first_luminance, second_luminance) / min(first_luminance, second_luminance)
+
+
+def _count_from_matrix(matrix: list) -> dict:
+    """
+    :return: The number of pairs passing each level, counted over the upper half of the matrix
+    """
+    counts = {level: 0 for level in LEVELS}
+    for index, row in enumerate(matrix):
+        upper = row[index + 1:]
+        for level, minimum in LEVELS.items():
+            counts[level] += sum(ratio >= minimum for ratio in upper)
+    return counts
+
+
+def _timed(function, *args):
+    gc.collect()
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark of the contrast audits')
+    parser.add_argument('--colors', type=int, default=3000, help='colors of the palette')
+    parser.add_argument('--sample', type=int, default=20000,
+                        help='pairs checked one convert() call at a time')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Only valid inputs: the palette is read as a whole
+    inputs = list(generate_inputs(args.colors, seed=args.seed, invalid_ratio=0))
+    count = len(inputs)
+    total = count * (count - 1) // 2
+
+    palette, elapsed = _timed(ContrastPalette, inputs)
+    print(f'{count} colors, {total} pairs: palette read in {elapsed:.2f} s')
+
+    rng = random.Random(args.seed)
+    sample = [(rng.randrange(count), rng.randrange(count)) for _ in range(args.sample)]
+    conversion_cache.clear()
+    ratios, elapsed = _timed(lambda: [_pair_by_convert(inputs[first], inputs[second])
+                                      for first, second in sample])
+    by_convert = elapsed / len(sample) * total
+    wrong = sum(ratio != palette.ratio(first, second)
+                for ratio, (first, second) in zip(ratios, sample))
+    print(f'Every pair by convert():   {by_convert:8.2f} s (extrapolated), '
+          f'{wrong} different ratios')
+
+    matrix, elapsed = _timed(palette.matrix)
+    print(f'Contrast matrix:           {elapsed:8.2f} s  '
+          f'({count * count / elapsed:.0f} ratios/s, {count * count * 8 / 2 ** 20:.0f} MiB)')
+
+    expected, scan_time = _timed(_count_from_matrix, matrix)
+    report, elapsed = _timed(palette.report)
+    print(f'AA/AAA pass counts:        {elapsed:8.2f} s  (scanning the matrix: {scan_time:.2f} s)')
+    for level, passing in report.items():
+        print(f'  {level:<10} {passing:>10} passing pairs ({passing / total:.1%})')
+    failed = wrong > 0
+    if report != expected:
+        print(f'The pass counts differ from the matrix: {expected}', file=sys.stderr)
+        failed = True
+
+    for minimum, maximum in ((7.0, None), (None, 1.05)):
+        pairs, elapsed = _timed(lambda: list(palette.pairs(minimum, maximum)))
+        expected = sum(1 for index, row in enumerate(matrix) for ratio in row[index + 1:]
+                       if (minimum is None or ratio >= minimum)
+                       and (maximum is None or ratio < maximum))
+        print(f'Pairs in [{minimum or 1}, {maximum or 21}): {len(pairs):>10} in {elapsed:.2f} s'
+              f'{"" if len(pairs) == expected else f", expected {expected}!"}')
+        failed |= len(pairs) != expected
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Benchmark of the two conversion engines of service.py: the exact integer engine (rgbhsl.py)
+against the float conversions of colour.Color, on every input format. The conversion cache and
+the precomputed conversion table are disabled, so only the conversions themselves are timed.
+
+Usage (from the repository root):
+    python benchmarks/bench_engines.py [--rows N] [--seed SEED]
+"""
+import argparse
+import sys
+
+# Also puts src/ on the path
+from bench_service import CORPORA, _convert, run_case
+
+import service  # noqa: E402
+
+FORMATS = ('literal', 'hex with #', 'hex without #', 'rgb', 'hsl (percent)', 'hsl (fraction)')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark of the conversion engines')
+    parser.add_argument('--rows', type=int, default=100000, help='conversions per case')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the corpora')
+    args = parser.parse_args()
+
+    service.conversion_cache.resize(0)
+    service.load_conversion_table(None)
+
+    print(f'{"case":<28}' + ''.join(f'{engine + " calls/s":>20}' for engine in service.ENGINES)
+          + f'{"speedup":>10}')
+    for color_format in FORMATS:
+        throughputs = []
+        for engine in service.ENGINES:
+            service.set_engine(engine)
+            result = run_case(_convert, CORPORA[color_format], args.rows, args.seed)
+            throughputs.append(result['ops_per_sec'])
+        print(f'{"convert " + color_format:<28}' +
+              ''.join(f'{throughput:>20.0f}' for throughput in throughputs) +
+              f'{throughputs[0] / throughputs[1]:>9.1f}x')
+    service.set_engine('exact')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Benchmark of the gradients of gradient.py: streams a long ramp through several stops in every
+interpolation space and output format to a null sink, measuring the throughput (and the peak of
+memory allocated, in a separate run). Then builds the same ramp one step at a time through the
+registry of colorspaces.py (one tuple, one conversion and one ConvertedColor per step, kept in a
+list) and counts the steps that differ.
+
+Usage (from the repository root):
+    python benchmarks/bench_gradient.py [--steps 1000000] [--stops red '#00F' white]
+"""
+import argparse
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from colorspaces import get_transform  # noqa: E402
+from gradient import FORMATS, INTERPOLATION_SPACES, _hsl_segment, _stop_values, gradient, \
+    write_gradient  # noqa: E402
+from service import convert_rgb  # noqa: E402
+
+
+class _NullSink(io.RawIOBase):
+    """
+    Counts what is written to it, like a text or binary file
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        return len(data)
+
+
+def _step_by_step(stops: list, steps: int, space: str) -> list:
+    """
+    Builds the ramp one step at a time
+    :return: The ConvertedColor of every step
+    """
+    values = [_stop_values(stop, space) for stop in stops]
+    segments = list(zip(values, values[1:]))
+    if space == 'hsl':
+        segments = [_hsl_segment(first, last) for first, last in segments]
+    to_rgb = get_transform(space, 'rgb')
+    results = []
+    for index in range(steps):
+        segment = min(index * len(segments) // (steps - 1), len(segments) - 1)
+        position = (index * len(segments) - segment * (steps - 1)) / (steps - 1)
+        first, last = segments[segment]
+        color = to_rgb(tuple(a + (b - a) * position for a, b in zip(first, last)))
+        r_value, g_value, b_value = (int(min(max(val, 0.0), 255.0) + 0.5) for val in color)
+        results.append(convert_rgb(r_value, g_value, b_value))
+    return results
+
+
+def _peak_memory(function, *args) -> int:
+    """
+    :return: The peak of memory allocated by the function (in bytes). Tracing the allocations
+             slows it down a lot, so it is never timed at the same time
+    """
+    gc.collect()
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark of the gradients')
+    parser.add_argument('--steps', type=int, default=1000000, help='colors of the ramp')
+    parser.add_argument('--stops', nargs='+', default=['red', '#00F', 'hsl(60, 100%, 90%)'])
+    args = parser.parse_args()
+
+    failed = False
+    for space in INTERPOLATION_SPACES:
+        for output_format in FORMATS:
+            sink = _NullSink()
+            gc.collect()
+            start = time.perf_counter()
+            write_gradient(sink, args.stops, args.steps, space, output_format)
+            elapsed = time.perf_counter() - start
+            print(f'{space:<6} {output_format:<12} {args.steps / elapsed:>10.0f} steps/s  '
+                  f'({sink.size / 2 ** 20:.1f} MiB written)')
+        peak = _peak_memory(write_gradient, _NullSink(), args.stops, args.steps, space, 'hsl')
+        print(f'{space:<6} peak memory of the hsl rows: {peak / 2 ** 20:.1f} MiB')
+
+        gc.collect()
+        start = time.perf_counter()
+        expected = _step_by_step(args.stops, args.steps, space)
+        elapsed = time.perf_counter() - start
+        mismatches = sum(color.packed_rgb != packed for color, packed
+                         in zip(expected, gradient(args.stops, args.steps, space)))
+        print(f'{space:<6} {"step by step":<12} {args.steps / elapsed:>10.0f} steps/s  '
+              f'({mismatches} different steps)')
+        failed |= mismatches > 0
+        del expected
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Keystroke-to-display latency of the GUI: types colors into the input textbox, one key at a
+time, and measures how long it takes from the last keystroke until the conversion is shown.
+Also checks that fast typing only triggers one conversion. Needs a display (or Xvfb).
+Exits with status 1 if the 95th percentile latency exceeds the budget. tests/test_gui_latency.py
+checks the same path, one burst of edits at a time.
+
+Usage (from the repository root): python benchmarks/bench_gui_latency.py [--budget MS]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from gui import GUI  # noqa: E402
+from globals import INPUT_DEBOUNCE_MS  # noqa: E402
+from service import convert  # noqa: E402
+
+SAMPLES = ('Light Goldenrod Yellow', '#8FBC8F', '8fbc8f', '143, 188, 143', '120, 25%, 65%',
+           '120, 0.25, 0.65', 'rgb(12, 34, 56)', 'hsl(200 40% 30%)', 'tomato', '#abc')
+
+
+def _wait_for(root: tk.Tk, condition, timeout: float = 2.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        root.update()
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Keystroke-to-display latency of the GUI')
+    parser.add_argument('--debounce', type=int, default=INPUT_DEBOUNCE_MS,
+                        help='debounce delay of the GUI, in milliseconds')
+    parser.add_argument('--budget', type=float, default=INPUT_DEBOUNCE_MS + 50,
+                        help='maximum 95th percentile latency, in milliseconds')
+    parser.add_argument('--rounds', type=int, default=5, help='times each sample is typed')
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    gui = GUI(root, lambda string: string, debounce_ms=args.debounce)
+    conversions = 0
+    convert_input = gui.convert_input
+
+    def counting_convert_input():
+        nonlocal conversions
+        conversions += 1
+        convert_input()
+
+    gui.convert_input = counting_convert_input
+    root.update()
+
+    latencies = []
+    redundant = 0
+    for _ in range(args.rounds):
+        for sample in SAMPLES:
+            gui.input_textbox.delete(0, 'end')
+            _wait_for(root, lambda: gui.hex_value.get() == '...')
+            conversions = 0
+            expected = convert(sample).hex
+
+            for key in sample:
+                gui.input_textbox.insert('end', key)
+            start = time.perf_counter()
+            if not _wait_for(root, lambda: gui.hex_value.get() == expected):
+                print(f'Timed out waiting for {sample!r} to be displayed', file=sys.stderr)
+                return 1
+            latencies.append((time.perf_counter() - start) * 1000)
+            redundant += conversions - 1
+    root.destroy()
+
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(f'debounce {args.debounce} ms, {len(latencies)} samples: mean '
+          f'{statistics.mean(latencies):.1f} ms, p95 {p95:.1f} ms, max {max(latencies):.1f} ms, '
+          f'{redundant} redundant conversions')
+    if p95 > args.budget:
+        print(f'p95 latency over the budget of {args.budget} ms!', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Responsiveness of the GUI during a background job: converts a generated file of colors through
+the worker pool of the GUI (File>Convert file...) while a 60 FPS after() ticker stands in for
+the frames, then measures the gaps between the frames, the progress reports received and how
+long a cancellation takes to stop the job. Needs a display (or Xvfb).
+Exits with status 1 if the 95th percentile frame gap exceeds the budget.
+
+Usage (from the repository root): python benchmarks/bench_gui_workers.py [--lines N] [--budget MS]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import gui  # noqa: E402
+from corpus import generate_inputs  # noqa: E402
+
+FRAME_MS = 16
+
+
+def _run_job(root: tk.Tk, gui_object, source: str, destination: str, cancel_after_ms=None):
+    """
+    Converts a file through the worker pool of the GUI, ticking frames until it is finished
+    :return: The frame gaps (in milliseconds), the number of progress reports, the outcome of
+             the job and the milliseconds between cancel() and the on_cancelled callback
+    """
+    frames, reports, outcome = [], [], []
+    cancelled_at = []
+    finished = tk.BooleanVar(root, value=False)
+
+    def finish(value):
+        outcome.append(value)
+        finished.set(True)
+
+    def tick():
+        frames.append(time.perf_counter())
+        if not outcome:
+            root.after(FRAME_MS, tick)
+
+    task = gui_object.workers.submit(
+            gui._convert_color_file, source, destination,
+            on_progress=lambda done, total: reports.append(done),
+            on_done=finish, on_cancelled=lambda: finish(time.perf_counter()))
+    if cancel_after_ms is not None:
+        root.after(cancel_after_ms, lambda: (cancelled_at.append(time.perf_counter()),
+                                             task.cancel()))
+    root.after(FRAME_MS, tick)
+    # Runs the event loop like mainloop() does, until the job is finished
+    root.wait_variable(finished)
+    gaps = [(b - a) * 1000 for a, b in zip(frames, frames[1:])]
+    # None if the job completed before it could be cancelled
+    stop = (outcome[0] - cancelled_at[0]) * 1000 if isinstance(outcome[0], float) else None
+    return gaps, len(reports), outcome[0], stop
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Responsiveness of the GUI during a '
+                                                 'background job')
+    parser.add_argument('--lines', type=int, default=500000, help='colors in the converted file')
+    parser.add_argument('--budget', type=float, default=3 * FRAME_MS,
+                        help='maximum 95th percentile gap between two frames, in milliseconds')
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print('No display, skipping.')
+        return 0
+    gui_object = gui.GUI(root, lambda string: string)
+    root.update()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'colors.txt')
+        destination = os.path.join(directory, 'colors.csv')
+        with open(source, 'w', encoding='utf-8') as file:
+            for line in generate_inputs(args.lines, seed=random.randrange(1 << 32)):
+                file.write(line + '\n')
+
+        start = time.perf_counter()
+        gaps, reports, result, _ = _run_job(root, gui_object, source, destination)
+        elapsed = time.perf_counter() - start
+        p95 = statistics.quantiles(gaps, n=20)[-1]
+        print(f'Converted {result[0]} lines ({result[1]} invalid) in {elapsed:.2f} s, '
+              f'{reports} progress reports')
+        print(f'Frame gaps: median {statistics.median(gaps):.1f} ms, p95 {p95:.1f} ms, '
+              f'max {max(gaps):.1f} ms (budget {args.budget:.0f} ms)')
+
+        _, _, _, stop = _run_job(root, gui_object, source, destination, cancel_after_ms=200)
+        if stop is not None:
+            print(f'Cancelled in {stop:.1f} ms, output removed: '
+                  f'{not os.path.exists(destination)}')
+
+    gui_object.workers.shutdown()
+    root.destroy()
+    return 1 if p95 > args.budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Microbenchmark of the input classifier, per detected format. Compares the single-pass
+service._identify_and_create_object against the previous regex cascade (kept below as
+_legacy_identify_and_create_object, without its print calls, so only the classification is
+timed). The formats that are not faster are listed after the table.
+
+Usage (from the repository root): python benchmarks/bench_identify.py [--number N]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from colour import Color  # noqa: E402
+
+from exceptions import InvalidColorError  # noqa: E402
+from service import COLOR_NAMES, _identify_and_create_object, _transform_percentage  # noqa: E402
+
+# Speedups below this are reported as no improvement: they are within the noise of the timings
+NO_GAIN = 1.05
+
+SAMPLES = {'literal': 'Light Goldenrod Yellow',
+           'hex with #': '#8FBC8F',
+           'hex without #': '8fbc8f',
+           'rgb': '143, 188, 143',
+           'hsl (percent)': '120, 25%, 65%',
+           'hsl (fraction)': '120, 0.25, 0.65',
+           'invalid': 'not a color'}
+
+
+def _legacy_identify_and_create_object(user_input: str) -> (str, Color):
+    """
+    The regex cascade used before the single-pass classifier, kept for comparison. Its print
+    calls are removed, so they are not timed
+    """
+    result = Color()
+
+    tmp = re.sub(r"[^a-zA-Z]+", "", user_input.lower())
+    if tmp in COLOR_NAMES:
+        result = Color(tmp)
+        return 'literal', result
+
+    hex_without_pound_sign_pattern = re.compile(r'[A-Fa-f0-9]{6}')
+    if hex_without_pound_sign_pattern.match(user_input) and len(user_input) == 6:
+        result.set_hex_l('#' + user_input.lower())
+        return 'hex', result
+
+    hex_with_pound_sign_pattern = re.compile(r'#[A-Fa-f0-9]{6}')
+    if hex_with_pound_sign_pattern.match(user_input) and len(user_input) == 7:
+        result.set_hex_l(user_input.lower())
+        return 'hex', result
+
+    rgb_pattern = re.compile(r'(?:[0-9]{1,3}[, ]{1,2}){2}[0-9]{1,3}')
+    if rgb_pattern.match(user_input):
+        user_input = user_input.replace(', ', '*').replace(',', '*').replace(' ', '*')
+        r_value, g_value, b_value = [int(val) for val in user_input.split('*')]
+
+        if not 0 <= r_value <= 255 or not 0 <= g_value <= 255 or not 0 <= b_value <= 255:
+            raise InvalidColorError(
+                    'This looks like an RGB color but the values are not in the 0-255 range!')
+        result.set_rgb((r_value / 255, g_value / 255, b_value / 255))
+        return 'rgb', result
+
+    hsl_pattern = re.compile(r'[0-9]{1,3}(?:[, ]{1,2}(?:[01]\.[0-9]{1,2}|[0-9]{1,3}%)){2}')
+    if hsl_pattern.match(user_input):
+        user_input = user_input.replace(', ', '*').replace(',', '*').replace(' ', '*')
+        h_value, s_value, l_value = user_input.split('*')
+        h_value = int(h_value)
+        if not 0 <= h_value <= 360:
+            raise InvalidColorError(
+                    'This looks like a HSL color but the Hue value is not in the 0-360 range!')
+
+        try:
+            s_value = _transform_percentage(s_value)
+            l_value = _transform_percentage(l_value)
+        except ValueError:
+            raise InvalidColorError('This looks like a HSL color but the Saturation or Lightness '
+                                    'are not valid percentages or in the 0.0-1.0 range!')
+
+        if not 0 <= s_value <= 1 or not 0 <= l_value <= 1:
+            raise InvalidColorError(
+                    'This looks like a HSL color but the Saturation or Lightness values are not '
+                    'percentages or in the 0-1 range!')
+        result.set_hsl((h_value / 360, s_value, l_value))
+        return 'hsl', result
+
+    raise InvalidColorError("The input doesn't fit any of the known color patterns!")
+
+
+def _latency(function, user_input: str, number: int) -> float:
+    """
+    Measures the mean latency of a classifier on one input
+    :param function: The classifier to measure
+    :param user_input: The input string
+    :param number: How many calls to time
+    :return: The mean latency, in microseconds
+    """
+    def call():
+        try:
+            function(user_input)
+        except InvalidColorError:
+            pass
+
+    return min(timeit.repeat(call, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Per-format latency of the input classifier')
+    parser.add_argument('--number', type=int, default=20000, help='calls per measurement')
+    args = parser.parse_args()
+
+    print(f'{"format":<16}{"before (us)":>14}{"after (us)":>14}{"speedup":>10}')
+    no_gain = []
+    for color_format, user_input in SAMPLES.items():
+        before = _latency(_legacy_identify_and_create_object, user_input, args.number)
+        after = _latency(_identify_and_create_object, user_input, args.number)
+        print(f'{color_format:<16}{before:>14.2f}{after:>14.2f}{before / after:>9.2f}x')
+        if before / after < NO_GAIN:
+            no_gain.append(f'{color_format} ({before / after:.2f}x)')
+    if no_gain:
+        print(f'No improvement for: {", ".join(no_gain)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Benchmark of the nearest color search of matching.Palette: builds a palette of random colors,
+times batches of random queries under every distance, compares a sample of them against a
+brute-force search (speed, and agreement for CIEDE2000, whose search is approximate) and
+times incremental additions and removals.
+
+Usage (from the repository root):
+    python benchmarks/bench_palette.py [--entries 10000] [--queries 1000000] [--k 1]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from colorspaces import delta_e_2000, rgb_to_lab  # noqa: E402
+from matching import DISTANCES, Palette  # noqa: E402
+
+# Queries checked against the brute-force search
+SAMPLE = 200
+
+
+def _unpack(packed: int) -> (int, int, int):
+    return packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF
+
+
+def _brute_force(points: list, labs: list, packed: int, distance: str) -> float:
+    """
+    :return: The distance of the closest palette entry, checking every entry
+    """
+    rgb = _unpack(packed)
+    if distance == 'rgb':
+        return min(math.dist(rgb, point) for point in points)
+    lab = rgb_to_lab(*rgb)
+    if distance == 'cie76':
+        return min(math.dist(lab, point) for point in labs)
+    return min(delta_e_2000(lab, point) for point in labs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark of the palette nearest color search')
+    parser.add_argument('--entries', type=int, default=10000, help='entries of the palette')
+    parser.add_argument('--queries', type=int, default=1000000, help='queries per distance')
+    parser.add_argument('--k', type=int, default=1, help='entries found per query')
+    parser.add_argument('--distances', nargs='*', default=DISTANCES, choices=DISTANCES)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    entries = [rng.getrandbits(24) for _ in range(args.entries)]
+    start = time.perf_counter()
+    palette = Palette(entries)
+    print(f'Palette of {args.entries} entries built in {time.perf_counter() - start:.2f} s')
+
+    points = [_unpack(packed) for packed in entries]
+    labs = [rgb_to_lab(*point) for point in points]
+    for distance in args.distances:
+        start = time.perf_counter()
+        palette.nearest(0, args.k, distance)
+        built = time.perf_counter() - start
+
+        queries = [rng.getrandbits(24) for _ in range(args.queries)]
+        start = time.perf_counter()
+        palette.nearest_many(queries, args.k, distance)
+        elapsed = time.perf_counter() - start
+
+        sample = queries[:SAMPLE]
+        start = time.perf_counter()
+        expected = [_brute_force(points, labs, packed, distance) for packed in sample]
+        brute_force = (time.perf_counter() - start) / len(sample)
+        found = [matches[0].distance for matches in palette.nearest_many(sample, 1, distance)]
+        agreement = sum(abs(a - b) < 1e-9 for a, b in zip(found, expected)) / len(sample)
+
+        print(f'{distance:<10} {args.queries / elapsed:>10.0f} queries/s '
+              f'({elapsed / args.queries * 1e6:.1f} us, brute force {brute_force * 1e6:.0f} us), '
+              f'index built in {built:.2f} s, {agreement:.1%} agree with brute force')
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        palette.remove(palette.add(rng.getrandbits(24)))
+    print(f'add + remove: {(time.perf_counter() - start) / 1000 * 1e6:.0f} us')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
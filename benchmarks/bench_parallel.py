@@ -0,0 +1,50 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Scaling benchmark of the parallel bulk conversion (cli.convert_chunks) on 1, 2, 4 and 8 workers.
+The speedup is bounded by the number of cores of the machine running it.
+
+Usage (from the repository root): python benchmarks/bench_parallel.py [--rows N] [--chunk-size N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cli import convert_chunks, read_chunks  # noqa: E402
+from service import conversion_cache, random_color  # noqa: E402
+
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Scaling of the parallel bulk conversion')
+    parser.add_argument('--rows', type=int, default=200000, help='colors to convert')
+    parser.add_argument('--chunk-size', type=int, default=4096, help='lines per chunk')
+    args = parser.parse_args()
+
+    random.seed(0)
+    # Distinct inputs, so the conversion cache doesn't hide the conversion work
+    lines = [f'{random_color()}\n' for _ in range(args.rows)]
+
+    print(f'{os.cpu_count()} CPUs, {args.rows} rows, chunks of {args.chunk_size}')
+    print(f'{"workers":<10}{"seconds":>10}{"rows/s":>12}{"speedup":>10}')
+    single = None
+    for workers in WORKER_COUNTS:
+        # Forked workers would otherwise inherit the results of the previous run
+        conversion_cache.clear()
+        start = time.perf_counter()
+        for _ in convert_chunks(read_chunks(lines, args.chunk_size), workers):
+            pass
+        elapsed = time.perf_counter() - start
+        single = single or elapsed
+        print(f'{workers:<10}{elapsed:>10.2f}{args.rows / elapsed:>12.0f}{single / elapsed:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
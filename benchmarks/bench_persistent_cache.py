@@ -0,0 +1,130 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Benchmark of the persistent conversion cache (service.enable_persistent_cache): converts a batch
+of recurring inputs (a smaller set of distinct colors, drawn over and over like the brand and
+design token colors of real jobs) without it, then with an empty and with a filled cache file.
+Every run is a fresh process, like a new run of the CLI, and counts its queries to the file.
+Then several processes convert overlapping batches through the same file at the same time, and
+every result is checked against a conversion without any cache.
+
+Usage (from the repository root):
+    python benchmarks/bench_persistent_cache.py [--inputs 1000000] [--distinct 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import service  # noqa: E402
+from corpus import generate_inputs  # noqa: E402
+
+
+def _inputs(count: int, distinct: int, seed: int) -> list:
+    colors = list(generate_inputs(distinct, seed=seed))
+    rng = random.Random(seed)
+    return [rng.choice(colors) for _ in range(count)]
+
+
+class _CountingConnection:
+    """
+    Counts the execute() and executemany() calls (the round trips) made on a connection
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.queries = 0
+
+    def execute(self, *args):
+        self.queries += 1
+        return self.connection.execute(*args)
+
+    def executemany(self, *args):
+        self.queries += 1
+        return self.connection.executemany(*args)
+
+    def close(self):
+        self.connection.close()
+
+
+def _run(inputs: list, path) -> (float, int, list):
+    """
+    Converts a batch in this (fresh) process
+    :param path: The path of the persistent cache, or None to convert without it
+    :return: The time taken, the number of queries to the file and the hex of every input
+    """
+    connection = None
+    if path is not None:
+        cache = service.enable_persistent_cache(path)
+        cache._connection = connection = _CountingConnection(cache._connection)
+    start = time.perf_counter()
+    columns = service.convert_many(inputs)
+    elapsed = time.perf_counter() - start
+    service.disable_persistent_cache()
+    return elapsed, connection.queries if connection else 0, list(columns.hex)
+
+
+def _convert_lines(inputs: list, path: str) -> list:
+    """
+    Converts the inputs one at a time, prefetching and writing them in chunks like cli.py
+    """
+    service.enable_persistent_cache(path)
+    results = []
+    for start in range(0, len(inputs), 4096):
+        chunk = inputs[start:start + 4096]
+        service.prefetch(chunk)
+        results.extend(service.convert(user_input).hex for user_input in chunk)
+        service.flush_persistent_cache()
+    service.disable_persistent_cache()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark of the persistent conversion cache')
+    parser.add_argument('--inputs', type=int, default=1000000, help='inputs converted per run')
+    parser.add_argument('--distinct', type=int, default=50000, help='distinct inputs among them')
+    parser.add_argument('--processes', type=int, default=4,
+                        help='processes sharing the cache file at the same time')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    inputs = _inputs(args.inputs, args.distinct, args.seed)
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache.sqlite')
+        expected = None
+        for title, cache_path in (('no persistent cache', None), ('empty cache file', path),
+                                  ('filled cache file', path)):
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                elapsed, queries, hexes = executor.submit(_run, inputs, cache_path).result()
+            expected = expected or hexes
+            print(f'{title:<20} {elapsed:7.2f} s  {args.inputs / elapsed:>10.0f} inputs/s  '
+                  f'{queries:>5} queries')
+            if hexes != expected:
+                print(f'The results with an {title} differ!', file=sys.stderr)
+                failed = True
+
+        os.remove(path)
+        rng = random.Random(args.seed + 1)
+        batches = [rng.sample(inputs, min(len(inputs), 200000)) for _ in range(args.processes)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.processes) as executor:
+            results = list(executor.map(_convert_lines, batches, [path] * args.processes))
+        elapsed = time.perf_counter() - start
+        direct = dict(zip(inputs, expected))
+        wrong = sum(hex_value != direct[user_input] for batch, hexes in zip(batches, results)
+                    for user_input, hex_value in zip(batch, hexes))
+        print(f'{args.processes} concurrent processes: {elapsed:.2f} s, {wrong} wrong results')
+        failed |= wrong > 0
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
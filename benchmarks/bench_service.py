@@ -0,0 +1,189 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Benchmark suite for service.py: throughput and latency percentiles of convert() on every input
+format (and on invalid input), of random_color() and of complementary_color(), on a small and/or
+a million-row corpus. The results are written as JSON and can be compared against a stored
+baseline, failing (exit status 1) when a case got slower than the allowed threshold.
+
+By default the conversion cache and the precomputed conversion table are disabled, so the
+computed conversion path is measured. Use --cache and --table to include them.
+
+Usage (from the repository root):
+    python benchmarks/bench_service.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_service.py --baseline benchmarks/baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import service  # noqa: E402
+from exceptions import InvalidColorError  # noqa: E402
+
+SIZES = {'small': 1000, 'large': 1000000}
+
+INVALID_INPUTS = ('not a color', '#12345g', '300, 300, 300', '120, 150%, 20%', '#1234567',
+                  'rgb(1, 2)', '12345', 'hsl(400, 10%, 10%)')
+
+
+def _random_rgb(rng: random.Random) -> (int, int, int):
+    return rng.randrange(256), rng.randrange(256), rng.randrange(256)
+
+
+# Each corpus generator returns the arguments of one call
+CORPORA = {
+    'literal': lambda rng: service.format_name(rng.choice(service.COLOR_NAMES)),
+    'hex with #': lambda rng: '#%02X%02X%02X' % _random_rgb(rng),
+    'hex without #': lambda rng: '%02x%02x%02x' % _random_rgb(rng),
+    'rgb': lambda rng: '%d, %d, %d' % _random_rgb(rng),
+    'hsl (percent)': lambda rng: f'{rng.randrange(361)}, {rng.randrange(101)}%, '
+                                 f'{rng.randrange(101)}%',
+    'hsl (fraction)': lambda rng: f'{rng.randrange(361)}, {rng.randrange(101) / 100}, '
+                                  f'{rng.randrange(101) / 100}',
+    'invalid': lambda rng: rng.choice(INVALID_INPUTS),
+    'complementary': lambda rng: f'{rng.randrange(360)}, {rng.randrange(101)}%, '
+                                 f'{rng.randrange(101)}%',
+}
+
+
+def _convert(user_input: str) -> None:
+    try:
+        service.convert(user_input)
+    except InvalidColorError:
+        pass
+
+
+def _cases() -> dict:
+    """
+    :return: A dict of case name -> (function, corpus generator or None for no argument)
+    """
+    cases = {f'convert {color_format}': (_convert, CORPORA[color_format])
+             for color_format in ('literal', 'hex with #', 'hex without #', 'rgb', 'hsl (percent)',
+                                  'hsl (fraction)', 'invalid')}
+    cases['random_color'] = (service.random_color, None)
+    cases['complementary_color'] = (service.complementary_color, CORPORA['complementary'])
+    return cases
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_case(function, corpus, rows: int, seed: int) -> dict:
+    """
+    Times one call per row of the corpus
+    :return: The throughput (calls per second) and the latency percentiles (in microseconds)
+    """
+    rng = random.Random(seed)
+    inputs = [corpus(rng) for _ in range(rows)] if corpus is not None else None
+    random.seed(seed)
+
+    clock = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+    start = clock()
+    if inputs is None:
+        for _ in range(rows):
+            call_start = clock()
+            function()
+            append(clock() - call_start)
+    else:
+        for argument in inputs:
+            call_start = clock()
+            function(argument)
+            append(clock() - call_start)
+    elapsed = (clock() - start) / 1e9
+
+    latencies.sort()
+    return {'rows': rows,
+            'ops_per_sec': rows / elapsed,
+            'p50_us': _percentile(latencies, 0.50) / 1000,
+            'p95_us': _percentile(latencies, 0.95) / 1000,
+            'p99_us': _percentile(latencies, 0.99) / 1000}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compares results against a baseline
+    :param threshold: The allowed relative throughput loss (0.1 meaning 10% slower)
+    :return: A list of messages describing every regression
+    """
+    regressions = []
+    for case, result in results['results'].items():
+        previous = baseline['results'].get(case)
+        if previous is None:
+            continue
+        change = result['ops_per_sec'] / previous['ops_per_sec'] - 1
+        if change < -threshold:
+            regressions.append(f'{case}: {previous["ops_per_sec"]:.0f} -> '
+                               f'{result["ops_per_sec"]:.0f} calls/s ({change:+.1%})')
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark suite for service.py')
+    parser.add_argument('--size', choices=('small', 'large', 'both'), default='small',
+                        help=f'corpus size: small ({SIZES["small"]} rows), '
+                             f'large ({SIZES["large"]} rows) or both')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the corpora')
+    parser.add_argument('--cases', nargs='*', default=None,
+                        help='only run the cases whose name contains one of these words')
+    parser.add_argument('--cache', action='store_true', help='keep the conversion cache enabled')
+    parser.add_argument('--table', action='store_true',
+                        help='use the precomputed conversion table, if there is one')
+    parser.add_argument('-o', '--output', default=None, help='write the results (JSON) here')
+    parser.add_argument('--save-baseline', default=None, help='store the results as a baseline')
+    parser.add_argument('--baseline', default=None, help='compare against this baseline')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed throughput loss against the baseline (default: 0.10)')
+    args = parser.parse_args()
+
+    if not args.cache:
+        service.conversion_cache.resize(0)
+    if not args.table:
+        service.load_conversion_table(None)
+
+    sizes = ('small', 'large') if args.size == 'both' else (args.size,)
+    results = {'meta': {'python': platform.python_version(), 'machine': platform.machine(),
+                        'platform': platform.platform(), 'cache': args.cache,
+                        'table': args.table, 'seed': args.seed},
+               'results': {}}
+
+    print(f'{"case":<36}{"calls/s":>12}{"p50 us":>10}{"p95 us":>10}{"p99 us":>10}')
+    for size in sizes:
+        for case, (function, corpus) in _cases().items():
+            if args.cases and not any(word in case for word in args.cases):
+                continue
+            name = f'{case} [{size}]'
+            result = run_case(function, corpus, SIZES[size], args.seed)
+            results['results'][name] = result
+            print(f'{name:<36}{result["ops_per_sec"]:>12.0f}{result["p50_us"]:>10.1f}'
+                  f'{result["p95_us"]:>10.1f}{result["p99_us"]:>10.1f}')
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as file:
+                json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+        print(f'No regression past {args.threshold:.0%} against {args.baseline}.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Benchmark of the color space transforms of colorspaces.py: converts a batch of random RGB
+colors to several spaces at once with the planned (fused and cached) transform, and the same
+conversions hop by hop, one list of intermediate colors per registered conversion along every
+path. Then times single conversions with the cached plan against planning every conversion,
+and checks that every space converts back to RGB within a tiny error.
+
+Usage (from the repository root):
+    python benchmarks/bench_spaces.py [--colors 1000000] [--targets oklch lab cmyk]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import colorspaces  # noqa: E402
+from colorspaces import SPACES, Linear, convert_colors, find_path, get_transform  # noqa: E402
+
+# Largest difference (in 0-255 units) allowed after a round trip through a space
+ROUND_TRIP_TOLERANCE = 1e-6
+
+
+def _hop(colors: list, source: str, target: str) -> list:
+    """
+    Applies one registered conversion to a whole list, one step at a time
+    """
+    for step in colorspaces._CONVERSIONS[source][target]:
+        function = colorspaces._linear_function(step.matrix) if isinstance(step, Linear) \
+            else step
+        colors = [function(color) for color in colors]
+    return colors
+
+
+def _hop_by_hop(colors: list, source: str, targets: tuple) -> list:
+    """
+    :return: The list of the converted colors of every target space
+    """
+    results = []
+    for target in targets:
+        path = find_path(source, target)
+        converted = colors
+        for space, following in zip(path, path[1:]):
+            converted = _hop(converted, space, following)
+        results.append(converted)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark of the color space transforms')
+    parser.add_argument('--colors', type=int, default=1000000, help='colors converted')
+    parser.add_argument('--source', default='rgb', choices=sorted(SPACES),
+                        help='space converted from (the random colors are converted to it first)')
+    parser.add_argument('--targets', nargs='+', default=['oklch', 'lab', 'cmyk', 'hwb'],
+                        choices=sorted(SPACES), help='spaces converted to')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    colors = [(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+              for _ in range(args.colors)]
+    targets = tuple(args.targets)
+    source = args.source
+    if source != 'rgb':
+        colors = convert_colors(colors, 'rgb', source)
+
+    # The batch of colors was just allocated: collecting it now keeps the garbage collector
+    # from scanning it during the first measurement only
+    gc.collect()
+    start = time.perf_counter()
+    fused = convert_colors(colors, source, targets)
+    fused_time = time.perf_counter() - start
+    gc.collect()
+    start = time.perf_counter()
+    hops = _hop_by_hop(colors, source, targets)
+    # The same rows as the fused transform
+    rows = list(map(get_transform(source, targets).result_type._make, zip(*hops)))
+    hops_time = time.perf_counter() - start
+    del rows
+    print(f'{source} -> {", ".join(targets)}: fused {args.colors / fused_time:.0f} colors/s, '
+          f'hop by hop {args.colors / hops_time:.0f} colors/s '
+          f'({hops_time / fused_time:.1f}x)')
+
+    # The fused matrices can round the last bits differently
+    mismatches = sum(max(abs(a - b) for a, b in zip(getattr(result, target), column[index]))
+                     > ROUND_TRIP_TOLERANCE
+                     for target, column in zip(targets, hops)
+                     for index, result in enumerate(fused[:1000]))
+    failed = mismatches > 0
+    if mismatches:
+        print(f'{mismatches} fused results differ from the hop by hop ones!', file=sys.stderr)
+
+    single = colors[:10000]
+    start = time.perf_counter()
+    for color in single:
+        get_transform(source, targets)(color)
+    cached_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for color in single:
+        colorspaces.Transform(source, targets)(color)
+    planned_time = time.perf_counter() - start
+    print(f'Single conversions: cached plan {cached_time / len(single) * 1e6:.1f} us, '
+          f'planned every time {planned_time / len(single) * 1e6:.1f} us')
+
+    # The round trips always start from RGB
+    sample = [(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+              for _ in range(10000)] + [(0, 0, 0), (255, 255, 255), (128, 128, 128)]
+    for space in SPACES:
+        back = get_transform(space, 'rgb')
+        error = max(max(abs(a - b) for a, b in zip(color, back(converted)))
+                    for color, converted in zip(sample, convert_colors(sample, 'rgb', space)))
+        print(f'  rgb -> {space:<11} -> rgb: {" -> ".join(find_path("rgb", space)):<40} '
+              f'max error {error:.2e}')
+        failed |= error > ROUND_TRIP_TOLERANCE
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Startup benchmark: the import time of service (as used by the CLI and by other tools) and the
+time from launching the application until its first frame is painted. Each measurement runs in
+a fresh interpreter. Exits with status 1 if a median is over its budget. The first frame needs a
+display and is skipped without one. tests/test_startup.py checks the same budgets.
+
+Usage (from the repository root): python benchmarks/bench_startup.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# The budgets of the medians, in milliseconds
+IMPORT_BUDGET_MS = 100
+FIRST_FRAME_BUDGET_MS = 400
+
+# Modules only loaded on first use: none of them is imported by 'import service'
+LAZY_MODULES = ('argparse', 'colour', 'concurrent.futures', 'configupdater', 'gettext',
+                'logging', 'random', 'sqlite3', 'tkinter')
+
+IMPORT_SNIPPET = '''
+import time
+start = time.perf_counter()
+import service
+print(time.perf_counter() - start)
+'''
+
+# Mirrors main.py, stopping once the first frame is painted
+FIRST_FRAME_SNIPPET = '''
+import time
+start = time.perf_counter()
+import tkinter as tk
+import globals as global_var
+from gui import GUI
+from startup import read_config, get_language_func
+read_config()
+lang_func = get_language_func(global_var.LANGUAGE)
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print('nan')
+else:
+    GUI(root, lang_func)
+    root.update()
+    print(time.perf_counter() - start)
+    root.destroy()
+'''
+
+
+def measure(snippet: str, runs: int) -> float:
+    """
+    Runs a snippet in fresh interpreters (from the src directory, like the application)
+    :return: The median of the times printed by the snippet, in milliseconds (nan if skipped)
+    """
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', snippet], cwd=SRC, check=True,
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+        times.append(float(output.strip().splitlines()[-1]) * 1000)
+    return statistics.median(times)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Startup time of the application')
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters per measurement')
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_MS,
+                        help='maximum median import time of service, in milliseconds')
+    parser.add_argument('--first-frame-budget', type=float, default=FIRST_FRAME_BUDGET_MS,
+                        help='maximum median time to the first frame, in milliseconds')
+    args = parser.parse_args()
+
+    status = 0
+    for label, snippet, budget in (('import service', IMPORT_SNIPPET, args.import_budget),
+                                   ('first frame', FIRST_FRAME_SNIPPET, args.first_frame_budget)):
+        median = measure(snippet, args.runs)
+        if median != median:
+            print(f'{label:<16}skipped (no display)')
+            continue
+        verdict = 'ok' if median <= budget else 'OVER BUDGET'
+        print(f'{label:<16}{median:>8.1f} ms  (budget {budget:.0f} ms)  {verdict}')
+        if median > budget:
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Benchmark of the swatch grid of the palette window (swatches.SwatchGrid): shows palettes of
+growing sizes, counting the canvas items and timing the redraws of small scrolls, row scrolls
+and jumps, then does the same with a canvas holding one item per swatch and scrolled by Tk
+itself. Needs a display (or Xvfb).
+Exits with status 1 if the number of items of the grid grows with the palette.
+
+Usage (from the repository root): python benchmarks/bench_swatches.py [--sizes 1000 100000 1000000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from service import convert_many  # noqa: E402
+from swatches import SWATCH_GAP, SWATCH_SIZE, SwatchGrid  # noqa: E402
+
+SCROLLS = (('3 px', 3), ('1 row', SWATCH_SIZE + SWATCH_GAP), ('1 page', 600), ('jump', 50000))
+
+
+def _time_scrolls(root: tk.Tk, scroll, repeats: int = 50) -> dict:
+    """
+    :param scroll: Called with a number of pixels to scroll by
+    :return: The median time (in milliseconds) of a scroll until it is drawn, by kind of scroll
+    """
+    times = {}
+    for title, pixels in SCROLLS:
+        samples = []
+        for repeat in range(repeats):
+            start = time.perf_counter()
+            scroll(pixels if repeat % 2 == 0 else -pixels)
+            root.update_idletasks()
+            samples.append((time.perf_counter() - start) * 1000)
+        times[title] = statistics.median(samples)
+    return times
+
+
+def _one_item_per_swatch(root: tk.Tk, colors) -> (float, int, dict):
+    """
+    Draws every swatch as its own item of a canvas scrolled by Tk
+    :return: The time taken to create the items, their number and the scroll times
+    """
+    canvas = tk.Canvas(root, width=800, height=600, highlightthickness=0)
+    canvas.pack()
+    columns = (800 - SWATCH_GAP) // (SWATCH_SIZE + SWATCH_GAP)
+    pitch = SWATCH_SIZE + SWATCH_GAP
+    start = time.perf_counter()
+    for index, fill in enumerate(colors.hex):
+        row, column = divmod(index, columns)
+        x_value, y_value = SWATCH_GAP + column * pitch, SWATCH_GAP + row * pitch
+        canvas.create_rectangle(x_value, y_value, x_value + SWATCH_SIZE, y_value + SWATCH_SIZE,
+                                fill=fill, width=0)
+    canvas.configure(scrollregion=canvas.bbox('all'), yscrollincrement=1)
+    root.update()
+    created = time.perf_counter() - start
+    times = _time_scrolls(root, lambda pixels: canvas.yview_scroll(pixels, 'units'))
+    items = len(canvas.find_all())
+    canvas.destroy()
+    return created, items, times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark of the swatch grid')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                        help='colors of the palettes shown')
+    parser.add_argument('--naive-limit', type=int, default=100000,
+                        help='largest palette drawn with one item per swatch')
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print('No display, skipping.')
+        return 0
+    rng = random.Random(0)
+    item_counts = set()
+    for size in args.sizes:
+        colors = convert_many([rng.getrandbits(24) for _ in range(size)])
+
+        window = tk.Frame(root, width=800, height=600)
+        window.pack()
+        window.grid_propagate(False)
+        window.grid_rowconfigure(0, weight=1)
+        window.grid_columnconfigure(0, weight=1)
+        grid = SwatchGrid(window)
+        grid.frame.grid(row=0, column=0, sticky='nsew')
+        root.update()
+        start = time.perf_counter()
+        grid.set_colors(colors)
+        root.update()
+        shown = time.perf_counter() - start
+        times = _time_scrolls(root, grid.scroll_pixels)
+        item_counts.add(grid.item_count)
+        print(f'{size:>8} colors, grid:  shown in {shown * 1000:7.1f} ms, '
+              f'{grid.item_count:>7} items, scrolls: '
+              + ', '.join(f'{title} {elapsed:.2f} ms' for title, elapsed in times.items()))
+        window.destroy()
+
+        if size <= args.naive_limit:
+            created, items, times = _one_item_per_swatch(root, colors)
+            print(f'{size:>8} colors, naive: shown in {created * 1000:7.1f} ms, '
+                  f'{items:>7} items, scrolls: '
+                  + ', '.join(f'{title} {elapsed:.2f} ms' for title, elapsed in times.items()))
+    root.destroy()
+    return 0 if len(item_counts) == 1 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Differential test of the two conversion engines of service.py: the exact integer engine
+(rgbhsl.py, the default) against the float conversions of colour.Color. Every hex color of the
+24-bit space and every whole-number HSL color (0-360, 0-100%, 0-100%) is converted by both, and
+every difference is classified. The intentional differences are:
+
+    rgb truncated    colour converts hex colors to HSL and back, then truncates the channels
+                     with int(), so the RGB output is often one less than the input. The exact
+                     engine outputs the input itself
+    hex ties         colour rounds x.5 channel values down (it subtracts 1e-7 before rounding);
+                     the exact engine rounds them up
+    hue rounded      colour truncates the hue (computed on floats, so 120 can become 119); the
+                     exact engine rounds it half up (359.5 and above becoming 0)
+    percent rounded  colour rounds the saturation and lightness with round(value, 2) on floats,
+                     which rounds some halves down, then truncates int(0.29 * 100) to 28; the
+                     exact engine rounds exact fractions half up
+    float error      colour computes HSL -> RGB on floats, which can land one unit away from
+                     the exact result far from any tie
+
+Anything else is reported as unexpected, and makes the exit status 1. tests/test_engines.py
+runs the same comparison on every whole-number HSL color and a sample of the hex colors.
+
+Usage (from the repository root):
+    python benchmarks/compare_engines.py [-j WORKERS] [--step N]
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import service  # noqa: E402
+
+# Examples kept per kind of difference
+EXAMPLES = 3
+
+# The denominator of the exact channels of an HSL color: 100 (lightness) * 100 (saturation) *
+# 60 (hue within a sector)
+CHANNEL_UNIT = 600000
+
+
+def _unpack(packed: int) -> (int, int, int):
+    return packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF
+
+
+def _unpack_hsl(packed: int) -> (int, int, int):
+    return packed >> 14, (packed >> 7) & 0x7F, packed & 0x7F
+
+
+def _exact_fraction(values: tuple) -> tuple:
+    """
+    :return: The unrounded hue (degrees) and saturation and lightness (percent) of an RGB color
+    """
+    largest, smallest = max(values), min(values)
+    chroma, total = Fraction(largest - smallest), largest + smallest
+    lightness = Fraction(100 * total, 510)
+    if not chroma:
+        return Fraction(0), Fraction(0), lightness
+    r_value, g_value, b_value = values
+    if largest == r_value:
+        sixths = (g_value - b_value) / chroma % 6
+    elif largest == g_value:
+        sixths = (b_value - r_value) / chroma + 2
+    else:
+        sixths = (r_value - g_value) / chroma + 4
+    return 60 * sixths, 100 * chroma / (255 - abs(total - 255)), lightness
+
+
+def _classify_hsl(exact: tuple, other: tuple, fractions: tuple, kinds: set) -> None:
+    """
+    Explains the differences between two displayed HSL values
+    """
+    hue, saturation, lightness = fractions
+    if exact[0] != other[0]:
+        # The truncated hue is one less than the rounded one
+        kinds.add('hue rounded' if (exact[0] - other[0]) % 360 == 1 else 'unexpected hsl')
+    for exact_value, other_value, value in zip(exact[1:], other[1:], (saturation, lightness)):
+        if exact_value != other_value:
+            # colour rounds to 2 decimals on floats, then truncates: round(0.2941, 2) * 100
+            # is 28.999999999999996. Its float ties, like 0.8749999999999999, round down
+            rounded = round(float(value) / 100, 2) * 100
+            explained = other_value == int(rounded) or value - int(value) == Fraction(1, 2)
+            kinds.add('percent rounded' if explained and abs(exact_value - other_value) == 1
+                      else 'unexpected hsl')
+
+
+def compare_plane(red: int, step: int = 1) -> (Counter, dict):
+    """
+    Compares the conversions of the hex colors with the given red value
+    :return: The number of differences per kind and a few examples of each kind
+    """
+    return compare_hex((red, green, blue) for green in range(0, 256, step)
+                       for blue in range(0, 256, step))
+
+
+def compare_hex(colors) -> (Counter, dict):
+    """
+    Compares the conversions of hex colors
+    :param colors: An iterable of (red, green, blue) tuples
+    :return: The number of differences per kind and a few examples of each kind
+    """
+    counts, examples = Counter(), {}
+    for values in colors:
+        exact = service._convert_exact('hex', values)
+        other = service._format_color('hex', values, service._create_object('hex', values))
+        if exact == other:
+            counts['identical'] += 1
+            continue
+        kinds = set()
+        if exact.packed_hex != other.packed_hex:
+            kinds.add('unexpected hex')
+        if exact.packed_rgb != other.packed_rgb:
+            # Every channel is either right or one less than the input
+            kinds.add('rgb truncated' if all(0 <= a - b <= 1 for a, b in zip(
+                    _unpack(exact.packed_rgb), _unpack(other.packed_rgb)))
+                      else 'unexpected rgb')
+        if exact.packed_hsl != other.packed_hsl:
+            _classify_hsl(_unpack_hsl(exact.packed_hsl), _unpack_hsl(other.packed_hsl),
+                          _exact_fraction(values), kinds)
+        _add(kinds, '#%02X%02X%02X' % values, exact, other, counts, examples)
+    return counts, examples
+
+
+def compare_hue(hue: int, step: int = 1) -> (Counter, dict):
+    """
+    Compares the conversions of the whole-number HSL colors with the given hue
+    :return: The number of differences per kind and a few examples of each kind
+    """
+    return compare_hsl((hue, saturation, lightness) for saturation in range(0, 101, step)
+                       for lightness in range(0, 101, step))
+
+
+def compare_hsl(colors) -> (Counter, dict):
+    """
+    Compares the conversions of whole-number HSL colors
+    :param colors: An iterable of (hue, saturation, lightness) tuples, in degrees and percents
+    :return: The number of differences per kind and a few examples of each kind
+    """
+    counts, examples = Counter(), {}
+    for hue, saturation, lightness in colors:
+        values = (hue, saturation / 100, lightness / 100)
+        exact = service._convert_exact('hsl', values)
+        other = service._format_color('hsl', values, service._create_object('hsl', values))
+        if exact == other:
+            counts['identical'] += 1
+            continue
+        kinds = set()
+        if exact.packed_hex != other.packed_hex:
+            kinds.add(_classify_channels(hue, saturation, lightness, exact.packed_hex,
+                                         other.packed_hex, 0))
+        if exact.packed_rgb != other.packed_rgb:
+            kinds.add(_classify_channels(hue, saturation, lightness, exact.packed_rgb,
+                                         other.packed_rgb, 1))
+        if exact.packed_hsl != other.packed_hsl:
+            displayed = _unpack_hsl(other.packed_hsl)
+            # int(value * 100) on floats, like int(0.29 * 100) == 28
+            truncated = displayed == (hue, int(values[1] * 100), int(values[2] * 100))
+            kinds.add('percent rounded' if truncated else 'unexpected hsl')
+        _add(kinds, f'{hue}, {saturation}%, {lightness}%', exact, other, counts, examples)
+    return counts, examples
+
+
+def _add(kinds: set, user_input: str, exact, other, counts: Counter, examples: dict) -> None:
+    """
+    Counts the kinds of differences of one color, keeping it as an example of each
+    """
+    for kind in kinds:
+        counts[kind] += 1
+        kind_examples = examples.setdefault(kind, [])
+        if len(kind_examples) < EXAMPLES:
+            kind_examples.append((user_input, exact, other))
+
+
+def _classify_channels(hue: int, saturation: int, lightness: int, exact: int, other: int,
+                       truncated: int) -> str:
+    """
+    Explains the differences between the channels of an HSL input converted by both engines
+    :param truncated: 1 if colour truncates these channels with int(), 0 if it rounds them
+    """
+    # The exact channels (times 255) in units of 1/CHANNEL_UNIT: integers, as the chroma is a
+    # multiple of 1/10000 and the position of the hue within its sector a multiple of 1/60
+    chroma = (100 - abs(2 * lightness - 100)) * saturation
+    middle = chroma * (60 - abs(hue % 360 % 120 - 60))
+    base = lightness * 6000 - chroma * 30
+    channels = [(base + chroma * 60) * 255, (base + middle) * 255, base * 255]
+    kind = 'unexpected rgb'
+    for exact_value, other_value in zip(_unpack(exact), _unpack(other)):
+        if exact_value == other_value:
+            continue
+        fractional = {value % CHANNEL_UNIT for value in channels
+                      if (value + CHANNEL_UNIT // 2) // CHANNEL_UNIT == exact_value}
+        if truncated and exact_value - other_value == 1 and any(fractional):
+            kind = 'rgb truncated'
+        elif CHANNEL_UNIT // 2 in fractional and exact_value - other_value == 1:
+            kind = 'hex ties'
+        elif abs(exact_value - other_value) == 1:
+            kind = 'float error'
+        else:
+            return 'unexpected rgb'
+    return kind
+
+
+def _merge(results, counts: Counter, examples: dict) -> None:
+    for plane_counts, plane_examples in results:
+        counts.update(plane_counts)
+        for kind, kind_examples in plane_examples.items():
+            examples.setdefault(kind, []).extend(kind_examples)
+
+
+def _report(title: str, counts: Counter, examples: dict) -> int:
+    print(f'{title}: {counts["identical"]} identical')
+    unexpected = 0
+    for kind, count in sorted(counts.items()):
+        if kind == 'identical':
+            continue
+        print(f'  {kind:<16}{count:>10}')
+        for user_input, exact, other in examples[kind][:EXAMPLES]:
+            print(f'      {user_input}: exact {tuple(exact)[1:]}, colour {tuple(other)[1:]}')
+        if kind.startswith('unexpected'):
+            unexpected += count
+    return unexpected
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Differential test of the exact conversion '
+                                                 'engine against colour.Color')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='processes comparing the colors (default: every CPU)')
+    parser.add_argument('--step', type=int, default=1,
+                        help='only compare every Nth value of each component (default: 1, '
+                             'the whole space)')
+    args = parser.parse_args()
+
+    # Without the table, the exact engine computes every conversion
+    service.load_conversion_table(None)
+    unexpected = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        counts, examples = Counter(), {}
+        reds = range(0, 256, args.step)
+        _merge(executor.map(compare_plane, reds, [args.step] * len(reds)), counts, examples)
+        unexpected += _report('Hex inputs', counts, examples)
+
+        counts, examples = Counter(), {}
+        _merge(executor.map(compare_hue, range(361), [args.step] * 361), counts, examples)
+        unexpected += _report('HSL inputs', counts, examples)
+
+    if unexpected:
+        print(f'{unexpected} unexpected differences!', file=sys.stderr)
+        return 1
+    print('Every difference is intentional.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
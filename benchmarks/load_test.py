@@ -0,0 +1,130 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Load test of the local conversion server (src/server.py): keeps several keep-alive connections
+busy with requests and reports the requests per second and the latency percentiles.
+
+Usage (from the repository root):
+    python benchmarks/load_test.py --spawn [--requests N] [--concurrency N] [--batch SIZE]
+                                        [--invalid-ratio R]
+    python benchmarks/load_test.py --port 8765      (against an already running server)
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from corpus import generate_inputs  # noqa: E402
+
+
+async def _request(reader, writer, request: bytes) -> int:
+    """
+    Sends one request on a keep-alive connection and reads the whole response
+    :return: The status code of the response
+    """
+    writer.write(request)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    length = next(int(line.split(':', 1)[1]) for line in header_lines
+                  if line.lower().startswith('content-length:'))
+    await reader.readexactly(length)
+    return int(status_line.split(' ')[1])
+
+
+def _build_requests(count: int, batch: int, host: str, invalid_ratio: float) -> list:
+    colors = generate_inputs(count * (batch or 1), seed=0, invalid_ratio=invalid_ratio)
+    requests = []
+    for _ in range(count):
+        if batch:
+            body = json.dumps([next(colors) for _ in range(batch)]).encode('utf-8')
+            requests.append(f'POST /batch HTTP/1.1\r\nHost: {host}\r\n'
+                            f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+        else:
+            requests.append(f'GET /convert?color={quote(next(colors))} HTTP/1.1\r\n'
+                            f'Host: {host}\r\n\r\n'.encode('latin-1'))
+    return requests
+
+
+async def _client(host: str, port: int, requests: list, latencies: list, statuses: dict) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            status = await _request(reader, writer, request)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, total: int, concurrency: int, batch: int,
+              invalid_ratio: float = 0.0) -> None:
+    requests = _build_requests(total, batch, host, invalid_ratio)
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, requests[index::concurrency], latencies, statuses)
+                           for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    kind = f'batches of {batch}' if batch else 'single colors'
+    print(f'{total} requests ({kind}), {concurrency} connections: {total / elapsed:.0f} req/s, '
+          f'p50 {p50:.2f} ms, p99 {p99:.2f} ms, statuses {statuses}')
+
+
+async def _wait_for_server(host: str, port: int, timeout: float = 10) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+        else:
+            writer.close()
+            return
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Load test of the local conversion server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--spawn', action='store_true', help='start the server for the test')
+    parser.add_argument('--requests', type=int, default=20000, help='total requests')
+    parser.add_argument('--concurrency', type=int, default=32, help='keep-alive connections')
+    parser.add_argument('--batch', type=int, default=0,
+                        help='colors per /batch request (0 to use /convert)')
+    parser.add_argument('--invalid-ratio', type=float, default=0.0,
+                        help='share of invalid colors in the requests')
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, 'server.py', '--host', args.host,
+                                   '--port', str(args.port)], cwd=SRC)
+    try:
+        asyncio.run(_wait_for_server(args.host, args.port))
+        asyncio.run(run(args.host, args.port, args.requests, args.concurrency, args.batch,
+                        args.invalid_ratio))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
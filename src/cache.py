@@ -0,0 +1,360 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+"""
+import os
+import time
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions size max_size')
+
+
+class LRUCache:
+    """
+    A bounded mapping that evicts the least recently used entry once it is full,
+    keeping hit/miss/eviction statistics so it can be sized properly
+    """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        :param max_size: The maximum number of entries kept. 0 disables the cache
+        """
+        if max_size < 0:
+            raise ValueError('The maximum size of a cache cannot be negative!')
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Looks up a key, marking it as the most recently used one
+        :param key: The key to look up
+        :param default: The value returned when the key is not cached
+        :return: The cached value or the default
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        """
+        Caches a value, evicting the least recently used entries if the cache is full
+        :param key: The key of the value
+        :param value: The value to cache
+        """
+        with self._lock:
+            if not self._max_size:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict(self._max_size)
+
+    def resize(self, max_size: int) -> None:
+        """
+        Changes the maximum size of the cache, evicting entries if needed
+        :param max_size: The new maximum number of entries. 0 disables the cache
+        """
+        if max_size < 0:
+            raise ValueError('The maximum size of a cache cannot be negative!')
+        with self._lock:
+            self._max_size = max_size
+            self._evict(max_size)
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        :return: A CacheInfo namedtuple with the current statistics of the cache
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, len(self._entries),
+                             self._max_size)
+
+    def _evict(self, max_size: int) -> None:
+        # Must be called while holding the lock
+        while len(self._entries) > max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+class PersistentCache:
+    """
+    A conversion cache stored in an SQLite file, shared by every run and process using the same
+    file. Each entry maps a text key to the 3 packed integers of a converted color. It is
+    bounded (the least recently used entries are evicted) and emptied whenever the version it
+    was written with changes.
+    Writes are buffered and stored in batches, and lookups of whole batches of keys (get_many
+    and preload) only take a few queries
+    """
+
+    # Pending entries stored at once, in one transaction
+    FLUSH_SIZE = 10000
+
+    # Entries are marked as used at most this often (in seconds), so reads rarely cause writes
+    TOUCH_INTERVAL = 3600
+
+    def __init__(self, path: str, version, max_entries: int = 1000000, timeout: float = 30.0):
+        """
+        :param path: The path of the SQLite file (created if needed)
+        :param version: The version of the conversion logic: any stored entry written with
+                        another version is discarded
+        :param max_entries: The maximum number of entries kept in the file
+        :param timeout: How long (in seconds) to wait for another process writing to the file
+        """
+        if max_entries <= 0:
+            raise ValueError('The maximum size of a persistent cache must be positive!')
+        self.path = path
+        self.version = str(version)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._lock = Lock()
+        self._connection = None
+        self._pid = None
+        # Entries not written yet, entries to mark as used, and the keys looked up by preload()
+        # with the entries found
+        self._pending = {}
+        self._touched = set()
+        self._preloaded_keys = frozenset()
+        self._preloaded = {}
+        self._hits = self._misses = 0
+        with self._lock:
+            self._connect()
+
+    def _connect(self):
+        """
+        Opens the file in this process (a connection must not be used across a fork), creating
+        the tables and discarding the entries of another version if needed
+        """
+        import sqlite3
+
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                     check_same_thread=False)
+        # Readers and one writer at a time can then work on the file concurrently
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('CREATE TABLE IF NOT EXISTS metadata '
+                               '(name TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID')
+            connection.execute('CREATE TABLE IF NOT EXISTS conversions (key TEXT PRIMARY KEY, '
+                               'packed_hex INTEGER, packed_rgb INTEGER, packed_hsl INTEGER, '
+                               'used INTEGER) WITHOUT ROWID')
+            connection.execute('CREATE INDEX IF NOT EXISTS conversions_used '
+                               'ON conversions (used)')
+            row = connection.execute("SELECT value FROM metadata WHERE name = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                connection.execute('DELETE FROM conversions')
+                connection.execute("INSERT OR REPLACE INTO metadata VALUES ('version', ?)",
+                                   (self.version,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            connection.close()
+            raise
+        connection.execute('CREATE TEMP TABLE IF NOT EXISTS wanted (key TEXT PRIMARY KEY)')
+        self._connection = connection
+        self._pid = os.getpid()
+
+    def _database(self):
+        # Must be called while holding the lock
+        if self._pid != os.getpid():
+            # Inherited through a fork: the entries of the parent are its own to write
+            self._pending.clear()
+            self._touched.clear()
+            self._connect()
+        return self._connection
+
+    def get(self, key: str, default=None):
+        """
+        Looks up one key
+        :param key: The key to look up
+        :param default: The value returned when the key is not cached
+        :return: The tuple of the 3 packed integers of the color, or the default
+        """
+        with self._lock:
+            value = self._pending.get(key)
+            if value is None:
+                value = self._preloaded.get(key)
+            # The keys not found by preload() are not looked up again
+            if value is None and key not in self._preloaded_keys:
+                row = self._database().execute(
+                        'SELECT packed_hex, packed_rgb, packed_hsl, used FROM conversions '
+                        'WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    value = row[:3]
+                    if row[3] < self._now() - self.TOUCH_INTERVAL:
+                        self._touched.add(key)
+            if value is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return value
+
+    def get_many(self, keys) -> dict:
+        """
+        Looks up a whole batch of keys with a few queries
+        :param keys: An iterable of keys
+        :return: A dict of the tuple of the 3 packed integers of every key found
+        """
+        keys = set(keys)
+        with self._lock:
+            found = self._get_many(keys)
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def preload(self, keys) -> int:
+        """
+        Looks up a whole batch of keys ahead of get(), which then finds them in memory (until
+        the next preload)
+        :param keys: An iterable of keys
+        :return: The number of keys found
+        """
+        keys = frozenset(keys)
+        with self._lock:
+            self._preloaded_keys = keys
+            self._preloaded = self._get_many(keys)
+            return len(self._preloaded)
+
+    def _get_many(self, keys) -> dict:
+        # Must be called while holding the lock
+        connection = self._database()
+        found = {}
+        missing = []
+        for key in keys:
+            value = self._pending.get(key)
+            if value is None:
+                missing.append((key,))
+            else:
+                found[key] = value
+        stale = self._now() - self.TOUCH_INTERVAL
+        # The keys are joined with the entries through a temporary table, instead of one
+        # query per key
+        connection.execute('BEGIN')
+        try:
+            connection.executemany('INSERT OR IGNORE INTO wanted VALUES (?)', missing)
+            for key, packed_hex, packed_rgb, packed_hsl, used in connection.execute(
+                    'SELECT conversions.key, packed_hex, packed_rgb, packed_hsl, used '
+                    'FROM wanted JOIN conversions ON conversions.key = wanted.key'):
+                found[key] = (packed_hex, packed_rgb, packed_hsl)
+                if used < stale:
+                    self._touched.add(key)
+            connection.execute('DELETE FROM wanted')
+        finally:
+            connection.execute('COMMIT')
+        return found
+
+    def put(self, key: str, value: tuple) -> None:
+        """
+        Caches one entry (written with the next batch of entries)
+        :param key: The key of the entry
+        :param value: The tuple of the 3 packed integers of the color
+        """
+        with self._lock:
+            self._pending[key] = value
+            if len(self._pending) >= self.FLUSH_SIZE:
+                self._flush()
+
+    def put_many(self, items) -> None:
+        """
+        Caches a whole batch of entries, written at once
+        :param items: An iterable of (key, tuple of the 3 packed integers) tuples
+        """
+        with self._lock:
+            self._pending.update(items)
+            self._flush()
+
+    def flush(self) -> None:
+        """
+        Writes the pending entries (and marks the entries found as used)
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        # Must be called while holding the lock
+        if not self._pending and not self._touched:
+            return
+        connection = self._database()
+        now = self._now()
+        # Taking the write lock at once, instead of upgrading a read lock (which can fail
+        # when another process does the same)
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany('INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?)',
+                                   [(key, *value, now) for key, value in self._pending.items()])
+            connection.executemany('UPDATE conversions SET used = ? WHERE key = ?',
+                                   [(now, key) for key in self._touched])
+            if self._pending:
+                self._evict(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._pending.clear()
+        self._touched.clear()
+
+    def _evict(self, connection) -> None:
+        """
+        Removes the least recently used entries once the file holds too many, down to 90% of
+        the maximum, so the eviction is not repeated with every batch
+        """
+        count = connection.execute('SELECT count(*) FROM conversions').fetchone()[0]
+        if count > self.max_entries:
+            connection.execute('DELETE FROM conversions WHERE key IN (SELECT key FROM conversions '
+                               'ORDER BY used LIMIT ?)', (count - self.max_entries * 9 // 10,))
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time())
+
+    def clear(self) -> None:
+        """
+        Removes every entry, from the file as well
+        """
+        with self._lock:
+            self._pending.clear()
+            self._touched.clear()
+            self._preloaded_keys = frozenset()
+            self._preloaded = {}
+            self._database().execute('DELETE FROM conversions')
+            self._hits = self._misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        :return: A CacheInfo namedtuple with the statistics of this process (evictions are not
+                 counted) and the number of entries in the file (plus those not written yet)
+        """
+        with self._lock:
+            size = self._database().execute('SELECT count(*) FROM conversions').fetchone()[0]
+            return CacheInfo(self._hits, self._misses, 0, size + len(self._pending),
+                             self.max_entries)
+
+    def close(self) -> None:
+        """
+        Writes the pending entries and closes the file
+        """
+        with self._lock:
+            if self._connection is None:
+                return
+            if self._pid == os.getpid():
+                self._flush()
+                self._connection.close()
+            # Reopened if the cache is used again
+            self._connection = self._pid = None
@@ -0,0 +1,227 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Headless bulk conversion: reads one color per line and writes the conversions as CSV or
+JSON Lines. Never imports tkinter.
+
+Usage: python cli.py [INPUT ...] [-f csv|jsonl] [-o OUTPUT] [-e ERRORS] [-j WORKERS]
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import service
+from exceptions import InvalidColorError
+from globals import PERSISTENT_CACHE_FILE
+from service import convert
+
+CHUNK_SIZE = 4096
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+COLUMNS = ('input', 'name', 'hex', 'rgb', 'hsl')
+
+# One line of input: its line number, the stripped text and either the ConvertedColor or the
+# error message (the other one being None)
+Conversion = namedtuple('Conversion', 'line_number input color error')
+
+
+def read_chunks(stream, chunk_size: int = CHUNK_SIZE):
+    """
+    Reads the non-empty lines of a text stream in chunks, so only one chunk is in memory at a time
+    :param stream: A text stream (a file or sys.stdin)
+    :param chunk_size: The maximum number of lines in a chunk
+    :return: A generator of lists of (line number, stripped line) tuples
+    """
+    numbered = ((line_number, line.strip()) for line_number, line in enumerate(stream, start=1))
+    lines = (item for item in numbered if item[1])
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def convert_chunk(chunk: list) -> list:
+    """
+    Converts a chunk of lines, catching invalid colors instead of stopping at the first one
+    :param chunk: A list of (line number, stripped line) tuples, as produced by read_chunks()
+    :return: A list of Conversion namedtuples, in input order
+    """
+    # One query for the lines already in the persistent cache (if enabled), and one write for
+    # the new ones
+    service.prefetch(user_input for _, user_input in chunk)
+    conversions = []
+    for line_number, user_input in chunk:
+        try:
+            conversions.append(Conversion(line_number, user_input, convert(user_input), None))
+        except (InvalidColorError, ValueError) as error:
+            conversions.append(Conversion(line_number, user_input, None, str(error)))
+    service.flush_persistent_cache()
+    return conversions
+
+
+def _chunk_failed(chunk: list, error: Exception) -> list:
+    """
+    Reports every line of a chunk whose conversion failed as a whole (Ex: a crashed worker)
+    """
+    message = f'The chunk containing this line failed: {error!r}'
+    return [Conversion(line_number, user_input, None, message) for line_number, user_input in chunk]
+
+
+def convert_chunks(chunks, workers: int = 1, cache: str = None):
+    """
+    Converts chunks of lines, optionally spreading them over a pool of processes.
+    The chunks are yielded in input order, and only a few of them are in flight at a time
+    :param chunks: An iterable of chunks, as produced by read_chunks()
+    :param workers: The number of processes to use. 1 converts everything in this process
+    :param cache: The path of a persistent cache (see service.enable_persistent_cache) shared
+                  by every process, or None
+    :return: A generator of lists of Conversion namedtuples
+    """
+    if workers <= 1:
+        if cache is not None:
+            service.enable_persistent_cache(cache)
+        yield from map(convert_chunk, chunks)
+        return
+
+    initializer, initargs = (None, ()) if cache is None else \
+        (service.enable_persistent_cache, (cache,))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(convert_chunk, chunk)))
+            # Keeps every worker busy while bounding how much input is read ahead
+            if len(pending) >= 2 * workers:
+                yield _collect(*pending.popleft())
+        while pending:
+            yield _collect(*pending.popleft())
+
+
+def _collect(chunk: list, future) -> list:
+    """
+    Waits for the conversion of a chunk, reporting its lines as failed if the worker raised
+    """
+    try:
+        return future.result()
+    except Exception as error:
+        return _chunk_failed(chunk, error)
+
+
+def _format_csv(conversions: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(
+            (conversion.input, *(value or '' for value in conversion.color))
+            for conversion in conversions)
+    return buffer.getvalue()
+
+
+def _format_jsonl(conversions: list) -> str:
+    return ''.join(json.dumps(dict(zip(COLUMNS, (conversion.input, *conversion.color)))) + '\n'
+                   for conversion in conversions)
+
+
+FORMATTERS = {'csv': _format_csv, 'jsonl': _format_jsonl}
+
+
+def write_conversions(chunks, output, errors, output_format: str = 'csv') -> (int, int):
+    """
+    Writes converted chunks to the output stream and the invalid lines to the error stream,
+    one chunk at a time
+    :param chunks: An iterable of lists of Conversion namedtuples
+    :param output: The text stream receiving the conversions
+    :param errors: The text stream receiving the invalid lines
+    :param output_format: Either 'csv' or 'jsonl'
+    :return: A tuple containing the number of converted and of invalid lines
+    """
+    formatter = FORMATTERS[output_format]
+    if output_format == 'csv':
+        output.write(','.join(COLUMNS) + '\n')
+
+    converted = invalid = 0
+    for conversions in chunks:
+        valid = [conversion for conversion in conversions if conversion.error is None]
+        output.write(formatter(valid))
+        converted += len(valid)
+
+        for conversion in conversions:
+            if conversion.error is not None:
+                errors.write(f'line {conversion.line_number}: {conversion.input!r}: '
+                             f'{conversion.error}\n')
+                invalid += 1
+    return converted, invalid
+
+
+def _open_inputs(paths: list):
+    """
+    Yields the lines of every input file in turn ('-' meaning stdin)
+    """
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+        else:
+            with open(path, encoding='utf-8') as file:
+                yield from file
+
+
+def _parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+            description='Converts colors (one per line) to their name, hex, RGB and HSL values.')
+    parser.add_argument('inputs', nargs='*', default=['-'], metavar='INPUT',
+                        help="files to read the colors from ('-' or nothing for stdin)")
+    parser.add_argument('-f', '--format', choices=sorted(FORMATTERS), default='csv',
+                        help='the output format (default: csv)')
+    parser.add_argument('-o', '--output', default='-',
+                        help="the file to write the conversions to ('-' for stdout)")
+    parser.add_argument('-e', '--errors', default=None,
+                        help='the file to write the invalid lines to (default: stderr)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'lines converted and written at a time (default: {CHUNK_SIZE})')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='processes converting chunks in parallel (default: 1)')
+    parser.add_argument('--cache', nargs='?', const=PERSISTENT_CACHE_FILE, default=None,
+                        metavar='PATH',
+                        help='keep the conversions in a persistent cache shared by every run '
+                             f'(default path: {PERSISTENT_CACHE_FILE})')
+    args = parser.parse_args(argv)
+    for option, value in (('--chunk-size', args.chunk_size), ('-j/--workers', args.workers)):
+        if value < 1:
+            parser.error(f'{option} must be at least 1')
+    return args
+
+
+def main(argv=None) -> int:
+    """
+    Runs the command line interface
+    :param argv: The command line arguments (sys.argv[1:] by default)
+    :return: The exit status: 0 if every line was converted, 1 if some lines were invalid
+    """
+    args = _parse_arguments(argv)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8',
+                                                          newline='', buffering=WRITE_BUFFER_SIZE)
+    errors = sys.stderr if args.errors is None else open(args.errors, 'w', encoding='utf-8')
+    try:
+        chunks = convert_chunks(read_chunks(_open_inputs(args.inputs), args.chunk_size),
+                                args.workers, args.cache)
+        converted, invalid = write_conversions(chunks, output, errors, args.format)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if errors is not sys.stderr:
+            errors.close()
+
+    print(f'{converted} colors converted, {invalid} invalid.', file=sys.stderr)
+    return 1 if invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,608 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Conversions between color spaces. The spaces are kept in a registry, as nodes of a graph whose
+edges are the registered conversions: get_transform() plans the shortest path between any two
+spaces and fuses it into one function (multiplying the consecutive matrix steps together),
+which is cached. Batches are converted one fused step at a time over the whole batch, so every
+step builds one list of intermediate results, which costs less than chaining the steps for
+every color.
+
+The components of every space are returned as floats, even for a space converted to itself.
+"""
+import math
+from collections import deque, namedtuple
+from functools import partial
+
+# sRGB (D65) reference white, used by the CIELAB conversion
+_WHITE_X, _WHITE_Y, _WHITE_Z = 0.95047, 1.0, 1.08883
+
+# Linearized sRGB value for every 8-bit channel value, so the gamma curve is only computed once
+_LINEAR = tuple(val / 255 / 12.92 if val / 255 <= 0.04045 else ((val / 255 + 0.055) / 1.055) ** 2.4
+                for val in range(256))
+
+
+def _lab_f(t: float) -> float:
+    return t ** (1 / 3) if t > 216 / 24389 else (24389 / 27 * t + 16) / 116
+
+
+def rgb_to_lab(r_value: int, g_value: int, b_value: int) -> (float, float, float):
+    """
+    Converts an 8-bit sRGB color to CIELAB (D65 white point)
+    :param r_value: The red value (0-255)
+    :param g_value: The green value (0-255)
+    :param b_value: The blue value (0-255)
+    :return: A tuple of the L*, a* and b* values
+    """
+    r_linear, g_linear, b_linear = _LINEAR[r_value], _LINEAR[g_value], _LINEAR[b_value]
+    x_value = (0.4124564 * r_linear + 0.3575761 * g_linear + 0.1804375 * b_linear) / _WHITE_X
+    y_value = (0.2126729 * r_linear + 0.7151522 * g_linear + 0.0721750 * b_linear) / _WHITE_Y
+    z_value = (0.0193339 * r_linear + 0.1191920 * g_linear + 0.9503041 * b_linear) / _WHITE_Z
+
+    f_x, f_y, f_z = _lab_f(x_value), _lab_f(y_value), _lab_f(z_value)
+    return 116 * f_y - 16, 500 * (f_x - f_y), 200 * (f_y - f_z)
+
+
+def delta_e_2000(lab1, lab2) -> float:
+    """
+    Computes the CIEDE2000 color difference (with kL = kC = kH = 1)
+    :param lab1: The L*, a* and b* values of the first color
+    :param lab2: The L*, a* and b* values of the second color
+    :return: The Delta E 2000 between the two colors
+    """
+    l1, a1, b1 = lab1
+    l2, a2, b2 = lab2
+    c_mean = (math.hypot(a1, b1) + math.hypot(a2, b2)) / 2
+    c_mean_7 = c_mean ** 7
+    g_value = 0.5 * (1 - math.sqrt(c_mean_7 / (c_mean_7 + 25 ** 7)))
+    a1_prime, a2_prime = a1 * (1 + g_value), a2 * (1 + g_value)
+    c1_prime, c2_prime = math.hypot(a1_prime, b1), math.hypot(a2_prime, b2)
+    h1_prime = math.degrees(math.atan2(b1, a1_prime)) % 360 if c1_prime else 0.0
+    h2_prime = math.degrees(math.atan2(b2, a2_prime)) % 360 if c2_prime else 0.0
+
+    delta_l = l2 - l1
+    delta_c = c2_prime - c1_prime
+    if not c1_prime * c2_prime:
+        delta_h_angle = 0.0
+    elif abs(h2_prime - h1_prime) <= 180:
+        delta_h_angle = h2_prime - h1_prime
+    else:
+        delta_h_angle = h2_prime - h1_prime - 360 if h2_prime > h1_prime else \
+            h2_prime - h1_prime + 360
+    delta_h = 2 * math.sqrt(c1_prime * c2_prime) * math.sin(math.radians(delta_h_angle / 2))
+
+    l_mean = (l1 + l2) / 2
+    c_prime_mean = (c1_prime + c2_prime) / 2
+    if not c1_prime * c2_prime:
+        h_mean = h1_prime + h2_prime
+    elif abs(h1_prime - h2_prime) <= 180:
+        h_mean = (h1_prime + h2_prime) / 2
+    else:
+        h_mean = (h1_prime + h2_prime + 360) / 2 if h1_prime + h2_prime < 360 else \
+            (h1_prime + h2_prime - 360) / 2
+
+    t_value = (1 - 0.17 * math.cos(math.radians(h_mean - 30))
+               + 0.24 * math.cos(math.radians(2 * h_mean))
+               + 0.32 * math.cos(math.radians(3 * h_mean + 6))
+               - 0.20 * math.cos(math.radians(4 * h_mean - 63)))
+    c_prime_mean_7 = c_prime_mean ** 7
+    r_c = 2 * math.sqrt(c_prime_mean_7 / (c_prime_mean_7 + 25 ** 7))
+    r_t = -r_c * math.sin(math.radians(60 * math.exp(-((h_mean - 275) / 25) ** 2)))
+    s_l = 1 + 0.015 * (l_mean - 50) ** 2 / math.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * c_prime_mean
+    s_h = 1 + 0.015 * c_prime_mean * t_value
+
+    return math.sqrt((delta_l / s_l) ** 2 + (delta_c / s_c) ** 2 + (delta_h / s_h) ** 2
+                     + r_t * (delta_c / s_c) * (delta_h / s_h))
+
+
+# A color space of the registry: its name and the names of its components
+ColorSpace = namedtuple('ColorSpace', 'name components')
+
+# A step of a conversion multiplying the color by a 3x3 matrix (a tuple of 3 rows). Consecutive
+# linear steps are multiplied together when a conversion path is planned
+Linear = namedtuple('Linear', 'matrix')
+
+# Every registered space, by name
+SPACES = {}
+
+# The steps of every registered conversion, by source space then by target space
+_CONVERSIONS = {}
+
+# The planned transforms, by (source, targets)
+_transforms = {}
+
+
+def register_space(name: str, components) -> ColorSpace:
+    """
+    Adds a color space to the registry
+    :param name: The name of the space (a valid identifier, Ex: 'oklch')
+    :param components: The names of the components of its colors (Ex: ('l', 'c', 'h'))
+    :return: The registered ColorSpace
+    :raises ValueError: if a space with this name is already registered
+    """
+    if name in SPACES:
+        raise ValueError(f'The color space {name!r} is already registered!')
+    if not name.isidentifier():
+        raise ValueError(f'Invalid color space name {name!r}!')
+    SPACES[name] = space = ColorSpace(name, tuple(components))
+    _CONVERSIONS[name] = {}
+    return space
+
+
+def register_conversion(source: str, target: str, *steps) -> None:
+    """
+    Adds a direct conversion between two registered spaces, replacing any previous one
+    :param source: The name of the space converted from
+    :param target: The name of the space converted to
+    :param steps: The steps of the conversion, applied in order: functions taking and returning
+                  the tuple of the components of a color, or Linear matrices
+    :raises ValueError: if any of the spaces is not registered
+    """
+    _check_space(source)
+    _check_space(target)
+    if not steps:
+        raise ValueError('A conversion needs at least one step!')
+    _CONVERSIONS[source][target] = steps
+    # The shortest paths may have changed
+    _transforms.clear()
+
+
+def _check_space(name: str) -> None:
+    if name not in SPACES:
+        raise ValueError(f'Unknown color space {name!r}, expected one of {tuple(SPACES)}!')
+
+
+def _shortest_paths(source: str) -> dict:
+    """
+    :return: The space before every space reachable from the source on a shortest path to it
+    """
+    previous = {source: None}
+    queue = deque([source])
+    while queue:
+        space = queue.popleft()
+        for target in _CONVERSIONS[space]:
+            if target not in previous:
+                previous[target] = space
+                queue.append(target)
+    return previous
+
+
+def find_path(source: str, target: str) -> list:
+    """
+    Finds the conversion path with the fewest conversions between two spaces
+    :param source: The name of the space converted from
+    :param target: The name of the space converted to
+    :return: The names of the spaces along the path, from the source to the target
+    :raises ValueError: if any of the spaces is unknown or there is no such path
+    """
+    _check_space(source)
+    _check_space(target)
+    previous = _shortest_paths(source)
+    if target not in previous:
+        raise ValueError(f'There is no conversion from {source!r} to {target!r}!')
+    path = [target]
+    while path[-1] != source:
+        path.append(previous[path[-1]])
+    return path[::-1]
+
+
+def _multiply(first: tuple, second: tuple) -> tuple:
+    """
+    :return: The matrix applying the first matrix, then the second one
+    """
+    return tuple(tuple(sum(second[row][k] * first[k][column] for k in range(3))
+                       for column in range(3)) for row in range(3))
+
+
+def _invert(matrix: tuple) -> tuple:
+    """
+    :return: The inverse of a 3x3 matrix
+    """
+    (a, b, c), (d, e, f), (g, h, i) = matrix
+    determinant = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+    return ((e * i - f * h) / determinant, (c * h - b * i) / determinant,
+            (b * f - c * e) / determinant), \
+           ((f * g - d * i) / determinant, (a * i - c * g) / determinant,
+            (c * d - a * f) / determinant), \
+           ((d * h - e * g) / determinant, (b * g - a * h) / determinant,
+            (a * e - b * d) / determinant)
+
+
+def _linear_function(matrix: tuple):
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = matrix
+
+    def apply(values: tuple) -> tuple:
+        x_value, y_value, z_value = values
+        return (m00 * x_value + m01 * y_value + m02 * z_value,
+                m10 * x_value + m11 * y_value + m12 * z_value,
+                m20 * x_value + m21 * y_value + m22 * z_value)
+    return apply
+
+
+def _fuse(steps: list) -> list:
+    """
+    Fuses the steps of a conversion path, multiplying the consecutive matrices together
+    :param steps: The steps of the conversions along the path, in order
+    :return: The list of functions converting the tuple of the components of one color
+    """
+    fused = []
+    for step in steps:
+        if isinstance(step, Linear) and fused and isinstance(fused[-1], Linear):
+            fused[-1] = Linear(_multiply(fused[-1].matrix, step.matrix))
+        else:
+            fused.append(step)
+    return [_linear_function(step.matrix) if isinstance(step, Linear) else step
+            for step in fused]
+
+
+def _to_floats(values: tuple) -> tuple:
+    return tuple(map(float, values))
+
+
+def _chain(functions: list):
+    """
+    :return: A function applying every function in turn
+    """
+    if len(functions) == 1:
+        return functions[0]
+
+    def apply(values: tuple) -> tuple:
+        for function in functions:
+            values = function(values)
+        return values
+    return apply
+
+
+class Transform:
+    """
+    A planned conversion from one space to one or more others. Called with the components of a
+    color, it returns those of the target space, or a namedtuple of every target space (by name)
+    if a tuple of spaces was requested, always as tuples of floats. Paths sharing their
+    beginning only compute it once
+    """
+
+    def __init__(self, source: str, targets):
+        """
+        :param source: The name of the space converted from
+        :param targets: The name of the space converted to, or a tuple of names
+        :raises ValueError: if any of the spaces is unknown or cannot be reached
+        """
+        self.source = source
+        self.targets = targets
+        names = (targets,) if isinstance(targets, str) else tuple(targets)
+        paths = [find_path(source, target) for target in names]
+
+        # The spaces of the paths form a tree rooted at the source. Every space that is a
+        # target or where paths split is computed once; the others are fused into the steps
+        # leading to the next computed space
+        children = {}
+        for path in paths:
+            for space, following in zip(path, path[1:]):
+                children.setdefault(space, set()).add(following)
+        kept = set(names) | {space for space, following in children.items()
+                             if len(following) > 1}
+
+        # Each operation computes a kept space from the closest kept space before it: the index
+        # of that space among the computed ones, then the fused functions
+        slots = {source: 0}
+        self._operations = []
+        for path in paths:
+            start = 0
+            for position in range(1, len(path)):
+                space = path[position]
+                if space not in kept:
+                    continue
+                if space not in slots:
+                    steps = [step for first, second in zip(path[start:position],
+                                                           path[start + 1:position + 1])
+                             for step in _CONVERSIONS[first][second]]
+                    self._operations.append((slots[path[start]], _fuse(steps)))
+                    slots[space] = len(slots)
+                start = position
+        self._slots = [slots[target] for target in names]
+        if source in names:
+            # The source itself is requested: its components (Ex: ints for 'rgb') are returned as
+            # floats, like those of every other space
+            self._operations.append((0, [_to_floats]))
+            self._slots = [len(slots) if target == source else slot
+                           for target, slot in zip(names, self._slots)]
+        self.result_type = None if isinstance(targets, str) else namedtuple('Converted', names)
+
+        if self.result_type is None and len(self._operations) == 1:
+            self._function = _chain(self._operations[0][1])
+        else:
+            self._chained = [(parent, _chain(functions))
+                             for parent, functions in self._operations]
+            self._function = self._apply
+
+    def _apply(self, values: tuple):
+        computed = [values]
+        append = computed.append
+        for parent, function in self._chained:
+            append(function(computed[parent]))
+        if self.result_type is None:
+            return computed[self._slots[0]]
+        return tuple.__new__(self.result_type, [computed[slot] for slot in self._slots])
+
+    def __call__(self, values: tuple):
+        """
+        :param values: The components of a color in the source space
+        :return: Its components in the target space (or a namedtuple of the target spaces)
+        """
+        return self._function(values)
+
+    def many(self, colors) -> list:
+        """
+        Converts a batch of colors, one fused step at a time over the whole batch: calling the
+        steps of the conversion straight from map() costs less than chaining them for each
+        color, at the price of one list of intermediate results per step
+        :param colors: An iterable of tuples of components in the source space
+        :return: A list of the converted colors, in input order
+        """
+        computed = [colors if isinstance(colors, list) else list(colors)]
+        for parent, functions in self._operations:
+            column = computed[parent]
+            for function in functions:
+                column = list(map(function, column))
+            computed.append(column)
+        if self.result_type is None:
+            return computed[self._slots[0]]
+        return list(map(partial(tuple.__new__, self.result_type),
+                        zip(*[computed[slot] for slot in self._slots])))
+
+
+def get_transform(source: str, targets) -> Transform:
+    """
+    Plans (or reuses the plan of) a conversion from one space to one or more others
+    :param source: The name of the space converted from
+    :param targets: The name of the space converted to, or a tuple of names
+    :return: The Transform, cached until another conversion is registered
+    :raises ValueError: if any of the spaces is unknown or cannot be reached
+    """
+    if not isinstance(targets, str):
+        targets = tuple(targets)
+    key = (source, targets)
+    transform = _transforms.get(key)
+    if transform is None:
+        transform = _transforms[key] = Transform(source, targets)
+    return transform
+
+
+def convert_colors(colors, source: str, targets) -> list:
+    """
+    Converts a batch of colors between spaces (see get_transform())
+    :param colors: An iterable of tuples of components in the source space
+    :param source: The name of the space converted from
+    :param targets: The name of the space converted to, or a tuple of names
+    :return: A list of the converted colors, in input order
+    """
+    return get_transform(source, targets).many(colors)
+
+
+# ========== Built-in spaces ==========
+#
+# rgb         sRGB, 0-255 (ints or floats are accepted, floats are returned, and nothing is
+#             clipped: colors outside of the sRGB gamut have components outside of 0-255)
+# hsl         hue 0-360, saturation and lightness 0-100
+# hsv         hue 0-360, saturation and value 0-100
+# hwb         hue 0-360, whiteness and blackness 0-100
+# cmyk        naive (uncalibrated) cyan, magenta, yellow and black, 0-100
+# linear_rgb  linear-light sRGB, 0-1
+# xyz         CIE XYZ (D65), with Y between 0 and 1
+# lab         CIELAB (D65), like rgb_to_lab()
+# oklab       OKLab, with L between 0 and 1
+# oklch       OKLab in polar form: L, chroma and hue 0-360
+
+_RGB_TO_XYZ = ((0.4124564, 0.3575761, 0.1804375),
+               (0.2126729, 0.7151522, 0.0721750),
+               (0.0193339, 0.1191920, 0.9503041))
+
+# Linear sRGB to the LMS cone responses of OKLab, then their cube roots to OKLab
+_RGB_TO_LMS = ((0.4122214708, 0.5363325363, 0.0514459929),
+               (0.2119034982, 0.6806995451, 0.1073969566),
+               (0.0883024619, 0.2817188376, 0.6299787005))
+_LMS_TO_OKLAB = ((0.2104542553, 0.7936177850, -0.0040720468),
+                 (1.9779984951, -2.4285922050, 0.4505937099),
+                 (0.0259040371, 0.7827717662, -0.8086757660))
+
+# Back from OKLab: to the cube roots of the LMS cone responses, then from the LMS responses to
+# linear sRGB
+OKLAB_TO_LMS = _invert(_LMS_TO_OKLAB)
+LMS_TO_LINEAR_RGB = _invert(_RGB_TO_LMS)
+
+
+def _hue(r_value: float, g_value: float, b_value: float, largest: float, chroma: float) -> float:
+    if not chroma:
+        return 0.0
+    if largest == r_value:
+        return 60 * ((g_value - b_value) / chroma % 6)
+    if largest == g_value:
+        return 60 * ((b_value - r_value) / chroma + 2)
+    return 60 * ((r_value - g_value) / chroma + 4)
+
+
+def _hue_to_rgb(h_value: float, chroma: float, base: float) -> tuple:
+    """
+    :return: The RGB (0-255) of a hue with the given chroma, added to the base of every channel
+    """
+    sector = h_value % 360 / 60
+    middle = chroma * (1 - abs(sector % 2 - 1))
+    r_value, g_value, b_value = ((chroma, middle, 0), (middle, chroma, 0), (0, chroma, middle),
+                                 (0, middle, chroma), (middle, 0, chroma),
+                                 (chroma, 0, middle))[int(sector) % 6]
+    return (255 * (r_value + base), 255 * (g_value + base), 255 * (b_value + base))
+
+
+def _rgb_to_hsl(values: tuple) -> tuple:
+    r_value, g_value, b_value = values[0] / 255, values[1] / 255, values[2] / 255
+    largest, smallest = max(r_value, g_value, b_value), min(r_value, g_value, b_value)
+    chroma = largest - smallest
+    l_value = (largest + smallest) / 2
+    s_value = chroma / (1 - abs(2 * l_value - 1)) if chroma else 0.0
+    return _hue(r_value, g_value, b_value, largest, chroma), 100 * s_value, 100 * l_value
+
+
+def _hsl_to_rgb(values: tuple) -> tuple:
+    h_value, s_value, l_value = values[0], values[1] / 100, values[2] / 100
+    chroma = (1 - abs(2 * l_value - 1)) * s_value
+    return _hue_to_rgb(h_value, chroma, l_value - chroma / 2)
+
+
+def _rgb_to_hsv(values: tuple) -> tuple:
+    r_value, g_value, b_value = values[0] / 255, values[1] / 255, values[2] / 255
+    largest = max(r_value, g_value, b_value)
+    chroma = largest - min(r_value, g_value, b_value)
+    return (_hue(r_value, g_value, b_value, largest, chroma),
+            100 * chroma / largest if largest else 0.0, 100 * largest)
+
+
+def _hsv_to_rgb(values: tuple) -> tuple:
+    h_value, s_value, v_value = values[0], values[1] / 100, values[2] / 100
+    chroma = v_value * s_value
+    return _hue_to_rgb(h_value, chroma, v_value - chroma)
+
+
+def _hsv_to_hwb(values: tuple) -> tuple:
+    h_value, s_value, v_value = values
+    return h_value, (100 - s_value) * v_value / 100, 100 - v_value
+
+
+def _hwb_to_hsv(values: tuple) -> tuple:
+    h_value, w_value, b_value = values
+    if w_value + b_value >= 100:
+        # A gray: the whiteness and blackness are scaled down to add up to 100%
+        return h_value, 0.0, 100 * w_value / (w_value + b_value)
+    v_value = 100 - b_value
+    return h_value, 100 - 100 * w_value / v_value, v_value
+
+
+def _rgb_to_cmyk(values: tuple) -> tuple:
+    largest = max(values) / 255
+    if not largest:
+        return 0.0, 0.0, 0.0, 100.0
+    return (100 * (1 - values[0] / 255 / largest), 100 * (1 - values[1] / 255 / largest),
+            100 * (1 - values[2] / 255 / largest), 100 * (1 - largest))
+
+
+def _cmyk_to_rgb(values: tuple) -> tuple:
+    c_value, m_value, y_value, k_value = values
+    white = 255 * (1 - k_value / 100)
+    return (white * (1 - c_value / 100), white * (1 - m_value / 100),
+            white * (1 - y_value / 100))
+
+
+def _decode(value: float) -> float:
+    value /= 255
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4 if value > 0 else -((0.055 - value) / 1.055) ** 2.4
+
+
+def _encode(value: float) -> float:
+    if value <= 0.0031308:
+        return 255 * 12.92 * value if value >= -0.0031308 else -255 * (
+                1.055 * (-value) ** (1 / 2.4) - 0.055)
+    return 255 * (1.055 * value ** (1 / 2.4) - 0.055)
+
+
+# _LINEAR by channel value: integral floats (255.0) find their value as well, since they hash
+# like the ints they are equal to
+_LINEAR_BY_VALUE = dict(enumerate(_LINEAR))
+
+
+def srgb_to_linear(value: float) -> float:
+    """
+    :param value: An sRGB channel value (0-255, or beyond for colors out of the gamut)
+    :return: Its linearized value, between 0 and 1 inside the gamut (looked up in a table for
+             the 256 integer values)
+    """
+    return _LINEAR_BY_VALUE.get(value) or _decode(value)
+
+
+def _rgb_to_linear(values: tuple) -> tuple:
+    r_value, g_value, b_value = values
+    linear = _LINEAR_BY_VALUE.get
+    # 0.0 is not found either way, and decodes to 0.0
+    return (linear(r_value) or _decode(r_value), linear(g_value) or _decode(g_value),
+            linear(b_value) or _decode(b_value))
+
+
+def _linear_to_rgb(values: tuple) -> tuple:
+    return _encode(values[0]), _encode(values[1]), _encode(values[2])
+
+
+def _lab_f_inverse(t: float) -> float:
+    return t ** 3 if t > 6 / 29 else (116 * t - 16) * 27 / 24389
+
+
+def _xyz_to_lab(values: tuple) -> tuple:
+    f_x = _lab_f(values[0] / _WHITE_X)
+    f_y = _lab_f(values[1] / _WHITE_Y)
+    f_z = _lab_f(values[2] / _WHITE_Z)
+    return 116 * f_y - 16, 500 * (f_x - f_y), 200 * (f_y - f_z)
+
+
+def _lab_to_xyz(values: tuple) -> tuple:
+    l_value, a_value, b_value = values
+    f_y = (l_value + 16) / 116
+    return (_WHITE_X * _lab_f_inverse(f_y + a_value / 500), _WHITE_Y * _lab_f_inverse(f_y),
+            _WHITE_Z * _lab_f_inverse(f_y - b_value / 200))
+
+
+def _cube_root(value: float) -> float:
+    return value ** (1 / 3) if value >= 0 else -(-value) ** (1 / 3)
+
+
+# math.cbrt() is only available from Python 3.11
+_cbrt = getattr(math, 'cbrt', _cube_root)
+
+
+def _cube_roots(values: tuple) -> tuple:
+    return _cbrt(values[0]), _cbrt(values[1]), _cbrt(values[2])
+
+
+def _cubes(values: tuple) -> tuple:
+    return values[0] ** 3, values[1] ** 3, values[2] ** 3
+
+
+def _to_polar(values: tuple) -> tuple:
+    l_value, a_value, b_value = values
+    chroma = math.hypot(a_value, b_value)
+    # The hue of a gray is meaningless, it is 0 like the HSL hue of grays
+    hue = math.degrees(math.atan2(b_value, a_value)) % 360 if chroma > 1e-9 else 0.0
+    return l_value, chroma, hue
+
+
+def _from_polar(values: tuple) -> tuple:
+    l_value, chroma, hue = values
+    return l_value, chroma * math.cos(math.radians(hue)), chroma * math.sin(math.radians(hue))
+
+
+for _name, _components in (('rgb', 'rgb'), ('hsl', 'hsl'), ('hsv', 'hsv'), ('hwb', 'hwb'),
+                           ('cmyk', 'cmyk'), ('linear_rgb', 'rgb'), ('xyz', 'xyz'),
+                           ('lab', 'lab'), ('oklab', 'lab'), ('oklch', 'lch')):
+    register_space(_name, _components)
+
+register_conversion('rgb', 'hsl', _rgb_to_hsl)
+register_conversion('hsl', 'rgb', _hsl_to_rgb)
+register_conversion('rgb', 'hsv', _rgb_to_hsv)
+register_conversion('hsv', 'rgb', _hsv_to_rgb)
+register_conversion('hsv', 'hwb', _hsv_to_hwb)
+register_conversion('hwb', 'hsv', _hwb_to_hsv)
+register_conversion('rgb', 'cmyk', _rgb_to_cmyk)
+register_conversion('cmyk', 'rgb', _cmyk_to_rgb)
+register_conversion('rgb', 'linear_rgb', _rgb_to_linear)
+register_conversion('linear_rgb', 'rgb', _linear_to_rgb)
+register_conversion('linear_rgb', 'xyz', Linear(_RGB_TO_XYZ))
+register_conversion('xyz', 'linear_rgb', Linear(_invert(_RGB_TO_XYZ)))
+register_conversion('xyz', 'lab', _xyz_to_lab)
+register_conversion('lab', 'xyz', _lab_to_xyz)
+register_conversion('linear_rgb', 'oklab', Linear(_RGB_TO_LMS), _cube_roots,
+                    Linear(_LMS_TO_OKLAB))
+register_conversion('oklab', 'linear_rgb', Linear(OKLAB_TO_LMS), _cubes, Linear(LMS_TO_LINEAR_RGB))
+register_conversion('oklab', 'oklch', _to_polar)
+register_conversion('oklch', 'oklab', _from_polar)
+del _name, _components
@@ -0,0 +1,286 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+WCAG 2 contrast ratios between the colors of a whole palette. The relative luminance of every
+color is computed once, then the contrast matrix is filled in square tiles of floats, so a part
+of it can be streamed without holding all of it. The contrast of two colors only grows with the
+distance between their luminances, so with the palette sorted by luminance, the pairs above or
+below a ratio (and the AA and AAA pass counts) are found by bisection instead of by trying every
+pair.
+
+Usage: python contrast.py PALETTE [--pairs] [--min RATIO] [--max RATIO] [--matrix] [-o OUTPUT]
+"""
+import argparse
+import csv
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from colorspaces import srgb_to_linear
+from exceptions import InvalidColorError
+from service import convert_many
+
+# The smallest contrast ratio passing each WCAG 2 level (large text is at least 18pt, or 14pt
+# bold)
+LEVELS = {'AA': 4.5, 'AA large': 3.0, 'AAA': 7.0, 'AAA large': 4.5}
+
+# Rows and columns of the tiles of the contrast matrix
+TILE_SIZE = 256
+
+# Two colors of a palette (by index, the first one always comes first) and their contrast ratio
+ContrastPair = namedtuple('ContrastPair', 'first second ratio')
+
+
+def relative_luminance(packed: int) -> float:
+    """
+    :param packed: A color as a packed 0xRRGGBB integer
+    :return: Its WCAG relative luminance, between 0 (black) and 1 (white)
+    """
+    return (0.2126 * srgb_to_linear(packed >> 16) + 0.7152 * srgb_to_linear((packed >> 8) & 0xFF)
+            + 0.0722 * srgb_to_linear(packed & 0xFF))
+
+
+def _check_ratio(ratio: float) -> float:
+    """
+    :raises ValueError: if the ratio is below 1, which no contrast ratio can be
+    """
+    if ratio < 1:
+        raise ValueError(f'A contrast ratio cannot be below 1, got {ratio}!')
+    return ratio
+
+
+def _ratio(first: float, second: float) -> float:
+    """
+    :return: The contrast ratio of two luminances, both already offset by 0.05
+    """
+    return first / second if first >= second else second / first
+
+
+def contrast_ratio(first, second) -> float:
+    """
+    :param first: A color, in any of the forms accepted by convert_many()
+    :param second: Another color
+    :return: Their contrast ratio, between 1 and 21
+    :raises InvalidColorError: if any of the colors is invalid
+    """
+    return ContrastPalette((first, second)).ratio(0, 1)
+
+
+class ContrastPalette:
+    """
+    The contrast ratios between the colors of a palette
+    """
+
+    def __init__(self, colors):
+        """
+        :param colors: An iterable of colors, in any of the forms accepted by convert_many()
+        :raises InvalidColorError: if any of the colors is invalid
+        """
+        if hasattr(colors, 'tolist'):
+            colors = colors.tolist()
+        colors = list(colors)
+        self.colors = list(convert_many(colors).rows()) if colors else []
+        luminances = {}
+        for color in self.colors:
+            packed = color.packed_hex
+            if packed not in luminances:
+                luminances[packed] = relative_luminance(packed) + 0.05
+        # The luminance of every color offset by 0.05, as in the ratios, then the colors from
+        # the darkest to the lightest and their offset luminances
+        self._luminances = array('d', [luminances[color.packed_hex] for color in self.colors])
+        self._order = sorted(range(len(self.colors)), key=self._luminances.__getitem__)
+        self._sorted = array('d', [self._luminances[index] for index in self._order])
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def luminance(self, index: int) -> float:
+        """
+        :return: The relative luminance of a color of the palette
+        """
+        return self._luminances[index] - 0.05
+
+    def ratio(self, first: int, second: int) -> float:
+        """
+        :return: The contrast ratio between two colors of the palette, by index
+        """
+        return _ratio(self._luminances[first], self._luminances[second])
+
+    def tiles(self, tile_size: int = TILE_SIZE):
+        """
+        Computes the contrast matrix tile by tile, row of tiles after row of tiles
+        :param tile_size: The largest number of rows and of columns of a tile
+        :return: A generator of (row, column, tile) tuples: the indexes of the first color of
+                 the rows and of the columns of the tile, and a list of arrays of ratios, one
+                 per row
+        """
+        luminances = self._luminances
+        for row in range(0, len(luminances), tile_size):
+            rows = luminances[row:row + tile_size]
+            for column in range(0, len(luminances), tile_size):
+                columns = luminances[column:column + tile_size]
+                yield row, column, [array('d', [first / second if first >= second
+                                                else second / first for second in columns])
+                                    for first in rows]
+
+    def matrix(self) -> list:
+        """
+        :return: The whole contrast matrix, as a list of arrays of ratios (8 bytes each), one per
+                 color
+        """
+        rows = [array('d') for _ in self._luminances]
+        for row, _, tile in self.tiles():
+            for index, ratios in enumerate(tile, row):
+                rows[index].extend(ratios)
+        return rows
+
+    def pairs(self, minimum: float = None, maximum: float = None):
+        """
+        Lists the pairs of colors within a range of contrast ratios. Only the candidates around
+        the luminances matching the bounds are tried, so the time grows with the number of pairs
+        found, not with the square of the size of the palette
+        :param minimum: The smallest ratio of the pairs (Ex: 4.5 for the pairs passing AA), or
+                        None
+        :param maximum: The ratio every pair is below (Ex: 4.5 for the pairs failing AA), or None
+        :return: A generator of ContrastPair namedtuples, ordered by first then second color
+        :raises ValueError: if a bound is below 1
+        """
+        low = 1.0 if minimum is None else _check_ratio(minimum)
+        if maximum is not None:
+            _check_ratio(maximum)
+        return self._pairs(low, maximum)
+
+    def _pairs(self, low: float, maximum: float):
+        luminances, order, ordered = self._luminances, self._order, self._sorted
+        count = len(ordered)
+        for first, luminance in enumerate(luminances):
+            # The colors darker than this one then the lighter ones, one more on every side for
+            # the rounding of the bounds: the exact ratios decide
+            start = 0 if maximum is None else max(bisect_left(ordered, luminance / maximum) - 1,
+                                                   0)
+            dark_end = min(bisect_right(ordered, luminance / low) + 1, count)
+            light_start = max(bisect_left(ordered, luminance * low) - 1, 0)
+            end = count if maximum is None else min(bisect_right(ordered, luminance * maximum) + 1,
+                                                    count)
+            positions = range(start, end) if light_start <= dark_end else \
+                [*range(start, dark_end), *range(light_start, end)]
+            found = []
+            for position in positions:
+                second = order[position]
+                if second > first:
+                    ratio = _ratio(luminance, ordered[position])
+                    if ratio >= low and (maximum is None or ratio < maximum):
+                        found.append(ContrastPair(first, second, ratio))
+            found.sort()
+            yield from found
+
+    def count(self, minimum: float) -> int:
+        """
+        :param minimum: A contrast ratio
+        :return: The number of pairs of colors with at least that ratio
+        :raises ValueError: if the ratio is below 1
+        """
+        _check_ratio(minimum)
+        ordered = self._sorted
+        count = len(ordered)
+        total = 0
+        for position, luminance in enumerate(ordered):
+            # The first lighter color with the ratio, corrected for the rounding of the product
+            found = bisect_left(ordered, luminance * minimum, position + 1)
+            while found > position + 1 and ordered[found - 1] / luminance >= minimum:
+                found -= 1
+            while found < count and ordered[found] / luminance < minimum:
+                found += 1
+            total += count - found
+        return total
+
+    def report(self) -> dict:
+        """
+        :return: The number of pairs of colors passing each level of LEVELS, by level
+        """
+        counts = {ratio: self.count(ratio) for ratio in set(LEVELS.values())}
+        return {level: counts[ratio] for level, ratio in LEVELS.items()}
+
+
+def _read_palette(path: str) -> list:
+    """
+    :return: The non-empty lines of a file, one color each ('-' for stdin)
+    """
+    file = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        return [line.strip() for line in file if line.strip()]
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def _parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Contrast ratios between the colors of a '
+                                                 'palette, and their WCAG AA and AAA pass counts.')
+    parser.add_argument('palette', help="a file with one color per line ('-' for stdin)")
+    parser.add_argument('--pairs', action='store_true',
+                        help='list the pairs of colors with their ratio instead of the counts')
+    parser.add_argument('--min', type=float, default=None, dest='minimum',
+                        help='only list the pairs with at least this ratio')
+    parser.add_argument('--max', type=float, default=None, dest='maximum',
+                        help='only list the pairs below this ratio')
+    parser.add_argument('--matrix', action='store_true',
+                        help='write the whole contrast matrix as CSV')
+    parser.add_argument('-o', '--output', default='-',
+                        help="the file to write to ('-' for stdout)")
+    args = parser.parse_args(argv)
+    for option, bound in (('--min', args.minimum), ('--max', args.maximum)):
+        if bound is not None and bound < 1:
+            parser.error(f'{option} must be at least 1: no contrast ratio is below 1')
+    return args
+
+
+def main(argv=None) -> int:
+    """
+    Runs the contrast audit from the command line
+    :param argv: The command line arguments (sys.argv[1:] by default)
+    :return: The exit status
+    """
+    args = _parse_arguments(argv)
+    try:
+        palette = ContrastPalette(_read_palette(args.palette))
+    except (InvalidColorError, OSError) as error:
+        print(f'Cannot read {args.palette}: {error}', file=sys.stderr)
+        return 1
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8',
+                                                          newline='')
+    try:
+        writer = csv.writer(output, lineterminator='\n')
+        hexes = [color.hex for color in palette.colors]
+        if args.matrix:
+            writer.writerow(('', *hexes))
+            # One row of tiles at a time
+            row_band = []
+            for row, column, tile in palette.tiles():
+                if column == 0:
+                    row_band = [[hexes[index]] for index in range(row, row + len(tile))]
+                for cells, ratios in zip(row_band, tile):
+                    cells.extend(f'{ratio:.3f}' for ratio in ratios)
+                if column + len(tile[0]) >= len(palette):
+                    writer.writerows(row_band)
+        elif args.pairs or args.minimum is not None or args.maximum is not None:
+            writer.writerow(('first', 'second', 'ratio'))
+            writer.writerows((hexes[pair.first], hexes[pair.second], f'{pair.ratio:.3f}')
+                             for pair in palette.pairs(args.minimum, args.maximum))
+        else:
+            total = len(palette) * (len(palette) - 1) // 2
+            writer.writerow(('level', 'ratio', 'passing pairs', 'failing pairs'))
+            writer.writerows((level, LEVELS[level], passing, total - passing)
+                             for level, passing in palette.report().items())
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Seeded generator of random color inputs, for load tests and fuzzing of the parser and of
+service.convert(). It streams inputs in every format and separator style random_color()
+produces, mixed with edge-case (valid) and invalid inputs at configurable ratios. The same seed
+always gives the same corpus.
+
+Usage: python corpus.py COUNT [-o PATH] [--seed SEED] [--invalid-ratio R] [--edge-ratio R]
+                              [--labels]
+"""
+import random
+import sys
+from itertools import accumulate
+
+from service import COLOR_NAMES, format_name
+
+# The categories of the generated inputs
+CATEGORIES = ('name', 'hex', 'rgb', 'hsl', 'edge', 'invalid')
+
+# Same weights as random_color(): 3 names, 3 hex, 2 RGB and 2 HSL colors out of 10
+_FORMATS = ('name', 'hex', 'rgb', 'hsl')
+_FORMAT_WEIGHTS = (3, 3, 2, 2)
+
+_SEPARATORS = (', ', ',', ' ')
+_SEPARATOR_WEIGHTS = tuple(accumulate((5, 3, 2)))
+
+_FORMATTED_NAMES = tuple(format_name(name) for name in COLOR_NAMES)
+
+# Edge cases that must convert: range limits, short and alpha hex, CSS functions, padding and
+# unusual capitalization
+_EDGE_INPUTS = ('#000', '#FFF', '#fff', '#000000', '#FFFFFF', '000000', 'ffffff', 'FfFfFf',
+                '0, 0, 0', '255, 255, 255', '0 0 0', '255,255,255', '0, 0%, 0%',
+                '360, 100%, 100%', '0, 0.0, 0.0', '360, 1.0, 1.0', '359 100% 50%',
+                'rgb(0, 0, 0)', 'rgb(255,255,255)', 'RGB(255 255 255)', 'rgba(0, 0, 0, 0.5)',
+                'rgba(255 255 255 / 50%)', 'hsl(0, 0%, 0%)', 'hsl(360, 100%, 100%)',
+                'hsla(120, 50%, 50%, 0.25)', '#0000', '#FFFF', '#00000000', '#FFFFFF80',
+                '  red  ', '\tblue', 'LIGHTGOLDENRODYELLOW', 'light goldenrod yellow',
+                'light-goldenrod-yellow', 'lightGoldenrodYellow', 'Light Slate Gray')
+
+# Inputs that must be rejected: out of range values, bad hex digits or lengths, missing or extra
+# components, unknown names and garbage
+_INVALID_INPUTS = ('', '#', '#12', '#12345', '#1234567', '#123456789', '#12345g', '#GGGGGG',
+                   '12345', '1234567', 'gggggg', '256, 0, 0', '0, 0, 256', '300, 300, 300',
+                   '-1, 0, 0', '1, 2', '1, 2, 3, 4, 5', '361, 50%, 50%', '120, 101%, 50%',
+                   '120, 50%, 150%', '120, 1.5, 0.5', 'rgb(1, 2)', 'rgb(1, 2, 3', 'rgb 1, 2, 3',
+                   'hsl(400, 10%, 10%)', 'hsl(120, 50%)', 'not a color', 'reddish',
+                   'bluegreen', '!!!', '0x123456', '#12 34 56', 'rgb()', ', , ,')
+
+_HEX_DIGITS = '0123456789ABCDEF'
+
+
+def _random_name(rng: random.Random) -> str:
+    index = rng.randrange(len(COLOR_NAMES))
+    # Same styles as random_color(): 6 formatted, 3 lowercase and 1 uppercase name out of 10
+    style = rng.randrange(10)
+    if style < 6:
+        return _FORMATTED_NAMES[index]
+    return COLOR_NAMES[index] if style < 9 else COLOR_NAMES[index].upper()
+
+
+def _random_hex(rng: random.Random) -> str:
+    return ('#%06X' if rng.randrange(10) < 7 else '%06X') % rng.getrandbits(24)
+
+
+def _random_separator(rng: random.Random) -> str:
+    return rng.choices(_SEPARATORS, cum_weights=_SEPARATOR_WEIGHTS)[0]
+
+
+def _random_rgb(rng: random.Random) -> str:
+    randrange = rng.randrange
+    return _random_separator(rng).join((str(randrange(256)), str(randrange(256)),
+                                        str(randrange(256))))
+
+
+def _random_percentage(rng: random.Random) -> str:
+    if rng.randrange(10) < 6:
+        return f'{rng.randrange(101)}%'
+    return str(round(rng.random(), 2))
+
+
+def _random_hsl(rng: random.Random) -> str:
+    return _random_separator(rng).join((str(rng.randrange(361)), _random_percentage(rng),
+                                        _random_percentage(rng)))
+
+
+def _random_edge(rng: random.Random) -> str:
+    """
+    Half of the edge cases are picked from a fixed list, the other half are random colors in the
+    less common formats: short hex, hex with alpha and CSS functions
+    """
+    if rng.randrange(2):
+        return rng.choice(_EDGE_INPUTS)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return '#' + ''.join(rng.choice(_HEX_DIGITS) for _ in range(rng.choice((3, 4))))
+    if kind == 1:
+        return '#%08X' % rng.getrandbits(32)
+    if kind == 2:
+        return f'rgb({_random_rgb(rng)})'
+    return f'hsl({_random_hsl(rng)})'
+
+
+def _random_invalid(rng: random.Random) -> str:
+    """
+    Half of the invalid inputs are picked from a fixed list, the other half are random colors
+    with one value pushed out of its range
+    """
+    if rng.randrange(2):
+        return rng.choice(_INVALID_INPUTS)
+    if rng.randrange(2):
+        values = [str(rng.randrange(256)) for _ in range(3)]
+        values[rng.randrange(3)] = str(rng.randrange(256, 1000))
+    else:
+        values = [str(rng.randrange(361)), f'{rng.randrange(101)}%', f'{rng.randrange(101)}%']
+        position = rng.randrange(3)
+        values[position] = str(rng.randrange(361, 1000)) if position == 0 else \
+            f'{rng.randrange(101, 1000)}%'
+    return _random_separator(rng).join(values)
+
+
+_GENERATORS = {'name': _random_name, 'hex': _random_hex, 'rgb': _random_rgb, 'hsl': _random_hsl,
+               'edge': _random_edge, 'invalid': _random_invalid}
+
+
+def generate_labelled_inputs(count: int, seed=None, invalid_ratio: float = 0.0,
+                             edge_ratio: float = 0.0):
+    """
+    Generates random color inputs, along with their category
+    :param count: The number of inputs to generate
+    :param seed: The seed of the generator (the same seed always gives the same inputs)
+    :param invalid_ratio: The share of inputs that must be rejected by convert() (0.0 to 1.0)
+    :param edge_ratio: The share of valid edge-case inputs (0.0 to 1.0)
+    :return: An iterator of (category, input) tuples, the category being one of CATEGORIES
+    :raises ValueError: if the ratios are negative or add up to more than 1
+    """
+    if invalid_ratio < 0 or edge_ratio < 0 or invalid_ratio + edge_ratio > 1:
+        raise ValueError('The ratios must be positive and add up to at most 1!')
+    rng = random.Random(seed)
+    regular = 1 - invalid_ratio - edge_ratio
+    weights = [weight / sum(_FORMAT_WEIGHTS) * regular for weight in _FORMAT_WEIGHTS]
+    cum_weights = list(accumulate(weights + [edge_ratio, invalid_ratio]))
+    generators = [_GENERATORS[category] for category in CATEGORIES]
+
+    # The categories are drawn in blocks, which is much cheaper than one draw per input
+    remaining = count
+    while remaining > 0:
+        block = min(remaining, 4096)
+        for index in rng.choices(range(len(CATEGORIES)), cum_weights=cum_weights, k=block):
+            yield CATEGORIES[index], generators[index](rng)
+        remaining -= block
+
+
+def generate_inputs(count: int, seed=None, invalid_ratio: float = 0.0, edge_ratio: float = 0.0):
+    """
+    Generates random color inputs (see generate_labelled_inputs() for the parameters)
+    :return: An iterator of input strings
+    """
+    return (user_input for _, user_input in
+            generate_labelled_inputs(count, seed, invalid_ratio, edge_ratio))
+
+
+def write_inputs(file, count: int, seed=None, invalid_ratio: float = 0.0,
+                 edge_ratio: float = 0.0, labels: bool = False) -> None:
+    """
+    Writes random color inputs to a text file, one per line
+    :param file: A file object opened for writing
+    :param labels: If True, every line is prefixed by the category of the input and a tab
+    (see generate_labelled_inputs() for the other parameters)
+    """
+    rows = generate_labelled_inputs(count, seed, invalid_ratio, edge_ratio)
+    # Writing in large slices keeps the number of write() calls low for millions of rows
+    lines = []
+    for category, user_input in rows:
+        lines.append(f'{category}\t{user_input}\n' if labels else user_input + '\n')
+        if len(lines) == 8192:
+            file.write(''.join(lines))
+            lines.clear()
+    file.write(''.join(lines))
+
+
+def main(argv=None) -> int:
+    """
+    Runs the generator from the command line
+    :param argv: The command line arguments (sys.argv[1:] by default)
+    :return: The exit status
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generates a reproducible corpus of random '
+                                                 'color inputs, one per line.')
+    parser.add_argument('count', type=int, help='the number of inputs')
+    parser.add_argument('-o', '--output', default='-', help='the output file (default: stdout)')
+    parser.add_argument('--seed', type=int, default=0, help='the seed (default: 0)')
+    parser.add_argument('--invalid-ratio', type=float, default=0.0,
+                        help='the share of invalid inputs (default: 0)')
+    parser.add_argument('--edge-ratio', type=float, default=0.0,
+                        help='the share of edge-case inputs (default: 0)')
+    parser.add_argument('--labels', action='store_true',
+                        help='prefix every line by the category of the input and a tab')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.output == '-':
+            write_inputs(sys.stdout, args.count, args.seed, args.invalid_ratio, args.edge_ratio,
+                         args.labels)
+        else:
+            with open(args.output, 'w', encoding='utf-8', newline='\n') as file:
+                write_inputs(file, args.count, args.seed, args.invalid_ratio, args.edge_ratio,
+                             args.labels)
+    except ValueError as error:
+        parser.error(str(error))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
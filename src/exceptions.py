@@ -12,3 +12,27 @@ class InvalidColorError(Exception):
     Should be caught by the GUI and let the user know of the proper syntax
     """
     pass
+
+
+class InvalidImageError(Exception):
+    """
+    Raised when an image cannot be read for palette extraction, either because it is malformed
+    or because it is not an uncompressed 8-bit PPM, PAM or BMP image
+    """
+    pass
+
+
+class InvalidTableError(Exception):
+    """
+    Raised when a precomputed conversion table is corrupted, truncated or was built by another
+    version of the conversion logic. The conversion then falls back to computing the colors
+    """
+    pass
+
+
+class TaskCancelled(Exception):
+    """
+    Raised inside a background job of the GUI (see worker.WorkerPool) when it is cancelled,
+    to stop it at its next progress report
+    """
+    pass
@@ -9,6 +9,9 @@ APP_TITLE = 'Color Converter v0.1'
 
 EMPTY_CONVERSION = '...'
 
+# Delay (in milliseconds) between the last change of the input and its conversion
+INPUT_DEBOUNCE_MS = 50
+
 # ========== Colors ==========
 
 DISCORD_DARK = '#2C2F33'
@@ -25,9 +28,10 @@ DISCORD_TEXTBOX = '#323539'
 
 CONFIG_FILE = 'settings.config'
 
+CONVERSION_TABLE_FILE = 'conversion_table.bin'
+
+PERSISTENT_CACHE_FILE = 'conversion_cache.sqlite'
+
 # ========== Global Variables ==========
 
 LANGUAGE = None
-
-# TODO: Make complement's complement the original color (sometimes there's a small difference)
-#  Ex: moccasin -> (double complement) -> not moccasin
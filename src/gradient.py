@@ -0,0 +1,299 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Gradients between two or more colors (any input accepted by service.convert()), interpolated in
+RGB, HSL (along the shortest way around the hue circle) or OKLab. A ramp is computed in blocks of
+steps, one whole column of components at a time, and streamed as hex, RGB or HSL rows or as a
+binary lookup table (3 bytes per step), so a ramp of millions of steps never exists as one
+Python object per step.
+
+Usage: python gradient.py STOP STOP [STOP ...] -n STEPS [--space rgb|hsl|oklab]
+                          [-f hex|rgb|hsl|lut] [-o OUTPUT]
+"""
+import argparse
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from colorspaces import LMS_TO_LINEAR_RGB, OKLAB_TO_LMS, get_transform, srgb_to_linear
+from exceptions import InvalidColorError
+from service import color_key, convert, convert_rgb, parse_components
+
+# The spaces a gradient can be interpolated in
+INTERPOLATION_SPACES = ('rgb', 'hsl', 'oklab')
+
+# The outputs of write_gradient(): one row per step (like the columns of service.convert()),
+# or 'lut', the raw bytes of the R, G and B values of every step
+FORMATS = ('hex', 'rgb', 'hsl', 'lut')
+
+# Steps computed at a time, which bounds the memory used by a ramp
+BLOCK_STEPS = 1 << 14
+
+
+def _stop_values(stop, space: str) -> tuple:
+    """
+    :param stop: A color string, a packed 24-bit integer or an (r, g, b) sequence
+    :param space: The interpolation space
+    :return: The components of the stop in that space
+    :raises InvalidColorError: if the stop is not a valid color
+    """
+    kind, value = color_key(stop)
+    source, values = parse_components(value) if kind == 'str' else ('rgb', value)
+    if source == 'hsl' and space != 'hsl':
+        # An HSL color can fall halfway between two RGB values: the gradient goes through the
+        # one shown by convert()
+        packed = convert(value).packed_rgb
+        source, values = 'rgb', (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF)
+    return get_transform(source, space)(values)
+
+
+def _hsl_segment(first: tuple, last: tuple) -> (tuple, tuple):
+    """
+    Prepares two HSL stops for interpolation. A gray (or black or white) has no hue, so it takes
+    the hue of the other stop instead of fading through red, and the hue goes the shortest way
+    around the circle (Ex: from 350 to 10 through 0, not through 180)
+    """
+    first_gray = not first[1] or first[2] in (0, 100)
+    last_gray = not last[1] or last[2] in (0, 100)
+    first_hue, last_hue = first[0], last[0]
+    if first_gray and not last_gray:
+        first_hue = last_hue
+    elif last_gray and not first_gray:
+        last_hue = first_hue
+    last_hue = first_hue + (last_hue - first_hue + 180) % 360 - 180
+    return (first_hue, first[1], first[2]), (last_hue, last[1], last[2])
+
+
+def _rgb_steps(first: tuple, last: tuple, positions: list) -> list:
+    first_0, first_1, first_2 = first
+    delta_0, delta_1, delta_2 = last[0] - first_0, last[1] - first_1, last[2] - first_2
+    # Between two RGB colors, every step is already in 0-255
+    return [(int(first_0 + delta_0 * position + 0.5) << 16)
+            | (int(first_1 + delta_1 * position + 0.5) << 8)
+            | int(first_2 + delta_2 * position + 0.5) for position in positions]
+
+
+# The shifts of the largest, middle and smallest channel of an HSL color, by sector of the hue
+# (60 degrees each, as in colorspaces._hue_to_rgb)
+_SECTOR_SHIFTS = ((16, 8, 0), (8, 16, 0), (8, 0, 16), (0, 8, 16), (0, 16, 8), (16, 0, 8))
+
+
+def _hsl_steps(first: tuple, last: tuple, positions: list) -> list:
+    """
+    Between two multiples of 60 degrees, every channel of an HSL color is the largest, the
+    middle or the smallest one, and the middle one grows (or shrinks) linearly with the hue. So
+    the steps are computed in runs that do not cross such a multiple, with no branch per step
+    """
+    h_first, s_first, l_first = first[0], first[1] / 100, first[2] / 100
+    h_delta, s_delta, l_delta = last[0] - h_first, last[1] / 100 - s_first, \
+        last[2] / 100 - l_first
+    bounds = [0]
+    if h_delta:
+        low, high = sorted((h_first + h_delta * positions[0], h_first + h_delta * positions[-1]))
+        bounds.extend(bisect_left(positions, (60 * multiple - h_first) / h_delta)
+                      for multiple in range(math.floor(low / 60) + 1, math.ceil(high / 60)))
+        if h_delta < 0:
+            bounds[1:] = reversed(bounds[1:])
+    bounds.append(len(positions))
+
+    steps = []
+    for start, end in zip(bounds, bounds[1:]):
+        run = positions[start:end]
+        if not run:
+            continue
+        # The middle of the run decides its sector: its ends may be on the multiples of 60
+        # degrees, where both sectors give the same color
+        sector = math.floor((h_first + h_delta * (run[0] + run[-1]) / 2) / 60)
+        largest, middle, smallest = _SECTOR_SHIFTS[sector % 6]
+        chromas = [(1 - abs(2 * (l_first + l_delta * position) - 1)) * (s_first
+                                                                           + s_delta * position)
+                   for position in run]
+        bases = [l_first + l_delta * position - chroma / 2
+                 for position, chroma in zip(run, chromas)]
+        # The middle channel, from 0 to the chroma in even sectors and back in odd ones
+        offset = sector + sector % 2
+        slope = -1 if sector % 2 else 1
+        middles = [chroma * slope * ((h_first + h_delta * position) / 60 - offset)
+                   for position, chroma in zip(run, chromas)]
+        steps.extend((int(255 * (base + chroma) + 0.5) << largest)
+                     | (int(255 * (base + middle_value) + 0.5) << middle)
+                     | (int(255 * base + 0.5) << smallest)
+                     for base, chroma, middle_value in zip(bases, chromas, middles))
+    return steps
+
+
+# The linear-light values from which each channel value rounds up to the next one, so encoding
+# a linear value to a clipped 0-255 integer is a bisection
+_ENCODING_THRESHOLDS = tuple(srgb_to_linear(value + 0.5) for value in range(255))
+
+
+def _oklab_steps(first: tuple, last: tuple, positions: list) -> list:
+    """
+    The first step back from OKLab is linear, so the roots of the LMS responses are
+    interpolated instead, then every conversion runs on whole columns
+    """
+    (lms_first, lms_last) = [[sum(coefficient * value for coefficient, value in zip(row, color))
+                              for row in OKLAB_TO_LMS] for color in (first, last)]
+    l_first, m_first, s_first = lms_first
+    l_delta, m_delta, s_delta = [b - a for a, b in zip(lms_first, lms_last)]
+    l_column = [(l_first + l_delta * position) ** 3 for position in positions]
+    m_column = [(m_first + m_delta * position) ** 3 for position in positions]
+    s_column = [(s_first + s_delta * position) ** 3 for position in positions]
+
+    # The steps outside of the sRGB gamut are clipped
+    channels = []
+    for (l_weight, m_weight, s_weight), shift in zip(LMS_TO_LINEAR_RGB, (16, 8, 0)):
+        channels.append([bisect_right(_ENCODING_THRESHOLDS, l_weight * l_value
+                                      + m_weight * m_value + s_weight * s_value) << shift
+                         for l_value, m_value, s_value in zip(l_column, m_column, s_column)])
+    return [r_value | g_value | b_value for r_value, g_value, b_value in zip(*channels)]
+
+
+# The interpolation of a run of steps of one segment, by space: called with the components of
+# its two stops and the position of every step between them (0-1), it returns the steps as
+# packed 0xRRGGBB integers
+_STEPS = {'rgb': _rgb_steps, 'hsl': _hsl_steps, 'oklab': _oklab_steps}
+
+
+def ramp(stops, steps: int, space: str = 'rgb', block_steps: int = BLOCK_STEPS):
+    """
+    Computes a gradient through evenly spaced stops, block by block
+    :param stops: At least 2 colors: strings (any format accepted by convert()), packed 24-bit
+                  integers or (r, g, b) sequences
+    :param steps: The number of colors of the gradient, stops included (at least 2)
+    :param space: The interpolation space, any of INTERPOLATION_SPACES
+    :param block_steps: The largest number of steps of a block
+    :return: A generator of arrays of packed 0xRRGGBB integers, which make up the whole
+             gradient in order
+    :raises InvalidColorError: if a stop is not a valid color
+    :raises ValueError: if the space is unknown, or there are too few stops or steps
+    """
+    if space not in INTERPOLATION_SPACES:
+        raise ValueError(f'Unknown interpolation space {space!r}!')
+    stops = [_stop_values(stop, space) for stop in stops]
+    if len(stops) < 2:
+        raise ValueError('A gradient needs at least 2 stops!')
+    if steps < 2:
+        raise ValueError('A gradient needs at least 2 steps!')
+
+    segments = [(first, last) for first, last in zip(stops, stops[1:])]
+    if space == 'hsl':
+        segments = [_hsl_segment(first, last) for first, last in segments]
+    interpolate = _STEPS[space]
+
+    # Step i is in segment s if s <= i * count / intervals < s + 1, with integers only so the
+    # stops fall exactly on their steps
+    count, intervals = len(segments), steps - 1
+    scale = 1 / intervals
+    for block_start in range(0, steps, block_steps):
+        block_end = min(block_start + block_steps, steps)
+        block = array('I')
+        index = block_start
+        while index < block_end:
+            segment = min(index * count // intervals, count - 1)
+            segment_end = block_end if segment == count - 1 else \
+                min(block_end, -(-(segment + 1) * intervals // count))
+            offset = segment * intervals
+            first, last = segments[segment]
+            block.extend(interpolate(first, last, [(step * count - offset) * scale
+                                                   for step in range(index, segment_end)]))
+            index = segment_end
+        yield block
+
+
+def gradient(stops, steps: int, space: str = 'rgb') -> array:
+    """
+    Computes a whole gradient at once (see ramp())
+    :return: An array of the colors of the gradient, as packed 0xRRGGBB integers
+    """
+    colors = array('I')
+    for block in ramp(stops, steps, space):
+        colors.extend(block)
+    return colors
+
+
+def _lut_bytes(block: array) -> bytearray:
+    """
+    :return: The R, G and B bytes of every color of a block of packed 0xRRGGBB integers
+    """
+    colors = array('I', block)
+    if sys.byteorder == 'little':
+        colors.byteswap()
+    data = bytearray(colors.tobytes())
+    # Every big-endian 32-bit integer starts with a zero byte
+    del data[::4]
+    return data
+
+
+def write_gradient(output, stops, steps: int, space: str = 'rgb',
+                   output_format: str = 'hex') -> int:
+    """
+    Streams a gradient to a file (see ramp())
+    :param output: A text file for the rows, or a binary file for 'lut'
+    :param output_format: Any of FORMATS: rows of the hex, rgb or hsl output of convert()
+                          (Ex: '255, 99, 71'), or 'lut' for 3 bytes per step
+    :return: The number of steps written
+    :raises ValueError: if the format is unknown (see ramp() for the other errors)
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f'Unknown gradient format {output_format!r}!')
+    written = 0
+    for block in ramp(stops, steps, space):
+        if output_format == 'lut':
+            output.write(_lut_bytes(block))
+        else:
+            # The steps of a block repeat a few hundred colors at most: each is formatted once
+            rows = {packed: getattr(convert_rgb(packed >> 16, (packed >> 8) & 0xFF,
+                                                 packed & 0xFF), output_format)
+                    for packed in set(block)}
+            output.write('\n'.join(map(rows.__getitem__, block)))
+            output.write('\n')
+        written += len(block)
+    return written
+
+
+def _parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Writes a gradient between two or more colors.')
+    parser.add_argument('stops', nargs='+', metavar='STOP',
+                        help='the colors of the gradient, in any format accepted by the '
+                             'converter (at least 2)')
+    parser.add_argument('-n', '--steps', type=int, required=True,
+                        help='the number of colors of the gradient, stops included')
+    parser.add_argument('-s', '--space', choices=INTERPOLATION_SPACES, default='rgb',
+                        help='the interpolation space (default: rgb)')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='hex',
+                        help='one row per step, or a binary lookup table of 3 bytes per step '
+                             '(default: hex)')
+    parser.add_argument('-o', '--output', default='-',
+                        help="the file to write the gradient to ('-' for stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Writes a gradient from the command line
+    :param argv: The command line arguments (sys.argv[1:] by default)
+    :return: The exit status
+    """
+    args = _parse_arguments(argv)
+    binary = args.format == 'lut'
+    if args.output == '-':
+        output = sys.stdout.buffer if binary else sys.stdout
+    else:
+        output = open(args.output, 'wb') if binary else open(args.output, 'w', encoding='utf-8')
+    try:
+        write_gradient(output, args.stops, args.steps, args.space, args.format)
+    except (InvalidColorError, ValueError) as error:
+        print(f'Cannot write the gradient: {error}', file=sys.stderr)
+        return 1
+    finally:
+        if args.output != '-':
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
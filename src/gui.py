@@ -4,13 +4,85 @@ ColorConverter
 @author: Lung Alin-Sebastian
 
 """
+import os
 import tkinter as tk
-from tkinter import messagebox
 
-from exceptions import InvalidColorError
+from exceptions import InvalidColorError, TaskCancelled
 from globals import APP_TITLE, DISCORD_DARK, DISCORD_DARK_HOVER, DISCORD_LIGHT, \
-    DISCORD_LIGHT_FADED, DISCORD_TEXTBOX, EMPTY_CONVERSION
-from service import change_language, complementary_color, convert, random_color
+    DISCORD_LIGHT_FADED, DISCORD_TEXTBOX, EMPTY_CONVERSION, INPUT_DEBOUNCE_MS
+from service import ConvertedColumns, change_language, complementary_color, convert, random_color
+from worker import WorkerPool
+
+# The files read as images by File>Show palette... (any other file is read as one color per line)
+IMAGE_EXTENSIONS = ('.ppm', '.pnm', '.pam', '.bmp')
+
+
+def _convert_color_file(task, source: str, destination: str) -> (int, int):
+    """
+    Background job converting a file of colors (one per line) to a CSV file, like cli.py.
+    A cancelled conversion leaves no output file behind
+    :param task: The worker.Task of the job
+    :param source: The path of the file of colors
+    :param destination: The path of the CSV file
+    :return: A tuple containing the number of converted and of invalid lines
+    """
+    # Only needed once a file is converted, like the worker threads themselves
+    from cli import WRITE_BUFFER_SIZE, convert_chunk, read_chunks, write_conversions
+
+    total = os.path.getsize(source)
+    try:
+        with open(source, encoding='utf-8') as file, \
+                open(destination, 'w', encoding='utf-8', newline='',
+                     buffering=WRITE_BUFFER_SIZE) as output, \
+                open(os.devnull, 'w') as errors:
+            def chunks():
+                for chunk in read_chunks(file):
+                    yield convert_chunk(chunk)
+                    # The bytes read so far (the file is read ahead a little)
+                    task.report(file.buffer.tell(), total)
+            return write_conversions(chunks(), output, errors)
+    except TaskCancelled:
+        os.remove(destination)
+        raise
+
+
+def _load_palette(task, path: str) -> (ConvertedColumns, int):
+    """
+    Background job reading a palette: the colors of an image, most frequent first, or those of a
+    file of colors (one per line), in order
+    :param task: The worker.Task of the job
+    :param path: The path of the image or of the file of colors
+    :return: A tuple containing the ConvertedColumns of the colors and the number of invalid lines
+    """
+    if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+        from palette import extract_palette
+
+        return ConvertedColumns(entry.color for entry in extract_palette(path, task=task)), 0
+
+    from cli import convert_chunk, read_chunks
+
+    total = os.path.getsize(path)
+    colors = ConvertedColumns()
+    invalid = 0
+    with open(path, encoding='utf-8') as file:
+        for chunk in read_chunks(file):
+            for conversion in convert_chunk(chunk):
+                if conversion.color is None:
+                    invalid += 1
+                else:
+                    colors.append(conversion.color)
+            task.report(file.buffer.tell(), total)
+    return colors, invalid
+
+
+def _describe(error: Exception) -> str:
+    """
+    :param error: The error of a background job
+    :return: Its message, short enough for a notification (Ex: 'No such file or directory')
+    """
+    if isinstance(error, OSError) and error.strerror:
+        return error.strerror
+    return str(error) or type(error).__name__
 
 
 class GUI:
@@ -18,16 +90,27 @@ class GUI:
     The class responsible for the GUI and all of its associated functions
     """
 
-    def __init__(self, master, lang_func):
+    def __init__(self, master, lang_func, debounce_ms: int = INPUT_DEBOUNCE_MS):
         global _
         self.master = master
         _ = lang_func
+        self.debounce_ms = debounce_ms
+        self._pending_conversion = None
+        # The long jobs (Ex: converting a file) run on these threads, never blocking the window
+        self.workers = WorkerPool(self.master)
+        self._file_task = None
+        self._palette_task = None
+        # The palette window (File>Show palette...) and its grid of swatches, once opened
+        self._palette_window = None
+        self._palette_grid = None
 
         self.master.title(APP_TITLE)
         self.master.configure(bg=DISCORD_DARK)
 
         self.master.bind('<Button-1>', self._handle_left_click)
         self.master.bind('<F1>', self._handle_f1)
+        self.master.bind('<Escape>', self._handle_escape)
+        self.master.protocol('WM_DELETE_WINDOW', self._exit)
 
         #
         # Minimum size config
@@ -49,6 +132,7 @@ class GUI:
         self.old_input = _('Enter a color...')
         self.input_textbox.bind('<FocusIn>', self._on_entry_click)
         self.input_textbox.bind('<FocusOut>', self._on_focusout)
+        self.input_value.trace_add('write', self._on_input_change)
 
         #
         # Name output
@@ -100,6 +184,12 @@ class GUI:
         self.color_display = tk.Canvas(self.master, bg=DISCORD_DARK, highlightthickness=0)
         self.color_display.grid(row=0, rowspan=6, column=2, sticky='nsew')
 
+        #
+        # Background job progress (only shown while a job is running)
+        self.progress_value = tk.StringVar(self.master, value='')
+        self.progress_label = tk.Label(self.color_display, textvariable=self.progress_value,
+                                       font=('Verdana', 16), fg=DISCORD_LIGHT, bg=DISCORD_TEXTBOX)
+
         #
         # Action Buttons Canvas
         self.buttons_canvas = tk.Canvas(self.master, bg=DISCORD_DARK, highlightthickness=0)
@@ -152,11 +242,22 @@ class GUI:
                                        activeforeground='white',
                                        activebackground=DISCORD_DARK_HOVER)
 
+        self.file_menu.add_command(label=_('Convert file...'), command=self._convert_file,
+                                   background=DISCORD_DARK, foreground=DISCORD_LIGHT,
+                                   activeforeground='white', activebackground=DISCORD_DARK_HOVER)
+        self.file_menu.add_command(label=_('Cancel conversion (Esc)'),
+                                   command=self._cancel_file_conversion, background=DISCORD_DARK,
+                                   foreground=DISCORD_LIGHT, activeforeground='white',
+                                   activebackground=DISCORD_DARK_HOVER)
+        self.file_menu.add_command(label=_('Show palette...'), command=self._open_palette,
+                                   background=DISCORD_DARK, foreground=DISCORD_LIGHT,
+                                   activeforeground='white', activebackground=DISCORD_DARK_HOVER)
+        self.file_menu.add_separator()
         self.file_menu.add_cascade(label=_('Change Language (requires restart)'),
                                    menu=self.language_menu, background=DISCORD_DARK,
                                    foreground=DISCORD_LIGHT, activeforeground='white',
                                    activebackground=DISCORD_DARK_HOVER)
-        self.file_menu.add_command(label='Exit', command=self.master.quit, background=DISCORD_DARK,
+        self.file_menu.add_command(label='Exit', command=self._exit, background=DISCORD_DARK,
                                    foreground=DISCORD_LIGHT, activeforeground='white',
                                    activebackground=DISCORD_DARK_HOVER)
         self.menu_bar.add_cascade(label=_('File'), menu=self.file_menu, background=DISCORD_DARK,
@@ -197,9 +298,6 @@ class GUI:
 
         self.master.config(menu=self.menu_bar)
 
-        # Initial call of the function. Afterwards it will keep calling itself every 0.5 seconds
-        self.continuous_convert()
-
     def _floating_notification(self, message: str, color: str) -> None:
         """
         Creates a floating notification on the color display for 2 seconds
@@ -239,8 +337,9 @@ class GUI:
                     'blue')
             self.master.clipboard_clear()
             clip = widget_to_clip[event.widget]
+            # The main loop serves the clipboard: update() would run other callbacks (Ex: the
+            # results of the background jobs) from inside this one
             self.master.clipboard_append(clip)
-            self.master.update()
 
     def _generate_random_color(self) -> None:
         """
@@ -252,11 +351,146 @@ class GUI:
         """
         Gets the complementary color and places it in the input entry box
         """
-        if self.hsl_value != EMPTY_CONVERSION:
-            self.input_value.set(complementary_color(self.hsl_value.get()))
+        if self.hex_value.get() != EMPTY_CONVERSION:
+            self.input_value.set(complementary_color(self.hex_value.get()))
         else:
             self._floating_notification(_("No color entered, cannot generate complement!"), 'red')
 
+    def _exit(self) -> None:
+        """
+        Cancels the background jobs, then closes the application
+        """
+        self.workers.shutdown()
+        self.master.quit()
+
+    def _convert_file(self) -> None:
+        """
+        Asks for a file of colors (one per line) and where to save its conversions, then converts
+        it in the background, showing its progress
+        """
+        if self._file_task is not None:
+            self._floating_notification(_('A file is already being converted!'), 'red')
+            return
+        from tkinter import filedialog
+
+        source = filedialog.askopenfilename(title=_('Convert file...'))
+        if not source:
+            return
+        destination = filedialog.asksaveasfilename(title=_('Save the conversions as...'),
+                                                   defaultextension='.csv',
+                                                   filetypes=[('CSV', '*.csv')])
+        if not destination:
+            return
+        name = os.path.basename(source)
+        self._show_progress(_('Converting {0}...').format(name))
+        self._file_task = self.workers.submit(
+                _convert_color_file, source, destination,
+                on_progress=lambda done, total: self._show_progress(
+                        _('Converting {0}: {1:.0%} (Esc to cancel)').format(
+                                name, done / total if total else 1)),
+                on_done=self._on_file_converted, on_error=self._on_file_conversion_error,
+                on_cancelled=self._on_file_conversion_cancelled)
+
+    def _cancel_file_conversion(self) -> None:
+        if self._file_task is not None:
+            self._file_task.cancel()
+        if self._palette_task is not None:
+            self._palette_task.cancel()
+
+    def _show_progress(self, message: str) -> None:
+        self.progress_value.set(message)
+        self.progress_label.grid(row=2, column=0, sticky='s')
+
+    def _end_file_conversion(self, message: str, color: str) -> None:
+        self._file_task = None
+        self.progress_label.grid_remove()
+        self._floating_notification(message, color)
+
+    def _on_file_converted(self, result: (int, int)) -> None:
+        converted, invalid = result
+        self._end_file_conversion(_('{0} colors converted, {1} invalid.').format(converted,
+                                                                                 invalid), 'blue')
+
+    def _on_file_conversion_error(self, error: Exception) -> None:
+        self._end_file_conversion(_('Cannot convert the file: {0}').format(_describe(error)),
+                                  'red')
+
+    def _on_file_conversion_cancelled(self) -> None:
+        self._end_file_conversion(_('Conversion cancelled.'), 'red')
+
+    def _open_palette(self) -> None:
+        """
+        Asks for an image or a file of colors, then reads its colors in the background and shows
+        them in the palette window
+        """
+        if self._palette_task is not None:
+            self._floating_notification(_('A palette is already being read!'), 'red')
+            return
+        from tkinter import filedialog
+
+        path = filedialog.askopenfilename(
+                title=_('Show palette...'),
+                filetypes=[(_('Colors or images'), '*.txt *' + ' *'.join(IMAGE_EXTENSIONS)),
+                           (_('All files'), '*')])
+        if not path:
+            return
+        name = os.path.basename(path)
+        self._show_progress(_('Reading {0}...').format(name))
+        self._palette_task = self.workers.submit(
+                _load_palette, path,
+                on_progress=lambda done, total: self._show_progress(
+                        _('Reading {0}: {1:.0%} (Esc to cancel)').format(
+                                name, done / total if total else 1)),
+                on_done=lambda result: self._on_palette_loaded(name, result),
+                on_error=self._on_palette_error, on_cancelled=self._on_palette_cancelled)
+
+    def _end_palette_loading(self, message: str, color: str) -> None:
+        self._palette_task = None
+        self.progress_label.grid_remove()
+        self._floating_notification(message, color)
+
+    def _on_palette_loaded(self, name: str, result: (ConvertedColumns, int)) -> None:
+        colors, invalid = result
+        colors_count = len(colors.hex)
+        if not colors_count:
+            self._end_palette_loading(_('No colors in {0}!').format(name), 'red')
+            return
+        self._end_palette_loading(_('{0} colors read, {1} invalid.').format(colors_count, invalid),
+                                  'blue')
+        self._show_palette(f'{name} ({colors_count})', colors)
+
+    def _on_palette_error(self, error: Exception) -> None:
+        self._end_palette_loading(_('Cannot read the palette: {0}').format(_describe(error)),
+                                  'red')
+
+    def _on_palette_cancelled(self) -> None:
+        self._end_palette_loading(_('Reading cancelled.'), 'red')
+
+    def _show_palette(self, title: str, colors: ConvertedColumns) -> None:
+        """
+        Shows colors in the palette window, opening it if needed. Clicking a swatch shows its
+        color in the outputs
+        """
+        if self._palette_window is None:
+            # Only needed once a palette is shown
+            from swatches import SwatchGrid
+
+            self._palette_window = tk.Toplevel(self.master, bg=DISCORD_DARK)
+            self._palette_window.geometry('640x480')
+            self._palette_window.grid_rowconfigure(0, weight=1)
+            self._palette_window.grid_columnconfigure(0, weight=1)
+            self._palette_window.protocol('WM_DELETE_WINDOW', self._close_palette)
+            self._palette_window.bind('<Escape>', self._handle_escape)
+            self._palette_grid = SwatchGrid(self._palette_window,
+                                            on_select=lambda index, color: self._show_color(color))
+            self._palette_grid.frame.grid(row=0, column=0, sticky='nsew')
+        self._palette_window.title(f'{APP_TITLE} - {title}')
+        self._palette_grid.set_colors(colors)
+
+    def _close_palette(self) -> None:
+        self._palette_window.destroy()
+        self._palette_window = self._palette_grid = None
+
     # <editor-fold desc="Event Handlers">
     def _on_entry_click(self, event):
         """
@@ -300,6 +534,10 @@ class GUI:
                 # We selected one of the result labels, so we copy the result
                 self._copy_result_to_clipboard(event)
 
+    def _handle_escape(self, event):
+        # Binded to <Escape> for the entire window
+        self._cancel_file_conversion()
+
     @staticmethod
     def _handle_f1(event):
         # Binded to <F1> for the entire window
@@ -315,15 +553,25 @@ class GUI:
         content += _("percentages (with a '%' sign or as a number between 0 and 1)\n")
         content += _('To copy one of the results, simply click on it.')
 
+        from tkinter import messagebox
         messagebox.showinfo(title, content)
 
     # </editor-fold>
 
-    def continuous_convert(self) -> None:
+    def _on_input_change(self, *_args) -> None:
+        """
+        Called whenever the input changes. Schedules a conversion after a short delay, restarting
+        the delay on every change so that fast typing only triggers one conversion
+        """
+        if self._pending_conversion is not None:
+            self.master.after_cancel(self._pending_conversion)
+        self._pending_conversion = self.master.after(self.debounce_ms, self.convert_input)
+
+    def convert_input(self) -> None:
         """
-        Continuously monitors the input textbox and dropdown for changes (every 0.5 seconds)
-        When it detects a change, it updates the conversions
+        Converts the current input and updates the conversions, if the input changed
         """
+        self._pending_conversion = None
         user_input = self.input_value.get()
         if not user_input:
             self.name_value.set(EMPTY_CONVERSION)
@@ -333,16 +581,19 @@ class GUI:
             self.color_display.configure(bg=DISCORD_DARK)
         if user_input != self.old_input and user_input != _('Enter a color...') and user_input:
             self.old_input = user_input
-            print('Change detected, attempting conversion...', end='')
             try:
-                new_color = convert(user_input)
-                self.name_value.set(new_color.name)
-                self.hex_value.set(new_color.hex)
-                self.rgb_value.set(new_color.rgb)
-                self.hsl_value.set(new_color.hsl)
-                self.color_display.configure(bg=new_color.hex)
-            except ValueError:
-                print(' Invalid number or decimal entered.')
-            except InvalidColorError:
-                print(' No format recognized.')
-        self.master.after(500, self.continuous_convert)
+                self._show_color(convert(user_input))
+            except (InvalidColorError, ValueError):
+                # Most likely a color that is still being typed
+                pass
+
+    def _show_color(self, color) -> None:
+        """
+        Shows a color in the outputs and in the color display
+        :param color: A ConvertedColor
+        """
+        self.name_value.set(color.name)
+        self.hex_value.set(color.hex)
+        self.rgb_value.set(color.rgb)
+        self.hsl_value.set(color.hsl)
+        self.color_display.configure(bg=color.hex)
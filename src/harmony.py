@@ -0,0 +1,133 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Color harmonies computed on the numeric RGB values instead of the displayed HSL strings.
+A hue rotation keeps the largest and the smallest channel of a color (so its saturation and
+lightness are unchanged) and only moves the middle one. For multiples of 60 degrees this is
+done with integer operations only, which makes those rotations exact and reversible: the
+complement of the complement is the original color, and so are three triadic steps.
+"""
+from array import array
+
+# The hue rotations (in degrees) of the colors of every harmony, besides the original color.
+# The tetradic harmony is the rectangle one, whose rotations are all multiples of 60 degrees
+SCHEMES = {
+    'complementary': (180,),
+    'triadic': (120, 240),
+    'analogous': (330, 30),
+    'split-complementary': (150, 210),
+    'tetradic': (60, 180, 240),
+}
+
+
+def _rotate_exact(r_value: int, g_value: int, b_value: int, degrees: int) -> (int, int, int):
+    """
+    Rotates the hue by a multiple of 60 degrees: a rotation by 120 degrees moves every channel
+    to the next one, and one by 180 degrees mirrors every channel between the largest and the
+    smallest one
+    """
+    if degrees % 120:
+        total = max(r_value, g_value, b_value) + min(r_value, g_value, b_value)
+        r_value, g_value, b_value = total - r_value, total - g_value, total - b_value
+        degrees -= 180
+    steps = degrees // 120 % 3
+    if steps == 1:
+        return b_value, r_value, g_value
+    if steps == 2:
+        return g_value, b_value, r_value
+    return r_value, g_value, b_value
+
+
+def rotate_hue(rgb, degrees: float) -> (int, int, int):
+    """
+    Rotates the hue of a color, keeping its saturation and lightness
+    :param rgb: The (r, g, b) values of the color (0-255)
+    :param degrees: The rotation, in degrees (exact if it is a multiple of 60)
+    :return: The (r, g, b) values of the rotated color
+    """
+    r_value, g_value, b_value = rgb
+    degrees %= 360
+    if degrees % 60 == 0:
+        return _rotate_exact(r_value, g_value, b_value, int(degrees))
+
+    largest, smallest = max(r_value, g_value, b_value), min(r_value, g_value, b_value)
+    chroma = largest - smallest
+    if not chroma:
+        return r_value, g_value, b_value
+    # The hue in sixths of a turn, as in colour.rgb2hsl
+    if largest == r_value:
+        hue = (g_value - b_value) / chroma % 6
+    elif largest == g_value:
+        hue = (b_value - r_value) / chroma + 2
+    else:
+        hue = (r_value - g_value) / chroma + 4
+    hue = (hue + degrees / 60) % 6
+    middle = int(smallest + chroma * (1 - abs(hue % 2 - 1)) + 0.5)
+    return (
+        (largest, middle, smallest),
+        (middle, largest, smallest),
+        (smallest, largest, middle),
+        (smallest, middle, largest),
+        (middle, smallest, largest),
+        (largest, smallest, middle),
+    )[int(hue)]
+
+
+def harmony(rgb, scheme: str = 'complementary') -> tuple:
+    """
+    :param rgb: The (r, g, b) values of the color (0-255)
+    :param scheme: Any of the keys of SCHEMES
+    :return: A tuple of the (r, g, b) values of the other colors of the harmony
+    :raises KeyError: if the scheme is unknown
+    """
+    return tuple(rotate_hue(rgb, degrees) for degrees in SCHEMES[scheme])
+
+
+def complementary(rgb) -> (int, int, int):
+    """
+    :param rgb: The (r, g, b) values of the color (0-255)
+    :return: The (r, g, b) values of the complementary color
+    """
+    r_value, g_value, b_value = rgb
+    return _rotate_exact(r_value, g_value, b_value, 180)
+
+
+def rotate_hues(colors, degrees: float) -> array:
+    """
+    Rotates the hue of a whole palette. Every distinct color is only rotated once
+    :param colors: An iterable (or NumPy array) of packed 0xRRGGBB integers
+    :param degrees: The rotation, in degrees
+    :return: An array of the rotated colors, as packed 0xRRGGBB integers, in input order
+    """
+    if hasattr(colors, 'tolist'):
+        colors = colors.tolist()
+    rotated = {}
+    results = array('L')
+    append = results.append
+    for packed in colors:
+        result = rotated.get(packed)
+        if result is None:
+            r_value, g_value, b_value = rotate_hue(
+                    (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF), degrees)
+            result = rotated[packed] = (r_value << 16) | (g_value << 8) | b_value
+        append(result)
+    return results
+
+
+def harmonies(colors, scheme: str = 'complementary') -> tuple:
+    """
+    Computes a harmony for a whole palette
+    :param colors: An iterable (or NumPy array) of packed 0xRRGGBB integers
+    :param scheme: Any of the keys of SCHEMES
+    :return: A tuple of arrays of packed 0xRRGGBB integers: one per other color of the harmony,
+             each in input order
+    :raises KeyError: if the scheme is unknown
+    """
+    rotations = SCHEMES[scheme]
+    if hasattr(colors, 'tolist'):
+        colors = colors.tolist()
+    elif len(rotations) > 1:
+        colors = list(colors)
+    return tuple(rotate_hues(colors, degrees) for degrees in rotations)
@@ -0,0 +1,166 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+"""
+import bisect
+import time
+from collections import Counter
+
+# Upper bounds (in seconds) of the histogram buckets: 1, 2 and 5 times every power of ten from
+# 1 microsecond to 1 second. A last, unbounded bucket holds anything slower
+BUCKET_BOUNDS = tuple(factor * 10 ** exponent
+                      for exponent in range(-6, 0) for factor in (1, 2, 5)) + (1,)
+
+
+class Histogram:
+    """
+    A fixed-bucket timing histogram
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Records one duration
+        :param seconds: The duration, in seconds
+        """
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.minimum:
+            self.minimum = seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def as_dict(self) -> dict:
+        """
+        :return: The histogram as a JSON-serializable dict (durations in seconds)
+        """
+        labels = [f'{bound:g}' for bound in BUCKET_BOUNDS] + ['+inf']
+        return {'count': self.count, 'total': self.total,
+                'mean': self.total / self.count if self.count else 0.0,
+                'min': self.minimum if self.count else 0.0, 'max': self.maximum,
+                'buckets': {label: count for label, count in zip(labels, self.buckets) if count}}
+
+
+class Instrumentation:
+    """
+    Counters and timing histograms of the conversions, collected while it is enabled
+    (see service.enable_instrumentation). Nothing is collected, nor costs anything, otherwise
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.histograms = {}
+        self._exporters = []
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Increments a counter
+        :param name: The name of the counter (Ex: 'format.hex')
+        :param amount: How much to add to it
+        """
+        self.counters[name] += amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Records a duration in a histogram
+        :param name: The name of the histogram (Ex: 'stage.detection')
+        :param seconds: The duration, in seconds
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+    def snapshot(self) -> dict:
+        """
+        :return: Every counter and histogram, as a JSON-serializable dict
+        """
+        return {'counters': dict(self.counters),
+                'histograms': {name: histogram.as_dict()
+                               for name, histogram in sorted(self.histograms.items())}}
+
+    def add_exporter(self, exporter) -> None:
+        """
+        Registers a function to be called with the snapshot on every export()
+        :param exporter: A function taking the snapshot dict (Ex: one writing it as JSON)
+        """
+        self._exporters.append(exporter)
+
+    def export(self) -> dict:
+        """
+        Passes the current snapshot to every registered exporter
+        :return: The snapshot
+        """
+        snapshot = self.snapshot()
+        for exporter in self._exporters:
+            exporter(snapshot)
+        return snapshot
+
+    def timer(self) -> 'StageTimer':
+        """
+        :return: A StageTimer timing the stages of one conversion, starting now
+        """
+        return StageTimer(self)
+
+    def reset(self) -> None:
+        """
+        Clears every counter and histogram, keeping the exporters
+        """
+        self.counters.clear()
+        self.histograms.clear()
+
+
+class StageTimer:
+    """
+    Times the consecutive stages of one conversion into an Instrumentation
+    """
+    __slots__ = ('instrumentation', 'start', 'last', 'format')
+
+    def __init__(self, instrumentation: Instrumentation):
+        self.instrumentation = instrumentation
+        self.start = self.last = time.perf_counter()
+        # The format detected, once the input went through the detection
+        self.format = None
+
+    def stage(self, name: str) -> None:
+        """
+        Records the time since the end of the previous stage (or the start)
+        :param name: The name of the stage (Ex: 'detection' for the 'stage.detection' histogram)
+        """
+        now = time.perf_counter()
+        self.instrumentation.observe(f'stage.{name}', now - self.last)
+        self.last = now
+
+    def count(self, name: str) -> None:
+        """
+        Increments a counter of the Instrumentation
+        :param name: The name of the counter (Ex: 'cache.hits')
+        """
+        self.instrumentation.count(name)
+
+    def detected(self, original: str) -> None:
+        """
+        Ends the detection stage
+        :param original: The format detected, or None if the input is invalid
+        """
+        self.stage('detection')
+        self.format = original
+        self.count('invalid' if original is None else f'format.{original}')
+
+    def finish(self) -> None:
+        """
+        Records the total time of the conversion under its format, if it went through the
+        detection
+        """
+        if self.format is not None:
+            self.instrumentation.observe(f'format.{self.format}',
+                                         time.perf_counter() - self.start)
@@ -0,0 +1,154 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+"""
+import heapq
+import math
+
+
+class KDTree:
+    """
+    A k-d tree over points of the same dimension, answering nearest neighbour queries under the
+    Euclidean distance in O(log n) on average. Points can be inserted and removed after it is
+    built: the indexes of the points never change, and the tree is rebuilt (balanced) once the
+    changes outnumber the points it was built with
+    """
+
+    def __init__(self, points):
+        """
+        :param points: A sequence of points (tuples of floats), all of the same dimension
+        """
+        self.points = [tuple(point) for point in points]
+        if not self.points:
+            raise ValueError('Cannot build a k-d tree without any points!')
+        self._dimensions = len(self.points[0])
+        self._removed = set()
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        live = [index for index in range(len(self.points)) if index not in self._removed]
+        self._built_size = len(live)
+        self._changes = 0
+        self._root = self._build(live, 0)
+
+    def _build(self, indices: list, depth: int):
+        if not indices:
+            return None
+        axis = depth % self._dimensions
+        indices.sort(key=lambda index: self.points[index][axis])
+        middle = len(indices) // 2
+        # Each node is a [point index, axis, left subtree, right subtree] list
+        return [indices[middle], axis, self._build(indices[:middle], depth + 1),
+                self._build(indices[middle + 1:], depth + 1)]
+
+    def __len__(self) -> int:
+        return len(self.points) - len(self._removed)
+
+    def _changed(self) -> None:
+        self._changes += 1
+        if self._changes > max(self._built_size, 16):
+            self._rebuild()
+
+    def insert(self, point) -> int:
+        """
+        Adds a point under the leaf it falls into (the tree is rebalanced from time to time)
+        :param point: A point of the same dimension as the tree
+        :return: The index of the new point
+        """
+        point = tuple(point)
+        if len(point) != self._dimensions:
+            raise ValueError(f'Expected a point of dimension {self._dimensions}!')
+        index = len(self.points)
+        self.points.append(point)
+        if self._root is None:
+            self._root = [index, 0, None, None]
+        else:
+            node = self._root
+            while True:
+                axis = node[1]
+                side = 2 if point[axis] < self.points[node[0]][axis] else 3
+                if node[side] is None:
+                    node[side] = [index, (axis + 1) % self._dimensions, None, None]
+                    break
+                node = node[side]
+        self._changed()
+        return index
+
+    def remove(self, index: int) -> None:
+        """
+        Removes a point. It is only skipped by the queries until the next rebuild
+        :param index: The index of the point
+        :raises KeyError: if there is no such point, or it was already removed
+        """
+        if not 0 <= index < len(self.points) or index in self._removed:
+            raise KeyError(index)
+        self._removed.add(index)
+        self._changed()
+
+    def nearest(self, point) -> (int, float):
+        """
+        Finds the point closest to the given one
+        :param point: The query point, of the same dimension as the tree
+        :return: A tuple containing the index of the closest point and its distance
+                 (-1 and infinity if every point was removed)
+        """
+        points, removed = self.points, self._removed
+        best_index, best_distance = -1, float('inf')
+        # Each entry is a subtree and the distance from the query to its splitting plane
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, plane_distance = stack.pop()
+            # The subtree can only hold a closer point if its splitting plane is close enough
+            if node is None or plane_distance >= best_distance:
+                continue
+            index, axis, left, right = node
+            candidate = points[index]
+            distance = math.dist(candidate, point)
+            if distance < best_distance and index not in removed:
+                best_index, best_distance = index, distance
+
+            delta = point[axis] - candidate[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            # The far side is pushed first, so it is explored after the near side has
+            # (hopefully) tightened the bound
+            stack.append((far, abs(delta)))
+            stack.append((near, 0.0))
+        return best_index, best_distance
+
+    def k_nearest(self, point, k: int) -> list:
+        """
+        Finds the k points closest to the given one
+        :param point: The query point, of the same dimension as the tree
+        :param k: The number of points to find, at least 1
+        :return: A list of up to k (index, distance) tuples, from the closest point
+        :raises ValueError: if k is below 1
+        """
+        if k < 1:
+            raise ValueError(f'Cannot find {k} points, k must be at least 1!')
+        points, removed = self.points, self._removed
+        # A max-heap (on the negated distances) of the k best points found so far
+        best = []
+        bound = float('inf')
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, plane_distance = stack.pop()
+            if node is None or plane_distance >= bound:
+                continue
+            index, axis, left, right = node
+            candidate = points[index]
+            distance = math.dist(candidate, point)
+            if distance < bound and index not in removed:
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, index))
+                else:
+                    heapq.heapreplace(best, (-distance, index))
+                if len(best) == k:
+                    bound = -best[0][0]
+
+            delta = point[axis] - candidate[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            stack.append((far, abs(delta)))
+            stack.append((near, 0.0))
+        return [(index, -distance) for distance, index in sorted(best, reverse=True)]
@@ -0,0 +1,204 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Snaps colors to the closest entries of a user palette (brand colors, for example) through k-d
+trees, under the Euclidean distance in RGB, CIE76 or CIEDE2000.
+"""
+from collections import namedtuple
+
+from colorspaces import delta_e_2000, rgb_to_lab
+from kdtree import KDTree
+from service import ConvertedColor, color_key, convert, convert_many
+
+# One result of a nearest color query: the index of the palette entry, its ConvertedColor and
+# its distance from the query
+PaletteMatch = namedtuple('PaletteMatch', 'index color distance')
+
+# The distances Palette can search by: Euclidean in RGB, CIE76 (Euclidean in CIELAB) and CIEDE2000
+DISTANCES = ('rgb', 'cie76', 'ciede2000')
+
+# CIEDE2000 is not a Euclidean distance, so it cannot prune a k-d tree: the k nearest entries
+# are picked among the max(k * CANDIDATE_FACTOR, MIN_CANDIDATES) nearest ones under CIE76
+CANDIDATE_FACTOR = 8
+MIN_CANDIDATES = 32
+
+
+def _packed_color(item) -> int:
+    """
+    :param item: A color string, a packed 24-bit integer or an (r, g, b) sequence
+    :return: The color as a packed 0xRRGGBB integer
+    :raises InvalidColorError: if the item is not a valid color
+    """
+    kind, value = color_key(item)
+    if kind == 'str':
+        return convert(value).packed_hex
+    r_value, g_value, b_value = value
+    return (r_value << 16) | (g_value << 8) | b_value
+
+
+class Palette:
+    """
+    A user palette, answering k-nearest queries in O(log n) on average. The entries keep their
+    index for as long as they are in the palette, even when others are added or removed. The
+    k-d tree of each color space (RGB, or CIELAB for CIE76 and CIEDE2000) is only built on its
+    first query, then kept up to date
+    """
+
+    def __init__(self, colors=(), distance: str = 'cie76'):
+        """
+        :param colors: An iterable of colors, in any of the forms accepted by convert_many()
+        :param distance: The default distance of the queries, any of DISTANCES
+        :raises InvalidColorError: if any of the colors is invalid
+        :raises ValueError: if the distance is unknown
+        """
+        self.distance = self._check_distance(distance)
+        # The ConvertedColor of every entry (None once removed) and its (r, g, b) point
+        self._colors = []
+        self._points = []
+        self._trees = {}
+        if hasattr(colors, 'tolist'):
+            colors = colors.tolist()
+        colors = list(colors)
+        if colors:
+            for color in convert_many(colors).rows():
+                self._append(color)
+
+    @staticmethod
+    def _check_distance(distance: str) -> str:
+        if distance not in DISTANCES:
+            raise ValueError(f'Unknown distance {distance!r}, expected one of {DISTANCES}!')
+        return distance
+
+    def _append(self, color: ConvertedColor) -> int:
+        packed = color.packed_hex
+        self._colors.append(color)
+        self._points.append((packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF))
+        return len(self._colors) - 1
+
+    def __len__(self) -> int:
+        return len(self._colors) - self._colors.count(None)
+
+    def __getitem__(self, index: int) -> ConvertedColor:
+        color = self._colors[index] if 0 <= index < len(self._colors) else None
+        if color is None:
+            raise KeyError(index)
+        return color
+
+    def __iter__(self):
+        """
+        :return: An iterator of (index, ConvertedColor) tuples of the entries
+        """
+        return ((index, color) for index, color in enumerate(self._colors) if color is not None)
+
+    def add(self, color) -> int:
+        """
+        Adds an entry
+        :param color: A color, in any of the forms accepted by convert_many()
+        :return: The index of the new entry
+        :raises InvalidColorError: if the color is invalid
+        """
+        index = self._append(convert_many([color]).row(0))
+        for space, tree in self._trees.items():
+            point = self._points[index]
+            tree.insert(rgb_to_lab(*point) if space == 'lab' else point)
+        return index
+
+    def remove(self, index: int) -> None:
+        """
+        Removes an entry
+        :param index: The index of the entry, as returned by add() or found by a query
+        :raises KeyError: if there is no such entry
+        """
+        if not 0 <= index < len(self._colors) or self._colors[index] is None:
+            raise KeyError(index)
+        self._colors[index] = None
+        for tree in self._trees.values():
+            tree.remove(index)
+
+    def _tree(self, space: str) -> KDTree:
+        """
+        :return: The k-d tree of a color space ('rgb' or 'lab'), or None if the palette is empty
+        """
+        tree = self._trees.get(space)
+        if tree is None and self._points:
+            points = self._points if space == 'rgb' else \
+                [rgb_to_lab(*point) for point in self._points]
+            tree = self._trees[space] = KDTree(points)
+            for index, color in enumerate(self._colors):
+                if color is None:
+                    tree.remove(index)
+        return tree
+
+    def _nearest_points(self, rgb: tuple, k: int, distance: str) -> list:
+        """
+        :return: A list of up to k (index, distance) tuples, from the closest entry (only
+                 approximately the closest ones under CIEDE2000)
+        """
+        tree = self._tree('rgb' if distance == 'rgb' else 'lab')
+        if tree is None:
+            return []
+        if distance == 'rgb':
+            return tree.k_nearest(rgb, k)
+        lab = rgb_to_lab(*rgb)
+        if distance == 'cie76':
+            return tree.k_nearest(lab, k)
+        points = tree.points
+        candidates = tree.k_nearest(lab, max(k * CANDIDATE_FACTOR, MIN_CANDIDATES))
+        return sorted(((index, delta_e_2000(lab, points[index])) for index, _ in candidates),
+                      key=lambda candidate: candidate[1])[:k]
+
+    @staticmethod
+    def _check_k(k: int) -> int:
+        if k < 1:
+            raise ValueError(f'Cannot find {k} entries, k must be at least 1!')
+        return k
+
+    def nearest(self, color, k: int = 1, distance: str = None) -> list:
+        """
+        Finds the entries closest to a color. Under CIEDE2000 the result is approximate: the
+        entries are ranked among the nearest candidates under CIE76, which can (rarely) miss
+        the closest one
+        :param color: A color, in any of the forms accepted by convert_many()
+        :param k: The number of entries to find, at least 1
+        :param distance: Any of DISTANCES (the palette's default distance if None)
+        :return: A list of up to k PaletteMatch namedtuples, from the closest entry (exact under
+                 RGB and CIE76)
+        :raises InvalidColorError: if the color is invalid
+        :raises ValueError: if k is below 1 or the distance is unknown
+        """
+        self._check_k(k)
+        packed = _packed_color(color)
+        distance = self._check_distance(distance or self.distance)
+        return [PaletteMatch(index, self._colors[index], found_distance)
+                for index, found_distance in self._nearest_points(
+                        (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF), k, distance)]
+
+    def nearest_many(self, colors, k: int = 1, distance: str = None) -> list:
+        """
+        Finds the entries closest to a whole column of colors. Each distinct color is only
+        looked up once. Approximate under CIEDE2000, as in nearest()
+        :param colors: An iterable of colors, in any of the forms accepted by convert_many()
+        :param k: The number of entries to find per color, at least 1
+        :param distance: Any of DISTANCES (the palette's default distance if None)
+        :return: A list (in input order) of lists of up to k PaletteMatch namedtuples
+        :raises InvalidColorError: if any of the colors is invalid
+        :raises ValueError: if k is below 1 or the distance is unknown
+        """
+        self._check_k(k)
+        distance = self._check_distance(distance or self.distance)
+        if hasattr(colors, 'tolist'):
+            colors = colors.tolist()
+        found = {}
+        results = []
+        for item in colors:
+            packed = _packed_color(item)
+            matches = found.get(packed)
+            if matches is None:
+                matches = found[packed] = [
+                    PaletteMatch(index, self._colors[index], found_distance)
+                    for index, found_distance in self._nearest_points(
+                            (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF), k, distance)]
+            results.append(matches)
+        return results
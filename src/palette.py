@@ -0,0 +1,236 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Palette extraction from uncompressed images (binary PPM, PAM and BMP). The file is memory-mapped
+and the pixels are counted as packed 24-bit integers straight from the mapped bytes, so the
+image is never turned into one Python object per pixel.
+
+Usage: python palette.py IMAGE [--top N] [-f csv|jsonl] [-o OUTPUT]
+"""
+import argparse
+import csv
+import json
+import mmap
+import re
+import struct
+import sys
+from collections import Counter, namedtuple
+
+from exceptions import InvalidImageError
+from service import ConvertedColor, convert_many
+
+# Pixels counted at a time, which bounds the size of the intermediate buffer
+CHUNK_PIXELS = 1 << 20
+
+# Distinct colors converted at a time when extracting a palette for a job that can be cancelled
+CONVERT_BLOCK = 1 << 16
+
+PaletteEntry = namedtuple('PaletteEntry', 'color count')
+
+# Where the pixels are in the file: the offset of the first row, the size in bytes of a row
+# and of a pixel, and the offset of each channel inside a pixel
+_PixelLayout = namedtuple('_PixelLayout', 'offset width height row_stride pixel_size red green blue')
+
+_PNM_TOKEN_PATTERN = re.compile(rb'(?:\s|#[^\n]*\n)*(\S+)')
+
+# Position of each channel inside a packed native 'I' integer, so that it reads as 0xRRGGBB
+_RED, _GREEN, _BLUE = (2, 1, 0) if sys.byteorder == 'little' else (1, 2, 3)
+
+
+def _ppm_layout(data) -> _PixelLayout:
+    """
+    Reads the header of a binary PPM (P6) image
+    """
+    values = []
+    position = 2
+    for _ in range(3):
+        match = _PNM_TOKEN_PATTERN.match(data, position)
+        if match is None or not match.group(1).isdigit():
+            raise InvalidImageError('Malformed PPM header!')
+        values.append(int(match.group(1)))
+        position = match.end()
+    width, height, max_value = values
+    if max_value != 255:
+        raise InvalidImageError('Only 8-bit PPM images (with a maximum value of 255) are supported!')
+    # A single whitespace character separates the header from the pixels
+    return _PixelLayout(position + 1, width, height, 3 * width, 3, 0, 1, 2)
+
+
+def _pam_layout(data) -> _PixelLayout:
+    """
+    Reads the header of a PAM (P7) image
+    """
+    end = bytes(data[:4096]).find(b'ENDHDR\n')
+    if end == -1:
+        raise InvalidImageError('Malformed PAM header!')
+    header = {}
+    for line in bytes(data[3:end]).decode('ascii', 'replace').splitlines():
+        if line and not line.startswith('#'):
+            key, _, value = line.partition(' ')
+            header[key] = value.strip()
+    try:
+        width, height = int(header['WIDTH']), int(header['HEIGHT'])
+        depth, max_value = int(header['DEPTH']), int(header['MAXVAL'])
+    except (KeyError, ValueError):
+        raise InvalidImageError('Malformed PAM header!')
+    if depth not in (3, 4) or max_value != 255:
+        raise InvalidImageError('Only 8-bit RGB and RGB_ALPHA PAM images are supported!')
+    return _PixelLayout(end + 7, width, height, depth * width, depth, 0, 1, 2)
+
+
+def _bmp_layout(data) -> _PixelLayout:
+    """
+    Reads the header of an uncompressed 24 or 32-bit BMP image
+    """
+    if len(data) < 34:
+        raise InvalidImageError('Malformed BMP header!')
+    offset, = struct.unpack_from('<I', data, 10)
+    width, height, _, bits, compression = struct.unpack_from('<iiHHI', data, 18)
+    if bits not in (24, 32) or compression != 0:
+        raise InvalidImageError('Only uncompressed 24 and 32-bit BMP images are supported!')
+    # Rows are padded to a multiple of 4 bytes. Their order doesn't matter for counting
+    pixel_size = bits // 8
+    row_stride = (pixel_size * width + 3) // 4 * 4
+    return _PixelLayout(offset, width, abs(height), row_stride, pixel_size, 2, 1, 0)
+
+
+_LAYOUT_READERS = {b'P6': _ppm_layout, b'P7': _pam_layout, b'BM': _bmp_layout}
+
+
+def _count_pixels(data, layout: _PixelLayout, chunk_pixels: int, task=None) -> Counter:
+    """
+    Counts the colors of the pixels, a block of rows at a time. Each block is rearranged into a
+    buffer of native 32-bit integers by strided slice assignments, which run in C
+    """
+    width, height, row_stride, pixel_size = (layout.width, layout.height, layout.row_stride,
+                                             layout.pixel_size)
+    if layout.offset + height * row_stride > len(data):
+        raise InvalidImageError('The image is truncated!')
+
+    counts = Counter()
+    if not width or not height:
+        return counts
+    rows_per_block = max(1, chunk_pixels // width)
+    buffer = memoryview(bytearray(4 * width * rows_per_block))
+    packed = buffer.cast('I')
+    row_size = width * pixel_size
+    channels = ((_RED, layout.red), (_GREEN, layout.green), (_BLUE, layout.blue))
+
+    for first_row in range(0, height, rows_per_block):
+        rows = min(rows_per_block, height - first_row)
+        start = layout.offset + first_row * row_stride
+        if row_stride == row_size:
+            # Unpadded rows: the whole block is one contiguous run of pixels
+            pieces = [(data[start:start + rows * row_size], buffer[:4 * rows * width])]
+        else:
+            pieces = [(data[start + row * row_stride:start + row * row_stride + row_size],
+                       buffer[4 * row * width:4 * (row + 1) * width]) for row in range(rows)]
+        for source, target in pieces:
+            for target_channel, source_channel in channels:
+                target[target_channel::4] = source[source_channel::pixel_size]
+        # No view of the map may outlive the block: a cancelled task raises in report(), and
+        # the map cannot be closed while the traceback holds one
+        del pieces, source
+        counts.update(packed[:rows * width])
+        if task is not None:
+            task.report((first_row + rows) * width, height * width)
+    return counts
+
+
+def count_colors(path: str, chunk_pixels: int = CHUNK_PIXELS, task=None) -> Counter:
+    """
+    Counts the distinct colors of an image, ignoring any alpha channel
+    :param path: The path of a binary PPM (P6), PAM (P7) or uncompressed BMP image
+    :param chunk_pixels: Roughly how many pixels are counted at a time
+    :param task: If given, the worker.Task of a background job: the pixels counted are reported
+                 to it after every block, and counting stops there if it is cancelled
+    :return: A Counter mapping each color (as a packed 0xRRGGBB integer) to its number of pixels
+    :raises InvalidImageError: if the image is malformed or in an unsupported format
+    :raises TaskCancelled: if the task is cancelled
+    """
+    with open(path, 'rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise InvalidImageError('The image is empty!')
+    with mapped, memoryview(mapped) as data:
+        reader = _LAYOUT_READERS.get(bytes(data[:2]))
+        if reader is None:
+            raise InvalidImageError('Only binary PPM (P6), PAM (P7) and BMP images are supported!')
+        return _count_pixels(data, reader(data), chunk_pixels, task)
+
+
+def extract_palette(path: str, top: int = None, task=None) -> list:
+    """
+    Extracts the palette of an image. Only the distinct colors are converted, not every pixel
+    :param path: The path of a binary PPM (P6), PAM (P7) or uncompressed BMP image
+    :param top: If given, only the top N most frequent colors are returned
+    :param task: If given, the worker.Task of a background job (see count_colors), also checked
+                 for cancellation between blocks of the conversion of the distinct colors
+    :return: A list of PaletteEntry namedtuples (ConvertedColor and pixel count),
+             from the most to the least frequent color
+    :raises InvalidImageError: if the image is malformed or in an unsupported format
+    :raises TaskCancelled: if the task is cancelled
+    """
+    most_common = count_colors(path, task=task).most_common(top)
+    if not most_common:
+        return []
+    packed_colors, counts = zip(*most_common)
+    if task is None:
+        columns = convert_many(packed_colors)
+        return [PaletteEntry(color, count) for color, count in zip(columns.rows(), counts)]
+    entries = []
+    for start in range(0, len(packed_colors), CONVERT_BLOCK):
+        task.check()
+        columns = convert_many(packed_colors[start:start + CONVERT_BLOCK])
+        entries.extend(map(PaletteEntry, columns.rows(), counts[start:start + CONVERT_BLOCK]))
+    return entries
+
+
+def _parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Lists the colors of an image, most frequent '
+                                                 'first, with their name, hex, RGB and HSL values.')
+    parser.add_argument('image', help='a binary PPM (P6), PAM (P7) or uncompressed BMP image')
+    parser.add_argument('-n', '--top', type=int, default=None,
+                        help='only list the N most frequent colors')
+    parser.add_argument('-f', '--format', choices=('csv', 'jsonl'), default='csv',
+                        help='the output format (default: csv)')
+    parser.add_argument('-o', '--output', default='-',
+                        help="the file to write the palette to ('-' for stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the palette extraction from the command line
+    :param argv: The command line arguments (sys.argv[1:] by default)
+    :return: The exit status
+    """
+    args = _parse_arguments(argv)
+    try:
+        palette = extract_palette(args.image, args.top)
+    except (InvalidImageError, OSError) as error:
+        print(f'Cannot read {args.image}: {error}', file=sys.stderr)
+        return 1
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8',
+                                                          newline='')
+    try:
+        if args.format == 'csv':
+            writer = csv.writer(output, lineterminator='\n')
+            writer.writerow(('count',) + ConvertedColor._fields)
+            writer.writerows((entry.count, *(value or '' for value in entry.color))
+                             for entry in palette)
+        else:
+            output.writelines(json.dumps({'count': entry.count, **entry.color._asdict()}) + '\n'
+                              for entry in palette)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Exact RGB <-> HSL conversions with integer arithmetic, used by service.convert() instead of
+the float conversions of colour.Color. Every result is computed as an exact fraction and
+rounded once, half up, to the displayed precision: whole degrees and percentages for HSL,
+0-255 channels for RGB. Saturation and lightness inputs are read as fixed-point numbers with
+4 decimals (hundredths of a percent).
+"""
+
+# Fixed-point scale of the saturation and lightness inputs
+HSL_SCALE = 10000
+
+
+def rgb_to_hsl(r_value: int, g_value: int, b_value: int) -> (int, int, int):
+    """
+    :param r_value: The red value (0-255)
+    :param g_value: The green value (0-255)
+    :param b_value: The blue value (0-255)
+    :return: The displayed hue (0-359 degrees), saturation and lightness (0-100 percent),
+             each rounded half up
+    """
+    largest = max(r_value, g_value, b_value)
+    smallest = min(r_value, g_value, b_value)
+    total = largest + smallest
+    # L = total / 510, so 100 * L rounded half up is (200 * total + 510) // 1020
+    lightness = (200 * total + 510) // 1020
+
+    chroma = largest - smallest
+    if not chroma:
+        return 0, 0, lightness
+    # S = chroma / (255 - |total - 255|)
+    divisor = 255 - abs(total - 255)
+    saturation = (200 * chroma + divisor) // (2 * divisor)
+
+    # The hue in sixths of a turn is sixths / chroma, between 0 and 6
+    if largest == r_value:
+        sixths = (g_value - b_value) % (6 * chroma)
+    elif largest == g_value:
+        sixths = b_value - r_value + 2 * chroma
+    else:
+        sixths = r_value - g_value + 4 * chroma
+    hue = (120 * sixths + chroma) // (2 * chroma) % 360
+    return hue, saturation, lightness
+
+
+def hsl_to_rgb(h_value: float, s_value: float, l_value: float) -> (int, int, int):
+    """
+    :param h_value: The hue, in degrees (any value, taken modulo 360)
+    :param s_value: The saturation (0.0-1.0)
+    :param l_value: The lightness (0.0-1.0)
+    :return: The (r, g, b) values (0-255), each rounded half up
+    """
+    # Hundredths of a degree, in the 0-36000 range
+    hue = round(h_value * 100) % 36000
+    saturation = round(s_value * HSL_SCALE)
+    lightness = round(l_value * HSL_SCALE)
+
+    # Every value below is a numerator over HSL_SCALE ** 2 * 12000:
+    # chroma = (1 - |2L - 1|) * S, the largest channel is L + chroma / 2, the smallest one is
+    # L - chroma / 2 and the middle one moves between them with the hue
+    chroma = (HSL_SCALE - abs(2 * lightness - HSL_SCALE)) * saturation * 12000
+    base = lightness * HSL_SCALE * 12000
+    largest = base + chroma // 2
+    smallest = base - chroma // 2
+    middle = smallest + chroma * (6000 - abs(hue % 12000 - 6000)) // 6000
+    denominator = HSL_SCALE * HSL_SCALE * 12000
+
+    # 255 * value / denominator, rounded half up
+    largest, middle, smallest = ((510 * value + denominator) // (2 * denominator)
+                                 for value in (largest, middle, smallest))
+    return (
+        (largest, middle, smallest),
+        (middle, largest, smallest),
+        (smallest, largest, middle),
+        (smallest, middle, largest),
+        (middle, smallest, largest),
+        (largest, smallest, middle),
+    )[hue // 6000]
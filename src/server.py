@@ -0,0 +1,238 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+A small local HTTP/1.1 conversion service built on asyncio, with keep-alive connections and
+a bounded number of requests handled at once. Endpoints:
+
+    GET  /convert?color=<color>    converts one color
+    POST /convert                  converts the color in the body (plain text)
+    POST /batch                    converts a JSON array of colors, or one color per line
+
+Usage: python server.py [--host HOST] [--port PORT] [--max-concurrent N]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from exceptions import InvalidColorError
+from service import convert
+
+DEFAULT_PORT = 8765
+
+MAX_HEADER_SIZE = 16 * 1024
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Seconds a keep-alive connection may stay idle before it is closed
+IDLE_TIMEOUT = 30
+
+# Colors of a batch converted between two yields to the event loop
+BATCH_SLICE = 1000
+
+
+class HTTPError(Exception):
+    """
+    Raised while handling a request to answer it with an error status and a JSON body
+    """
+
+    def __init__(self, status: HTTPStatus, message: str, error_type: str = None):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type or status.phrase.replace(' ', '')
+
+
+def _converted_dict(user_input: str) -> dict:
+    """
+    Converts one color for a JSON response
+    :raises InvalidColorError: if the color is invalid
+    """
+    color = convert(user_input)
+    return {'input': user_input, **color._asdict()}
+
+
+def _error_dict(error_type: str, message: str) -> dict:
+    return {'error': {'type': error_type, 'message': message}}
+
+
+def _handle_convert(method: str, query: dict, body: bytes) -> dict:
+    if method == 'GET':
+        colors = query.get('color')
+        if not colors:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing the 'color' query parameter!")
+        user_input = colors[0]
+    else:
+        user_input = body.decode('utf-8', 'replace')
+    try:
+        return _converted_dict(user_input)
+    except (InvalidColorError, ValueError) as error:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, str(error), type(error).__name__)
+
+
+async def _handle_batch(body: bytes) -> list:
+    text = body.decode('utf-8', 'replace')
+    if text.lstrip().startswith('['):
+        try:
+            colors = json.loads(text)
+        except ValueError as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f'Invalid JSON array: {error}')
+        if not all(isinstance(color, str) for color in colors):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'The JSON array must only contain strings!')
+    else:
+        colors = [line for line in text.splitlines() if line.strip()]
+
+    results = []
+    for position, user_input in enumerate(colors, start=1):
+        try:
+            results.append(_converted_dict(user_input))
+        except (InvalidColorError, ValueError) as error:
+            results.append({'input': user_input, **_error_dict(type(error).__name__, str(error))})
+        if position % BATCH_SLICE == 0:
+            # Lets the other connections progress during a long batch
+            await asyncio.sleep(0)
+    return results
+
+
+class ConversionServer:
+    """
+    The HTTP server. At most max_concurrent requests are handled at once: past that, the
+    connections wait before their next request is even read, so the clients are slowed down
+    by TCP instead of the server queueing unbounded work
+    """
+
+    def __init__(self, max_concurrent: int = 64):
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """
+        Serves the requests of one connection until it is closed or stays idle for too long
+        """
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                        _error_dict('HeadersTooLarge', 'Headers too large!'),
+                                        False)
+                    break
+                async with self._slots:
+                    keep_alive = await self._handle_request(head, reader, writer)
+        finally:
+            writer.close()
+
+    async def _handle_request(self, head: bytes, reader: asyncio.StreamReader,
+                              writer: asyncio.StreamWriter) -> bool:
+        """
+        Reads the body of a request, answers it and tells whether the connection is kept alive
+        """
+        try:
+            request_line, *header_lines = head.decode('latin-1').split('\r\n')
+            method, target, version = request_line.split(' ')
+        except ValueError:
+            await self._respond(writer, HTTPStatus.BAD_REQUEST,
+                                _error_dict('BadRequest', 'Malformed request line!'), False)
+            return False
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+        try:
+            if 'transfer-encoding' in headers:
+                raise HTTPError(HTTPStatus.LENGTH_REQUIRED,
+                                'Chunked bodies are not supported, send a Content-Length!')
+            # Only digits: int() would also take a sign, spaces or '_', and a negative length
+            # makes readexactly() raise
+            length = headers.get('content-length', '0')
+            if not (length.isascii() and length.isdigit()):
+                # Where the body ends is unknown, so the connection cannot be reused
+                keep_alive = False
+                raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid Content-Length!')
+            length = int(length)
+            if length > MAX_BODY_SIZE:
+                keep_alive = False
+                raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                f'The body cannot exceed {MAX_BODY_SIZE} bytes!')
+            body = await reader.readexactly(length) if length else b''
+
+            url = urlsplit(target)
+            if url.path == '/convert' and method in ('GET', 'POST'):
+                payload = _handle_convert(method, parse_qs(url.query), body)
+            elif url.path == '/batch' and method == 'POST':
+                payload = await _handle_batch(body)
+            elif url.path in ('/convert', '/batch'):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f'{method} is not allowed here!')
+            else:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f'No endpoint at {url.path}!')
+            status = HTTPStatus.OK
+        except HTTPError as error:
+            status, payload = error.status, _error_dict(error.error_type, str(error))
+        except asyncio.IncompleteReadError:
+            return False
+
+        await self._respond(writer, status, payload, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, payload,
+                       keep_alive: bool) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        writer.write(f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                     f'Content-Type: application/json\r\n'
+                     f'Content-Length: {len(body)}\r\n'
+                     f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+                     .encode('latin-1') + body)
+        # Waits for the client to read the response if the write buffer is full
+        await writer.drain()
+
+
+async def serve(host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                max_concurrent: int = 64) -> None:
+    """
+    Runs the conversion server until it is cancelled
+    :param host: The address to listen on (only the local machine by default)
+    :param port: The port to listen on
+    :param max_concurrent: The maximum number of requests handled at once
+    """
+    server = ConversionServer(max_concurrent)
+    listener = await asyncio.start_server(server.handle_connection, host, port,
+                                          limit=MAX_HEADER_SIZE)
+    async with listener:
+        print(f'Serving conversions on http://{host}:{port}', file=sys.stderr)
+        await listener.serve_forever()
+
+
+def main(argv=None) -> int:
+    """
+    Runs the conversion server from the command line
+    :param argv: The command line arguments (sys.argv[1:] by default)
+    :return: The exit status
+    """
+    parser = argparse.ArgumentParser(description='Local HTTP color conversion service.')
+    parser.add_argument('--host', default='127.0.0.1', help='the address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='the port to listen on')
+    parser.add_argument('--max-concurrent', type=int, default=64,
+                        help='requests handled at once before applying back-pressure')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_concurrent))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
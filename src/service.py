@@ -4,16 +4,259 @@ ColorConverter
 @author: Lung Alin-Sebastian
 
 """
-import random
 import re
+from array import array
 from collections import namedtuple
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
 
-from colour import Color
-from configupdater import ConfigUpdater
+from cache import LRUCache, PersistentCache
+from colorspaces import get_transform, rgb_to_lab
+from exceptions import InvalidColorError, InvalidTableError
+from globals import CONVERSION_TABLE_FILE, PERSISTENT_CACHE_FILE
+from harmony import complementary
+from instrumentation import Instrumentation, StageTimer
+from kdtree import KDTree
+from rgbhsl import HSL_SCALE, hsl_to_rgb, rgb_to_hsl
+from table import ConversionTable
 
-from exceptions import InvalidColorError
+# colour is only imported when needed (Ex: the colour engine, or the names of the colors), so
+# importing service does not load it
+if TYPE_CHECKING:
+    from colour import Color
 
-ConvertedColor = namedtuple('ConvertedColor', 'name hex rgb hsl')
+# Version of the conversion logic. Must be bumped whenever the output of convert() changes,
+# so precomputed conversion tables built by older versions are rejected
+CONVERSION_VERSION = 2
+
+# The conversion engines: 'exact' computes the conversions with integer arithmetic (see
+# rgbhsl.py), 'colour' with the float conversions of colour.Color, like older versions did
+ENGINES = ('exact', 'colour')
+
+# The formatted name of every named color, by packed 0xRRGGBB value (built on first use)
+_names_by_rgb = None
+
+
+def _name_of(packed_rgb: int) -> str:
+    """
+    :param packed_rgb: A color as a packed 0xRRGGBB integer
+    :return: The formatted X11 name of the color, or None if it has no name
+    """
+    global _names_by_rgb
+    if _names_by_rgb is None:
+        from colour import RGB_TO_COLOR_NAMES
+
+        _names_by_rgb = {}
+        for (r_value, g_value, b_value), names in RGB_TO_COLOR_NAMES.items():
+            # Same rule as colour.hex2web: single worded names are lowercase
+            name = names[0]
+            if sum(1 for char in name if char.isupper()) <= 1:
+                name = name.lower()
+            _names_by_rgb[(r_value << 16) | (g_value << 8) | b_value] = format_name(name)
+    return _names_by_rgb.get(packed_rgb)
+
+
+def _format_hex(packed_rgb: int) -> str:
+    return '#%06X' % packed_rgb
+
+
+def _format_rgb(packed_rgb: int) -> str:
+    return f'{packed_rgb >> 16}, {(packed_rgb >> 8) & 0xFF}, {packed_rgb & 0xFF}'
+
+
+def _format_hsl(packed_hsl: int) -> str:
+    return f'{packed_hsl >> 14}, {(packed_hsl >> 7) & 0x7F}%, {packed_hsl & 0x7F}%'
+
+
+def _pack_hsl(h_value: int, s_value: int, l_value: int) -> int:
+    """
+    Packs the displayed HSL values (0-360, 0-100 and 0-100) into 23 bits
+    """
+    return (h_value << 14) | (s_value << 7) | l_value
+
+
+class ConvertedColor:
+    """
+    The result of a conversion. The color is stored as a single packed integer (the hex value,
+    the displayed RGB value and the displayed HSL value), and the name, hex, rgb and hsl strings
+    are only formatted when they are accessed. Behaves like the namedtuple it replaces:
+    it can be unpacked, indexed, compared to tuples and turned into a dict with _asdict()
+    """
+    __slots__ = ('_packed',)
+
+    _fields = ('name', 'hex', 'rgb', 'hsl')
+
+    def __init__(self, packed_hex: int, packed_rgb: int, packed_hsl: int):
+        """
+        :param packed_hex: The color, as a packed 0xRRGGBB integer
+        :param packed_rgb: The displayed RGB value, as a packed 0xRRGGBB integer
+        :param packed_hsl: The displayed HSL value, packed by _pack_hsl()
+        """
+        self._packed = (packed_hex << 47) | (packed_rgb << 23) | packed_hsl
+
+    @property
+    def packed_hex(self) -> int:
+        return self._packed >> 47
+
+    @property
+    def packed_rgb(self) -> int:
+        return (self._packed >> 23) & 0xFFFFFF
+
+    @property
+    def packed_hsl(self) -> int:
+        return self._packed & 0x7FFFFF
+
+    @property
+    def name(self) -> str:
+        return _name_of(self._packed >> 47)
+
+    @property
+    def hex(self) -> str:
+        return _format_hex(self._packed >> 47)
+
+    @property
+    def rgb(self) -> str:
+        return _format_rgb((self._packed >> 23) & 0xFFFFFF)
+
+    @property
+    def hsl(self) -> str:
+        return _format_hsl(self._packed & 0x7FFFFF)
+
+    def _asdict(self) -> dict:
+        return {'name': self.name, 'hex': self.hex, 'rgb': self.rgb, 'hsl': self.hsl}
+
+    def __iter__(self):
+        return iter((self.name, self.hex, self.rgb, self.hsl))
+
+    def __len__(self) -> int:
+        return 4
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ConvertedColor):
+            return self._packed == other._packed
+        if isinstance(other, tuple):
+            return tuple(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Equal to the tuple of its strings, so it must hash like it too
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return ConvertedColor, (self.packed_hex, self.packed_rgb, self.packed_hsl)
+
+    def __repr__(self) -> str:
+        return 'ConvertedColor(name={!r}, hex={!r}, rgb={!r}, hsl={!r})'.format(*self)
+
+
+class _FormattedColumn(Sequence):
+    """
+    A read-only column of strings, formatted from an array of packed integers on access
+    """
+
+    def __init__(self, packed_values: array, formatter):
+        self._packed_values = packed_values
+        self._formatter = formatter
+
+    def __len__(self) -> int:
+        return len(self._packed_values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._formatter(value) for value in self._packed_values[index]]
+        return self._formatter(self._packed_values[index])
+
+    def __iter__(self):
+        return map(self._formatter, self._packed_values)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class ConvertedColumns:
+    """
+    The results of a batch conversion, stored column-wise as 3 arrays of packed integers
+    (12 bytes per color). The name, hex, rgb and hsl columns are formatted on access.
+    Like the namedtuple it replaces, it unpacks into its 4 columns
+    """
+    __slots__ = ('_hex', '_rgb', '_hsl')
+
+    _fields = ('name', 'hex', 'rgb', 'hsl')
+
+    def __init__(self, colors=()):
+        """
+        :param colors: An iterable of ConvertedColor objects
+        """
+        # 'I' is 4 bytes where 'L' is 8 (64-bit Linux and macOS), and every value fits in 24 bits
+        self._hex, self._rgb, self._hsl = array('I'), array('I'), array('I')
+        for color in colors:
+            self.append(color)
+
+    def append(self, color: ConvertedColor) -> None:
+        """
+        Adds a color at the end of the columns
+        """
+        self._hex.append(color.packed_hex)
+        self._rgb.append(color.packed_rgb)
+        self._hsl.append(color.packed_hsl)
+
+    def row(self, index: int) -> ConvertedColor:
+        """
+        :return: The ConvertedColor at the given position
+        """
+        return ConvertedColor(self._hex[index], self._rgb[index], self._hsl[index])
+
+    def rows(self):
+        """
+        :return: An iterator over the colors, as ConvertedColor objects
+        """
+        return map(ConvertedColor, self._hex, self._rgb, self._hsl)
+
+    @property
+    def name(self) -> Sequence:
+        return _FormattedColumn(self._hex, _name_of)
+
+    @property
+    def hex(self) -> Sequence:
+        return _FormattedColumn(self._hex, _format_hex)
+
+    @property
+    def rgb(self) -> Sequence:
+        return _FormattedColumn(self._rgb, _format_rgb)
+
+    @property
+    def hsl(self) -> Sequence:
+        return _FormattedColumn(self._hsl, _format_hsl)
+
+    def __iter__(self):
+        return iter((self.name, self.hex, self.rgb, self.hsl))
+
+    def __len__(self) -> int:
+        return 4
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ConvertedColumns, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return 'ConvertedColumns(name={!r}, hex={!r}, rgb={!r}, hsl={!r})'.format(*self)
+
+
+NearestName = namedtuple('NearestName', 'name distance')
 
 # noinspection SpellCheckingInspection
 COLOR_NAMES = ('black', 'navy', 'darkblue', 'mediumblue', 'blue', 'darkgreen', 'green', 'darkcyan',
@@ -41,23 +284,44 @@ COLOR_NAMES = ('black', 'navy', 'darkblue', 'mediumblue', 'blue', 'darkgreen', '
                'cornsilk', 'lemonchiffon', 'floralwhite', 'snow', 'yellow', 'lightyellow', 'ivory',
                'white')
 
+_COLOR_NAME_INDEX = frozenset(COLOR_NAMES)
 
-def _replace_separators(string: str) -> str:
-    """
-    Replaces the separators ' ', ',' and ', ' with '*'
-    :param string: The input string containing the separators
-    :return: A string with the separators replaced by '*'
-    """
-    return string.replace(', ', '*').replace(',', '*').replace(' ', '*')
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+_NON_LETTERS_PATTERN = re.compile(r'[^a-zA-Z]+')
+
+_CAPITALS_PATTERN = re.compile(r'(\w)([A-Z])')
+
+# 3 numbers or percentages separated by ',' and/or ' ', then an optional alpha (also after '/')
+_COMPONENTS_PATTERN = re.compile(r'(\d+(?:\.\d+)?%?)(?:\s*,\s*|\s+)'
+                                 r'(\d+(?:\.\d+)?%?)(?:\s*,\s*|\s+)'
+                                 r'(\d+(?:\.\d+)?%?)(?:(?:\s*[,/]\s*|\s+)(\d*\.?\d+%?))?', re.ASCII)
+
+# Remembers the most recent conversions, keyed on the normalized input. Invalid inputs are
+# deliberately not cached, so they raise InvalidColorError every time
+conversion_cache = LRUCache(max_size=4096)
+
+# The engine used by convert() and convert_many() (see set_engine)
+_engine = 'exact'
+
+# The precomputed conversion table: None until it is first needed, False if it is unavailable
+_conversion_table = None
+
+# The Instrumentation collecting the timings of convert(), or None when it is disabled
+_instrumentation = None
 
+# The PersistentCache shared with other runs and processes behind conversion_cache, or None when
+# it is disabled (see enable_persistent_cache)
+_persistent_cache = None
 
-def _format_name(name: str) -> str:
+
+def format_name(name: str) -> str:
     """
     Formats the color name to start with capital letters and have spaces where necessary
     :param name: The original name color
     :return: The formatted name color
     """
-    name = re.sub(r"(\w)([A-Z])", r"\1 \2", name)
+    name = _CAPITALS_PATTERN.sub(r"\1 \2", name)
     return name.title()
 
 
@@ -84,7 +348,141 @@ def _transform_percentage(string: str) -> float:
     return val
 
 
-def _identify_and_create_object(user_input: str) -> (str, Color):
+def _scan_hex(digits: str) -> (int, int, int):
+    """
+    Turns 3, 4, 6 or 8 hex digits (with or without alpha) into an RGB triple
+    :param digits: The hex digits, without the '#' sign
+    :return: A tuple of 3 ints in the 0-255 range, or None if the digits are not a hex color
+    """
+    if len(digits) not in (3, 4, 6, 8) or not _HEX_DIGITS.issuperset(digits):
+        return None
+    if len(digits) <= 4:
+        return tuple(int(digit * 2, 16) for digit in digits[:3])
+    return int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16)
+
+
+def _scan_components(body: str, function: str = None) -> (str, tuple):
+    """
+    Identifies an RGB or HSL color from its components (Ex: '214, 30%, 55%' or '12 34 56')
+    :param body: The components, separated by ',', ' ' or '/' (before the alpha)
+    :param function: 'rgb' or 'hsl' if the components were written inside a CSS function
+    :return: A tuple containing a string (the type detected) and the values of the color
+    :raises InvalidColorError: if the components are not a valid RGB or HSL color
+    """
+    match = _COMPONENTS_PATTERN.fullmatch(body)
+    if match is None:
+        if function is not None:
+            raise InvalidColorError(f'This looks like a {function.upper()} color but the values '
+                                    f'are not written properly!')
+        raise InvalidColorError("The input doesn't fit any of the known color patterns!")
+    first, second, third, alpha = match.groups()
+
+    if alpha is not None:
+        try:
+            alpha = _transform_percentage(alpha)
+        except ValueError:
+            alpha = -1
+        if not 0 <= alpha <= 1:
+            raise InvalidColorError('The alpha value is not a percentage or in the 0-1 range!')
+
+    if function == 'rgb' or function is None and (
+            first.isdigit() and second.isdigit() and third.isdigit()):
+        if not first.isdigit() or not second.isdigit() or not third.isdigit():
+            raise InvalidColorError('This looks like an RGB color but the values are not '
+                                    'whole numbers!')
+        r_value, g_value, b_value = int(first), int(second), int(third)
+        if not 0 <= r_value <= 255 or not 0 <= g_value <= 255 or not 0 <= b_value <= 255:
+            raise InvalidColorError(
+                    'This looks like an RGB color but the values are not in the 0-255 range!')
+        return 'rgb', (r_value, g_value, b_value)
+
+    if not first.isdigit() or not 0 <= int(first) <= 360:
+        raise InvalidColorError(
+                'This looks like a HSL color but the Hue value is not in the 0-360 range!')
+    try:
+        s_value = _transform_percentage(second)
+        l_value = _transform_percentage(third)
+    except ValueError:
+        raise InvalidColorError('This looks like a HSL color but the Saturation or Lightness '
+                                'are not valid percentages or in the 0.0-1.0 range!')
+
+    if not 0 <= s_value <= 1 or not 0 <= l_value <= 1:
+        raise InvalidColorError(
+                'This looks like a HSL color but the Saturation or Lightness values are not '
+                'percentages or in the 0-1 range!')
+    return 'hsl', (int(first), s_value, l_value)
+
+
+def _identify(user_input: str) -> (str, tuple):
+    """
+    Identifies the data type of an input in a single pass, deciding the format by its first
+    characters instead of trying every pattern one after another
+    :param user_input: The input string from the input textbox (already stripped)
+    :return: A tuple containing a string (the type detected) and the values of the color:
+             the lowercase name for 'literal', (r, g, b) for 'hex' and 'rgb' and
+             (h, s, l) for 'hsl', with s and l between 0.0 and 1.0
+    :raises InvalidColorError: if the inputted color doesn't fit any of the available formats
+    """
+    if not user_input:
+        raise InvalidColorError("The input doesn't fit any of the known color patterns!")
+    first = user_input[0]
+
+    # Hex color with the '#' sign (long or short, with optional alpha)
+    if first == '#':
+        rgb = _scan_hex(user_input[1:])
+        if rgb is None:
+            raise InvalidColorError("This looks like a hex color but it doesn't have 3, 4, 6 or 8 "
+                                    "hex digits!")
+        return 'hex', rgb
+
+    if first.isalpha():
+        # CSS functions: rgb(), rgba(), hsl() and hsla()
+        function = user_input[:3].lower()
+        if function in ('rgb', 'hsl') and user_input[-1] == ')':
+            opening = 4 if user_input[3:4] in ('a', 'A') else 3
+            if user_input[opening:opening + 1] == '(':
+                return _scan_components(user_input[opening + 1:-1].strip(), function)
+
+        # Literal color names (with any spacing, punctuation or capitalization)
+        name = _NON_LETTERS_PATTERN.sub('', user_input).lower()
+        if name in _COLOR_NAME_INDEX:
+            return 'literal', name
+
+    # Hex color without the '#' sign (long form only)
+    if len(user_input) == 6:
+        rgb = _scan_hex(user_input)
+        if rgb is not None:
+            return 'hex', rgb
+
+    if first.isdigit():
+        return _scan_components(user_input)
+
+    raise InvalidColorError("The input doesn't fit any of the known color patterns!")
+
+
+def _create_object(original: str, values: tuple) -> 'Color':
+    """
+    Creates the Color() object for an already identified input
+    :param original: The type detected by _identify()
+    :param values: The values of the color, as returned by _identify()
+    :return: A Color object that corresponds to the values
+    """
+    from colour import Color
+
+    if original == 'literal':
+        return Color(values)
+
+    result = Color()
+    if original == 'hsl':
+        h_value, s_value, l_value = values
+        result.set_hsl((h_value / 360, s_value, l_value))
+    else:
+        r_value, g_value, b_value = values
+        result.set_rgb((r_value / 255, g_value / 255, b_value / 255))
+    return result
+
+
+def _identify_and_create_object(user_input: str) -> (str, 'Color'):
     """
     Identifies the data type of an input, converts it appropriately and creates the Color() object
     :param user_input: The input string from the input textbox
@@ -92,138 +490,534 @@ def _identify_and_create_object(user_input: str) -> (str, Color):
              Color object that corresponds to the user input
     :raises InvalidColorError: if the inputted color doesn't fit any of the available formats
     """
-    result = Color()
+    original, values = _identify(user_input)
+    return original, _create_object(original, values)
 
-    # Checks for literal color names
-    tmp = re.sub(r"[^a-zA-Z]+", "", user_input.lower())
-    if tmp in COLOR_NAMES:
-        result = Color(tmp)
-        print(f'\nDetected literal: {tmp}')
-        return 'literal', result
-
-    # Matches a hex color without the '#' sign
-    hex_without_pound_sign_pattern = re.compile(r'[A-Fa-f0-9]{6}')
-    if hex_without_pound_sign_pattern.match(user_input) and len(user_input) == 6:
-        result.set_hex_l('#' + user_input.lower())
-        print(f"\nDetected hex without '#': {user_input.upper()}")
-        return 'hex', result
-
-    # Matches a hex color with the '#' sign
-    hex_with_pound_sign_pattern = re.compile(r'#[A-Fa-f0-9]{6}')
-    if hex_with_pound_sign_pattern.match(user_input) and len(user_input) == 7:
-        result.set_hex_l(user_input.lower())
-        print(f"\nDetected hex with '#': {user_input.upper()}")
-        return 'hex', result
-
-    # Matches an RGB color (3x 1-3 digits numbers, separated by up to 2 of ',' and ' ')
-    rgb_pattern = re.compile(r'(?:[0-9]{1,3}[, ]{1,2}){2}[0-9]{1,3}')
-    if rgb_pattern.match(user_input):
-        user_input = _replace_separators(user_input)
-        r_value, g_value, b_value = [int(val) for val in user_input.split('*')]
 
-        if not 0 <= r_value <= 255 or not 0 <= g_value <= 255 or not 0 <= b_value <= 255:
-            raise InvalidColorError(
-                    'This looks like an RGB color but the values are not in the 0-255 range!')
-        result.set_rgb((r_value / 255, g_value / 255, b_value / 255))
-        print(f"\nDetected rgb: {user_input}")
-        return 'rgb', result
-
-    # Matches a HSL color (1x 1-3 digits number, then 2x percentages or numbers in the range 0-1)
-    hsl_pattern = re.compile(r'[0-9]{1,3}(?:[, ]{1,2}(?:[01]\.[0-9]{1,2}|[0-9]{1,3}%)){2}')
-    if hsl_pattern.match(user_input):
-        user_input = _replace_separators(user_input)
-        h_value, s_value, l_value = user_input.split('*')
-        h_value = int(h_value)
-        if not 0 <= h_value <= 360:
-            raise InvalidColorError(
-                    'This looks like a HSL color but the Hue value is not in the 0-360 range!')
+def parse_components(user_input: str) -> (str, tuple):
+    """
+    Identifies an input as a color of the registry of colorspaces.py
+    :param user_input: The input string (already stripped)
+    :return: A tuple containing the space of the input ('rgb' or 'hsl') and its components
+             (r, g, b between 0 and 255 or h, s, l with s and l between 0 and 100)
+    :raises InvalidColorError: if the inputted color doesn't fit any of the available formats
+    """
+    original, values = _identify(user_input)
+    if original == 'hsl':
+        h_value, s_value, l_value = values
+        return 'hsl', (h_value, s_value * 100, l_value * 100)
+    if original == 'literal':
+        from colour import COLOR_NAME_TO_RGB
 
-        try:
-            s_value = _transform_percentage(s_value)
-            l_value = _transform_percentage(l_value)
-        except ValueError:
-            raise InvalidColorError('This looks like a HSL color but the Saturation or Lightness '
-                                    'are not valid percentages or in the 0.0-1.0 range!')
+        values = tuple(COLOR_NAME_TO_RGB[values])
+    return 'rgb', values
 
-        if not 0 <= s_value <= 1 or not 0 <= l_value <= 1:
-            raise InvalidColorError(
-                    'This looks like a HSL color but the Saturation or Lightness values are not '
-                    'percentages or in the 0-1 range!')
-        result.set_hsl((h_value / 360, s_value, l_value))
-        print(f"\nDetected hsl: {user_input}")
-        return 'hsl', result
 
-    raise InvalidColorError("The input doesn't fit any of the known color patterns!")
+def convert(user_input: str, spaces=None):
+    """
+    Takes a the user input and converts it into a ConvertedColor namedtuple.
+    Results are remembered in conversion_cache, so repeated inputs are not converted again
+    :param user_input: The input string from the input textbox
+    :param spaces: None for the ConvertedColor, or the name of a color space of the registry
+                   of colorspaces.py (Ex: 'oklch') or a tuple of names, to only compute the
+                   values of these spaces
+    :return: A ConvertedColor namedtuple or, with spaces, the components of the color in that
+             space as floats (Ex: (0.628, 0.258, 29.234), or (255.0, 0.0, 0.0) for 'rgb') or a
+             namedtuple of the requested spaces
+    :raises InvalidColorError: if the inputted color doesn't fit any of the available formats
+    :raises ValueError: if a space is unknown
+    """
+    if spaces is not None:
+        source, values = parse_components(user_input.strip())
+        return get_transform(source, spaces)(values)
+    # Times the stages into the Instrumentation, when it is enabled
+    timer = None if _instrumentation is None else _instrumentation.timer()
+    if timer is not None:
+        timer.count('conversions')
+
+    # Strips left and right spacing from the user input
+    user_input = user_input.strip()
 
+    # The conversion doesn't depend on the capitalization of the input
+    key = user_input.lower()
+    if timer is not None:
+        timer.stage('normalization')
+    result = conversion_cache.get(key)
+    if result is None:
+        if _persistent_cache is None:
+            result = _convert(user_input, timer)
+        else:
+            result = _convert_persistent(user_input, key, timer)
+        conversion_cache.put(key, result)
+        if timer is not None:
+            timer.finish()
+    elif timer is not None:
+        timer.count('cache.hits')
+    return result
 
-def convert(user_input: str) -> ConvertedColor:
+
+def _convert_persistent(user_input: str, key: str, timer: StageTimer = None) -> ConvertedColor:
     """
-    Takes a the user input and converts it into a ConvertedColor namedtuple
+    Converts the (already stripped) user input through the persistent cache
     :param user_input: The input string from the input textbox
+    :param key: The normalized input
+    :param timer: The StageTimer of the conversion, or None
     :return: A ConvertedColor namedtuple
     """
+    # The engines convert some colors differently
+    key = f'{_engine}:{key}'
+    packed = _persistent_cache.get(key)
+    if timer is not None:
+        timer.stage('persistent_cache')
+        if packed is not None:
+            timer.count('persistent_cache.hits')
+    if packed is not None:
+        return ConvertedColor(*packed)
+    result = _convert(user_input, timer)
+    _persistent_cache.put(key, (result.packed_hex, result.packed_rgb, result.packed_hsl))
+    return result
 
-    # Strips left and right spacing from the user input
-    user_input = user_input.lstrip().rstrip()
 
-    original, color = _identify_and_create_object(user_input)
+def enable_persistent_cache(path: str = PERSISTENT_CACHE_FILE,
+                            max_entries: int = 1000000) -> PersistentCache:
+    """
+    Keeps the conversions in an SQLite file as well, shared with the other runs and processes
+    using it. Its entries are discarded whenever CONVERSION_VERSION changes
+    :param path: The path of the file (created if needed)
+    :param max_entries: The maximum number of conversions kept in the file
+    :return: The PersistentCache. Its pending entries are written when the program exits
+    """
+    global _persistent_cache
+    disable_persistent_cache()
+    _persistent_cache = PersistentCache(path, CONVERSION_VERSION, max_entries)
+    import atexit
+
+    atexit.register(_persistent_cache.close)
+    return _persistent_cache
+
+
+def disable_persistent_cache() -> None:
+    """
+    Writes the pending entries of the persistent cache and stops using it
+    """
+    global _persistent_cache
+    if _persistent_cache is not None:
+        _persistent_cache.close()
+    _persistent_cache = None
+
+
+def prefetch(inputs) -> None:
+    """
+    Looks up a whole batch of inputs in the persistent cache with a few queries, so the
+    following convert() calls find them in memory instead of querying the file one at a time.
+    Does nothing when the persistent cache is disabled
+    :param inputs: An iterable of input strings
+    """
+    if _persistent_cache is not None:
+        _persistent_cache.preload(f'{_engine}:{user_input.strip().lower()}'
+                                  for user_input in inputs)
+
+
+def flush_persistent_cache() -> None:
+    """
+    Writes the new conversions of the persistent cache, so other processes find them at once
+    (they are otherwise written in batches, and when the program exits)
+    """
+    if _persistent_cache is not None:
+        _persistent_cache.flush()
+
+
+def enable_instrumentation(instrumentation: Instrumentation = None) -> Instrumentation:
+    """
+    Starts collecting counters and per-stage timings of convert() (normalization, persistent
+    cache lookup, format detection, table lookup, then either the exact computation or the
+    Color() construction and output formatting of the colour engine, plus the total time per
+    detected format).
+    Costs nothing while disabled
+    :param instrumentation: The Instrumentation to collect into (a new one by default)
+    :return: The Instrumentation collecting the data
+    """
+    global _instrumentation
+    _instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+    return _instrumentation
+
+
+def disable_instrumentation() -> Instrumentation:
+    """
+    Stops collecting counters and timings
+    :return: The Instrumentation that was collecting them (or None), with everything collected
+    """
+    global _instrumentation
+    instrumentation, _instrumentation = _instrumentation, None
+    return instrumentation
+
+
+def set_engine(engine: str) -> None:
+    """
+    Selects the conversion engine. The results of the two engines differ slightly (see
+    benchmarks/compare_engines.py), so the conversion cache is cleared
+    :param engine: Any of ENGINES ('exact' by default)
+    :raises ValueError: if the engine is unknown
+    """
+    global _engine
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown conversion engine {engine!r}, expected one of {ENGINES}!')
+    _engine = engine
+    conversion_cache.clear()
+
+
+def load_conversion_table(path: str = CONVERSION_TABLE_FILE) -> bool:
+    """
+    Loads a precomputed conversion table (see table.py), used by the exact engine for hex and
+    RGB inputs instead of computing them. The default table is loaded automatically when it
+    exists
+    :param path: The path of the table, or None to stop using any table
+    :return: True if the table was loaded, False if the conversions will be computed
+    """
+    global _conversion_table
+    if _conversion_table:
+        _conversion_table.close()
+    _conversion_table = False
+    if path is None:
+        return False
+
+    try:
+        _conversion_table = ConversionTable(path, CONVERSION_VERSION)
+    except FileNotFoundError:
+        pass
+    except (InvalidTableError, OSError) as error:
+        import logging
+        logging.getLogger(__name__).warning('Ignoring the conversion table %s: %s', path, error)
+    return bool(_conversion_table)
+
+
+def _convert_from_table(r_value: int, g_value: int, b_value: int) -> ConvertedColor:
+    """
+    Converts a hex or RGB input with the precomputed conversion table, if there is one
+    :param r_value: The red value (0-255)
+    :param g_value: The green value (0-255)
+    :param b_value: The blue value (0-255)
+    :return: A ConvertedColor namedtuple, or None if the conversion must be computed
+    """
+    if _conversion_table is None:
+        load_conversion_table()
+    if not _conversion_table:
+        return None
+
+    packed_rgb = (r_value << 16) | (g_value << 8) | b_value
+    return ConvertedColor(packed_rgb, packed_rgb,
+                          _pack_hsl(*_conversion_table.lookup(r_value, g_value, b_value)))
+
+
+def _convert(user_input: str, timer: StageTimer = None) -> ConvertedColor:
+    """
+    Converts the (already stripped) user input, without going through the cache
+    :param user_input: The input string from the input textbox
+    :param timer: The StageTimer of the conversion, or None
+    :return: A ConvertedColor namedtuple
+    """
+    try:
+        original, values = _identify(user_input)
+    except InvalidColorError:
+        if timer is not None:
+            timer.detected(None)
+        raise
+    if timer is not None:
+        timer.detected(original)
+
+    if _engine == 'exact':
+        result = _convert_exact(original, values)
+        if timer is not None:
+            # Hex and RGB inputs are read from the conversion table, when there is one
+            if original in ('hex', 'rgb') and _conversion_table:
+                timer.stage('table_lookup')
+                timer.count('table.hits')
+            else:
+                timer.stage('computation')
+        return result
 
-    name_value = _format_name(color.get_web()) if not color.get_web().startswith('#') else None
-    hex_value = color.get_hex_l().upper()
+    color = _create_object(original, values)
+    if timer is not None:
+        timer.stage('construction')
+    result = _format_color(original, values, color)
+    if timer is not None:
+        timer.stage('formatting')
+    return result
+
+
+def _convert_exact(original: str, values: tuple) -> ConvertedColor:
+    """
+    Converts an already identified input with the exact engine. The RGB output of hex, RGB and
+    named colors is their exact value, and the HSL output of HSL colors is their input rounded
+    to whole percentages
+    :param original: The type detected by _identify()
+    :param values: The values of the color, as returned by _identify()
+    :return: A ConvertedColor namedtuple
+    """
+    if original == 'hsl':
+        h_value, s_value, l_value = values
+        r_value, g_value, b_value = hsl_to_rgb(h_value, s_value, l_value)
+        packed_rgb = (r_value << 16) | (g_value << 8) | b_value
+        # Hundredths of a percent, rounded half up to whole percents
+        return ConvertedColor(packed_rgb, packed_rgb,
+                              _pack_hsl(h_value, (round(s_value * HSL_SCALE) + 50) // 100,
+                                        (round(l_value * HSL_SCALE) + 50) // 100))
+    if original == 'literal':
+        from colour import COLOR_NAME_TO_RGB
+
+        values = COLOR_NAME_TO_RGB[values]
+    return convert_rgb(*values)
+
+
+def _format_color(original: str, values: tuple, color: 'Color') -> ConvertedColor:
+    """
+    Builds the 4 outputs of a conversion with the colour engine
+    :param original: The type detected by _identify()
+    :param values: The values of the color, as returned by _identify()
+    :param color: The Color object created from the values
+    :return: A ConvertedColor namedtuple
+    """
+    packed_hex = int(color.get_hex_l()[1:], 16)
     if original == 'rgb':
-        user_input = _replace_separators(user_input)
-        # str(int(x)) for rounding
-        rgb_value = ', '.join([str(int(val)) for val in user_input.split('*')])
+        r_value, g_value, b_value = values
     else:
-        rgb_value = ', '.join([str(int(nr * 255)) for nr in color.get_rgb()])
+        r_value, g_value, b_value = [int(nr * 255) for nr in color.get_rgb()]
 
     if original == 'hsl':
-        user_input = _replace_separators(user_input)
-        pieces = user_input.split('*')
-        hsl_value = ', '.join(
-                [str(int(pieces[0])), str(int(_transform_percentage(pieces[1]) * 100)) + '%',
-                 str(int(_transform_percentage(pieces[2]) * 100)) + '%'])
+        packed_hsl = _pack_hsl(values[0], int(values[1] * 100), int(values[2] * 100))
     else:
-        hsl_value = ', '.join([str(int(color.get_hsl()[0] * 360)),
-                               str(int(round(color.get_hsl()[1], 2) * 100)) + '%',
-                               str(int(round(color.get_hsl()[2], 2) * 100)) + '%'])
+        h_value, s_value, l_value = color.get_hsl()
+        packed_hsl = _pack_hsl(int(h_value * 360), int(round(s_value, 2) * 100),
+                               int(round(l_value, 2) * 100))
+
+    return ConvertedColor(packed_hex, (r_value << 16) | (g_value << 8) | b_value, packed_hsl)
+
+
+def convert_rgb(r_value: int, g_value: int, b_value: int) -> ConvertedColor:
+    """
+    Converts an RGB triple the same way convert() converts an RGB string, but without
+    parsing a string or building a Color() object
+    :param r_value: The red value (0-255)
+    :param g_value: The green value (0-255)
+    :param b_value: The blue value (0-255)
+    :return: A ConvertedColor namedtuple
+    """
+    packed_rgb = (r_value << 16) | (g_value << 8) | b_value
+    if _engine == 'exact':
+        result = _convert_from_table(r_value, g_value, b_value)
+        if result is None:
+            result = ConvertedColor(packed_rgb, packed_rgb,
+                                    _pack_hsl(*rgb_to_hsl(r_value, g_value, b_value)))
+        return result
+
+    from colour import hsl2rgb, rgb2hex, rgb2hsl
+
+    hsl = rgb2hsl((r_value / 255, g_value / 255, b_value / 255))
+    packed_hex = int(rgb2hex(hsl2rgb(hsl), force_long=True)[1:], 16)
+    packed_hsl = _pack_hsl(int(hsl[0] * 360), int(round(hsl[1], 2) * 100),
+                           int(round(hsl[2], 2) * 100))
+
+    return ConvertedColor(packed_hex, packed_rgb, packed_hsl)
+
+
+def color_key(item) -> (str, object):
+    """
+    Normalizes one item of a convert_many() batch into a hashable key
+    :param item: A color string, a packed 24-bit integer or an (r, g, b) sequence
+    :return: A tuple containing the kind of the item ('str' or 'rgb') and its normalized value
+    :raises InvalidColorError: if the item is none of the accepted types or is out of range
+    """
+    if isinstance(item, str):
+        return 'str', item.strip()
+
+    if isinstance(item, int):
+        if not 0 <= item <= 0xFFFFFF:
+            raise InvalidColorError('Packed colors must be in the 0x000000-0xFFFFFF range!')
+        return 'rgb', (item >> 16, (item >> 8) & 0xFF, item & 0xFF)
+
+    try:
+        r_value, g_value, b_value = (int(val) for val in item)
+    except (TypeError, ValueError):
+        raise InvalidColorError(f'Cannot convert {item!r}: expected a string, a packed '
+                                f'24-bit integer or an (r, g, b) triple!')
+    if not 0 <= r_value <= 255 or not 0 <= g_value <= 255 or not 0 <= b_value <= 255:
+        raise InvalidColorError('RGB triples must have their values in the 0-255 range!')
+    return 'rgb', (r_value, g_value, b_value)
+
+
+def convert_many(colors, spaces=None):
+    """
+    Converts a whole column of colors at once. Each distinct color is only converted once,
+    and colors given as numbers skip the string parsing and the Color() object entirely
+    :param colors: An iterable of color strings (any format accepted by convert()), packed
+                   24-bit integers (0xRRGGBB) or (r, g, b) triples. NumPy arrays of shape (N,)
+                   or (N, 3) are accepted as well
+    :param spaces: None for the 4 columns, or the name of a color space or a tuple of names, as
+                   for convert(). Each color then goes through one fused transform
+    :return: A ConvertedColumns of the 4 columns (name, hex, rgb, hsl), in input order or, with
+             spaces, a list of the converted colors, as returned by convert()
+    :raises InvalidColorError: if any of the colors is invalid
+    :raises ValueError: if a space is unknown
+    """
+    if hasattr(colors, 'tolist'):
+        # NumPy arrays (and array.array) iterate over their own scalar types, so we
+        # turn them into plain Python ints first
+        colors = colors.tolist()
+    if spaces is not None:
+        return _convert_many_spaces(colors, spaces)
+    if _persistent_cache is not None:
+        colors = list(colors)
+        prefetch(item for item in colors if isinstance(item, str))
 
-    return ConvertedColor(name_value, hex_value, rgb_value, hsl_value)
+    converted = {}
+    results = ConvertedColumns()
+    for item in colors:
+        key = color_key(item)
+        result = converted.get(key)
+        if result is None:
+            kind, value = key
+            result = convert(value) if kind == 'str' else convert_rgb(*value)
+            converted[key] = result
+        results.append(result)
+    flush_persistent_cache()
+    return results
+
+
+def _convert_many_spaces(colors, spaces) -> list:
+    """
+    Converts a column of colors to the given color spaces (see convert_many())
+    """
+    from_rgb = get_transform('rgb', spaces)
+    converted = {}
+    results = []
+    for item in colors:
+        key = color_key(item)
+        result = converted.get(key)
+        if result is None:
+            kind, value = key
+            if kind == 'str':
+                source, value = parse_components(value)
+                result = get_transform(source, spaces)(value)
+            else:
+                result = from_rgb(value)
+            converted[key] = result
+        results.append(result)
+    return results
+
+
+def _build_name_index() -> (KDTree, list):
+    """
+    Builds the k-d tree (in CIELAB) over the colors in COLOR_NAMES
+    :return: A tuple containing the tree and the formatted name of each of its points
+    """
+    from colour import COLOR_NAME_TO_RGB, hex2web, rgb2hex
+
+    rgb_values = sorted({tuple(COLOR_NAME_TO_RGB[name]) for name in COLOR_NAMES})
+    # The names are obtained the same way as in convert(), so exact matches are named alike
+    names = [format_name(hex2web(rgb2hex([val / 255 for val in rgb]))) for rgb in rgb_values]
+    return KDTree([rgb_to_lab(*rgb) for rgb in rgb_values]), names
+
+
+_name_index = None
+
+
+def _nearest_name_of_rgb(r_value: int, g_value: int, b_value: int) -> NearestName:
+    """
+    Finds the named color closest to an RGB triple
+    :param r_value: The red value (0-255)
+    :param g_value: The green value (0-255)
+    :param b_value: The blue value (0-255)
+    :return: A NearestName namedtuple
+    """
+    global _name_index
+    if _name_index is None:
+        _name_index = _build_name_index()
+    tree, names = _name_index
+
+    index, distance = tree.nearest(rgb_to_lab(r_value, g_value, b_value))
+    return NearestName(names[index], distance)
+
+
+def nearest_name(user_input: str) -> NearestName:
+    """
+    Finds the X11 color name closest to any color, even when it has no exact name
+    :param user_input: The input string, in any format accepted by convert()
+    :return: A NearestName namedtuple: the formatted name and its distance from the color,
+             as a CIE76 Delta E (0.0 for an exact match)
+    :raises InvalidColorError: if the inputted color doesn't fit any of the available formats
+    """
+    hex_value = convert(user_input).hex
+    return _nearest_name_of_rgb(int(hex_value[1:3], 16), int(hex_value[3:5], 16),
+                                int(hex_value[5:7], 16))
+
+
+def nearest_names(colors) -> list:
+    """
+    Finds the closest X11 color name for a whole column of colors, looking up each distinct
+    color only once
+    :param colors: An iterable of colors, in any of the forms accepted by convert_many()
+    :return: A list of NearestName namedtuples, in input order
+    :raises InvalidColorError: if any of the colors is invalid
+    """
+    if hasattr(colors, 'tolist'):
+        colors = colors.tolist()
+
+    found = {}
+    results = []
+    for item in colors:
+        key = color_key(item)
+        result = found.get(key)
+        if result is None:
+            kind, value = key
+            result = nearest_name(value) if kind == 'str' else _nearest_name_of_rgb(*value)
+            found[key] = result
+        results.append(result)
+    return results
+
+
+# The weighted choices of random_color(), built once instead of on every call
+_RANDOM_FORMATS = ('name',) * 3 + ('hex',) * 3 + ('rgb',) * 2 + ('hsl',) * 2
+_RANDOM_HASH_SIGNS = (1,) * 7 + (0,) * 3
+_RANDOM_SEPARATORS = (', ',) * 5 + (',',) * 3 + (' ',) * 2
 
 
 def random_color() -> str:
     """
-    Returns a random color (in any of the 4 formats)
+    Returns a random color (in any of the 4 formats), from the global random state.
+    To generate many inputs reproducibly, see corpus.generate_inputs()
     :return: A random color as a string
     """
-    color_format = random.choice(['name'] * 3 + ['hex'] * 3 + ['rgb'] * 2 + ['hsl'] * 2)
+    import random
+
+    color_format = random.choice(_RANDOM_FORMATS)
     if color_format == 'name':
         color = random.choice(COLOR_NAMES)
-        return random.choice([_format_name(color)] * 6 + [color] * 3 + [color.upper()] * 1)
+        return random.choice([format_name(color)] * 6 + [color] * 3 + [color.upper()] * 1)
     elif color_format == 'hex':
-        return '#' * random.choice([1] * 7 + [0] * 3) + ''.join(
+        return '#' * random.choice(_RANDOM_HASH_SIGNS) + ''.join(
                 (random.choice("0123456789ABCDEF") for _ in range(6)))
     elif color_format == 'rgb':
-        sep = random.choice([', '] * 5 + [','] * 3 + [' '] * 2)
+        sep = random.choice(_RANDOM_SEPARATORS)
         return sep.join(str(random.randrange(0, 255)) for _ in range(3))
     else:
-        sep = random.choice([', '] * 5 + [','] * 3 + [' '] * 2)
+        sep = random.choice(_RANDOM_SEPARATORS)
         return str(random.randrange(0, 360)) + sep + random.choice(
             [str(random.randrange(0, 100)) + '%'] * 6 + [
                 str(round(random.uniform(0, 1), 2))] * 4) + sep + random.choice(
             [str(random.randrange(0, 100)) + '%'] * 6 + [str(round(random.uniform(0, 1), 2))] * 4)
 
 
-def complementary_color(hsl: str) -> str:
+def complementary_color(user_input: str) -> str:
     """
-    Returns the complementary color of the given HSL one
-    :param hsl: A HSL string (Ex: '214, 30%, 55%')
-    :return: A HSL string (Ex: '34, 30%, 55%')
+    Returns the complementary color of the given one, computed on its RGB values so that the
+    complement of the complement is the original color (see harmony.py for other harmonies)
+    :param user_input: A color in any of the input formats (Ex: '214, 30%, 55%')
+    :return: The complementary color as a hex string (Ex: '#B4A07C')
+    :raises InvalidColorError: if the inputted color doesn't fit any of the available formats
     """
-    pieces = hsl.split(', ')
-    hue = int(pieces[0])
-    hue = (hue + 180) % 360  # The color 180 degrees apart is the complement
-    return f'{str(hue)}, {pieces[1]}, {pieces[2]}'
+    packed_hex = convert(user_input).packed_hex
+    return '#%02X%02X%02X' % complementary((packed_hex >> 16, (packed_hex >> 8) & 0xFF,
+                                            packed_hex & 0xFF))
 
 
 def change_language(new_language: str) -> None:
@@ -231,6 +1025,9 @@ def change_language(new_language: str) -> None:
     Updates the language in the config file
     :param new_language: The new language code. Can be any of 'en', 'ro' and 'fr'
     """
+    # Only needed when the language changes, and slow to import
+    from configupdater import ConfigUpdater
+
     updater = ConfigUpdater()
     updater.read('settings.config')
     updater['APPLICATION_SETTINGS']['language'].value = new_language
@@ -6,8 +6,7 @@ ColorConverter
 """
 
 import configparser
-import gettext
-from collections import Callable
+from typing import Callable
 
 import globals as global_var
 from globals import CONFIG_FILE
@@ -35,6 +34,9 @@ def get_language_func(lang: str) -> Callable:
     """
     if lang == 'en':
         return lambda s: s
+    # The translation catalogs are only needed for languages other than English
+    import gettext
+
     lang_file = gettext.translation('gui', localedir='locale', languages=[lang])
     lang_file.install()
     return lang_file.gettext
@@ -0,0 +1,440 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Normalizes the colors of CSS, SCSS and JSON (design token) files: every color literal (named,
+hex, rgb()/rgba() and hsl()/hsla()) is rewritten to one canonical format. The files are
+memory-mapped and scanned with compiled patterns, so they are never loaded whole into memory,
+and every distinct literal is only converted once per run.
+
+Comments, quoted strings and url() bodies are never rewritten, and color names are only matched
+in the values of the properties holding colors (color, background, border, fill, custom
+properties and SCSS variables...): elsewhere they are identifiers ('grid-area: red'). In JSON
+files, only the string values made of a single literal are rewritten. Literals with an alpha
+channel are left as they are, since the conversions drop it.
+
+Usage: python stylesheet.py FILE ... [-f hex|rgb|hsl|name] [--lowercase] [--syntax css|json]
+                                     [-o OUTPUT | --in-place | --check]
+"""
+import mmap
+import os
+import re
+import sys
+from collections import namedtuple
+
+from exceptions import InvalidColorError
+from service import convert
+
+FORMATS = ('hex', 'rgb', 'hsl', 'name')
+
+SYNTAXES = ('css', 'json')
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+# noinspection SpellCheckingInspection
+# The named colors of CSS Color Module Level 4, as packed 0xRRGGBB values
+CSS_COLOR_NAMES = {
+    'aliceblue': 0xF0F8FF, 'antiquewhite': 0xFAEBD7, 'aqua': 0x00FFFF, 'aquamarine': 0x7FFFD4,
+    'azure': 0xF0FFFF, 'beige': 0xF5F5DC, 'bisque': 0xFFE4C4, 'black': 0x000000,
+    'blanchedalmond': 0xFFEBCD, 'blue': 0x0000FF, 'blueviolet': 0x8A2BE2, 'brown': 0xA52A2A,
+    'burlywood': 0xDEB887, 'cadetblue': 0x5F9EA0, 'chartreuse': 0x7FFF00,
+    'chocolate': 0xD2691E, 'coral': 0xFF7F50, 'cornflowerblue': 0x6495ED,
+    'cornsilk': 0xFFF8DC, 'crimson': 0xDC143C, 'cyan': 0x00FFFF, 'darkblue': 0x00008B,
+    'darkcyan': 0x008B8B, 'darkgoldenrod': 0xB8860B, 'darkgray': 0xA9A9A9,
+    'darkgreen': 0x006400, 'darkgrey': 0xA9A9A9, 'darkkhaki': 0xBDB76B,
+    'darkmagenta': 0x8B008B, 'darkolivegreen': 0x556B2F, 'darkorange': 0xFF8C00,
+    'darkorchid': 0x9932CC, 'darkred': 0x8B0000, 'darksalmon': 0xE9967A,
+    'darkseagreen': 0x8FBC8F, 'darkslateblue': 0x483D8B, 'darkslategray': 0x2F4F4F,
+    'darkslategrey': 0x2F4F4F, 'darkturquoise': 0x00CED1, 'darkviolet': 0x9400D3,
+    'deeppink': 0xFF1493, 'deepskyblue': 0x00BFFF, 'dimgray': 0x696969, 'dimgrey': 0x696969,
+    'dodgerblue': 0x1E90FF, 'firebrick': 0xB22222, 'floralwhite': 0xFFFAF0,
+    'forestgreen': 0x228B22, 'fuchsia': 0xFF00FF, 'gainsboro': 0xDCDCDC,
+    'ghostwhite': 0xF8F8FF, 'gold': 0xFFD700, 'goldenrod': 0xDAA520, 'gray': 0x808080,
+    'green': 0x008000, 'greenyellow': 0xADFF2F, 'grey': 0x808080, 'honeydew': 0xF0FFF0,
+    'hotpink': 0xFF69B4, 'indianred': 0xCD5C5C, 'indigo': 0x4B0082, 'ivory': 0xFFFFF0,
+    'khaki': 0xF0E68C, 'lavender': 0xE6E6FA, 'lavenderblush': 0xFFF0F5,
+    'lawngreen': 0x7CFC00, 'lemonchiffon': 0xFFFACD, 'lightblue': 0xADD8E6,
+    'lightcoral': 0xF08080, 'lightcyan': 0xE0FFFF, 'lightgoldenrodyellow': 0xFAFAD2,
+    'lightgray': 0xD3D3D3, 'lightgreen': 0x90EE90, 'lightgrey': 0xD3D3D3,
+    'lightpink': 0xFFB6C1, 'lightsalmon': 0xFFA07A, 'lightseagreen': 0x20B2AA,
+    'lightskyblue': 0x87CEFA, 'lightslategray': 0x778899, 'lightslategrey': 0x778899,
+    'lightsteelblue': 0xB0C4DE, 'lightyellow': 0xFFFFE0, 'lime': 0x00FF00,
+    'limegreen': 0x32CD32, 'linen': 0xFAF0E6, 'magenta': 0xFF00FF, 'maroon': 0x800000,
+    'mediumaquamarine': 0x66CDAA, 'mediumblue': 0x0000CD, 'mediumorchid': 0xBA55D3,
+    'mediumpurple': 0x9370DB, 'mediumseagreen': 0x3CB371, 'mediumslateblue': 0x7B68EE,
+    'mediumspringgreen': 0x00FA9A, 'mediumturquoise': 0x48D1CC,
+    'mediumvioletred': 0xC71585, 'midnightblue': 0x191970, 'mintcream': 0xF5FFFA,
+    'mistyrose': 0xFFE4E1, 'moccasin': 0xFFE4B5, 'navajowhite': 0xFFDEAD, 'navy': 0x000080,
+    'oldlace': 0xFDF5E6, 'olive': 0x808000, 'olivedrab': 0x6B8E23, 'orange': 0xFFA500,
+    'orangered': 0xFF4500, 'orchid': 0xDA70D6, 'palegoldenrod': 0xEEE8AA,
+    'palegreen': 0x98FB98, 'paleturquoise': 0xAFEEEE, 'palevioletred': 0xDB7093,
+    'papayawhip': 0xFFEFD5, 'peachpuff': 0xFFDAB9, 'peru': 0xCD853F, 'pink': 0xFFC0CB,
+    'plum': 0xDDA0DD, 'powderblue': 0xB0E0E6, 'purple': 0x800080,
+    'rebeccapurple': 0x663399, 'red': 0xFF0000, 'rosybrown': 0xBC8F8F,
+    'royalblue': 0x4169E1, 'saddlebrown': 0x8B4513, 'salmon': 0xFA8072,
+    'sandybrown': 0xF4A460, 'seagreen': 0x2E8B57, 'seashell': 0xFFF5EE, 'sienna': 0xA0522D,
+    'silver': 0xC0C0C0, 'skyblue': 0x87CEEB, 'slateblue': 0x6A5ACD, 'slategray': 0x708090,
+    'slategrey': 0x708090, 'snow': 0xFFFAFA, 'springgreen': 0x00FF7F,
+    'steelblue': 0x4682B4, 'tan': 0xD2B48C, 'teal': 0x008080, 'thistle': 0xD8BFD8,
+    'tomato': 0xFF6347, 'turquoise': 0x40E0D0, 'violet': 0xEE82EE, 'wheat': 0xF5DEB3,
+    'white': 0xFFFFFF, 'whitesmoke': 0xF5F5F5, 'yellow': 0xFFFF00, 'yellowgreen': 0x9ACD32,
+}
+
+# Characters that cannot directly precede or follow a literal: a name inside an identifier
+# ('.red-button', '$red', '--tan'), or any non-ASCII UTF-8 byte
+_WORD = rb'\w\-\x80-\xff'
+
+
+def _trie_pattern(words) -> bytes:
+    """
+    Builds a pattern matching any of the words, factored by common prefixes
+    ('bl(?:ack|ue)' instead of 'black|blue'), which the regex engine matches much faster than
+    a plain alternation of 148 names
+    :param words: An iterable of lowercase ASCII words
+    :return: The pattern, as bytes
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())
+                    if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # A word ends here, and longer ones continue
+            pattern = ('(?:' + pattern + ')?') if len(branches) == 1 else pattern + '?'
+        return pattern
+
+    return build(trie).encode('ascii')
+
+
+# Comments, quoted strings and url() bodies, where nothing is a color: skipped whole
+_STRINGS = rb'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\''
+_SKIPPED = (rb'/\*.*?(?:\*/|\Z)|//[^\n]*|' + _STRINGS +
+            rb'|(?<![' + _WORD + rb'])url\((?:' + _STRINGS + rb'|[^)"\'])*\)?')
+
+# Not an id selector: '#add {' or '#bad:hover'
+_HEX = (rb'(?<![\w&])#(?:[0-9a-f]{8}|[0-9a-f]{6}|[0-9a-f]{3,4})(?![' + _WORD + rb'])'
+        rb'(?!\s{0,32}[{:.\[>~+])')
+_FUNCTION = rb'(?<![' + _WORD + rb'$@.])(?:rgb|hsl)a?\([^()]{1,64}\)'
+_NAME = rb'(?<![' + _WORD + rb'$@.#])' + _trie_pattern(CSS_COLOR_NAMES) + \
+    rb'(?![' + _WORD + rb'])'
+
+# The value of a declaration, up to the ';' or '}' closing it ('a:hover {' is not one). The
+# comments, strings and url() bodies inside it are stepped over whole, so their ';' and '}' do
+# not close it
+_VALUE = (rb':(?P<value>(?:[^;{}"\'/u\\]|\\.|u(?!rl\()|/(?![*/])|/\*.*?\*/|//[^\n]*|'
+          + _STRINGS + rb'|url\((?:' + _STRINGS + rb'|[^)"\'])*\))*)(?=[;}]|\Z)')
+
+# A CSS or SCSS file: the values of the declarations, whose literals are found by
+# COLOR_LITERAL_PATTERN, and the hex and function literals outside of them (Ex: the arguments of
+# a SCSS mixin). Every match starts with one of the characters of the first lookahead: the other
+# positions are skipped at once
+STYLESHEET_PATTERN = re.compile(
+    rb'(?=[#:/"\'urh])(?:' + _SKIPPED + rb'|' + _VALUE + rb'|(?P<hex>' + _HEX +
+    rb')|(?P<function>' + _FUNCTION + rb'))',
+    re.IGNORECASE | re.DOTALL)
+
+# The literals of a value. Color names are only matched there, and not as keys ('red: #F00' in
+# a SCSS map)
+COLOR_LITERAL_PATTERN = re.compile(
+    rb'(?=[#/"\'a-z])(?:' + _SKIPPED + rb'|(?P<hex>' + _HEX + rb')|(?P<function>' + _FUNCTION +
+    rb')|(?P<name>' + _NAME + rb'(?!\s{0,32}:)))',
+    re.IGNORECASE | re.DOTALL)
+
+# A JSON file: only whole string values are literals ('"The red button"' is not one, and
+# neither is a key: '"red": ...')
+JSON_LITERAL_PATTERN = re.compile(
+    rb'"(?:(?P<hex>#(?:[0-9a-f]{8}|[0-9a-f]{6}|[0-9a-f]{3,4}))|(?P<function>(?:rgb|hsl)a?'
+    rb'\([^()"]{1,64}\))|(?P<name>' + _trie_pattern(CSS_COLOR_NAMES) + rb'))"(?!\s*:)'
+    rb'|"(?:[^"\\]|\\.)*"',
+    re.IGNORECASE)
+
+# The properties whose values can hold colors, with or without a vendor prefix: any '*color'
+# property, the shorthands including one, and the custom properties and SCSS and Less variables,
+# which can hold anything
+COLOR_PROPERTY_PATTERN = re.compile(
+    rb'(?:--|[$@])[\w-]+|(?:-[a-z]+-)?(?:[\w-]*color|background(?:-image)?|border'
+    rb'(?:-(?:top|right|bottom|left|block|inline)(?:-(?:start|end))?)?|outline|column-rule|'
+    rb'text-decoration|text-emphasis|(?:box|text)-shadow|fill|stroke)',
+    re.IGNORECASE)
+
+# The property of a declaration, at the end of what precedes its ':'
+_PROPERTY_PATTERN = re.compile(rb'([$@]?[\w-]+)\s*\Z')
+
+# The longest property looked up before the ':' of a declaration, in bytes
+PROPERTY_LOOKBEHIND = 256
+
+_COMPONENT_SEPARATORS_PATTERN = re.compile(rb'[\s,/]+')
+
+# The result of a run: the literals found, those replaced by a different text, those already
+# canonical, those kept as they were (alpha channel or invalid values) and the distinct
+# literals converted
+RewriteReport = namedtuple('RewriteReport', 'found rewritten unchanged kept unique')
+
+# The CSS name of every named color, by packed 0xRRGGBB value (built on first use)
+_css_names = None
+
+
+def _css_name(packed_rgb: int) -> str:
+    """
+    :return: The CSS name of a color, or None if it has none
+    """
+    global _css_names
+    if _css_names is None:
+        _css_names = {}
+        for name, packed in CSS_COLOR_NAMES.items():
+            # 'aqua' and 'cyan' are the same color, for example: the first name in alphabetical
+            # order is kept
+            _css_names.setdefault(packed, name)
+    return _css_names.get(packed_rgb)
+
+
+def _holds_colors(data, position: int) -> bool:
+    """
+    :param data: A bytes-like object or a mmap of the file
+    :param position: The position of the ':' of a declaration
+    :return: True if the property of the declaration can hold colors (see
+             COLOR_PROPERTY_PATTERN)
+    """
+    match = _PROPERTY_PATTERN.search(data[max(position - PROPERTY_LOOKBEHIND, 0):position])
+    return match is not None and COLOR_PROPERTY_PATTERN.fullmatch(match.group(1)) is not None
+
+
+def syntax_of(path: str) -> str:
+    """
+    :return: The syntax of a file, from its extension: 'json', or 'css' for anything else
+    """
+    return 'json' if os.path.splitext(path)[1].lower() == '.json' else 'css'
+
+
+def _has_alpha(kind: str, literal: bytes) -> bool:
+    if kind == 'hex':
+        return len(literal) in (5, 9)
+    if kind == 'function':
+        body = literal[literal.index(b'(') + 1:-1].strip()
+        return len(_COMPONENT_SEPARATORS_PATTERN.split(body)) > 3
+    return False
+
+
+def format_color(color, color_format: str, lowercase: bool = False) -> str:
+    """
+    Writes a converted color as a CSS literal
+    :param color: A ConvertedColor
+    :param color_format: Any of FORMATS. Colors without a CSS name are written as hex for 'name'
+    :param lowercase: If True, hex literals are written in lowercase
+    :return: The CSS literal (Ex: '#FF0000', 'rgb(255, 0, 0)', 'hsl(0, 100%, 50%)' or 'red')
+    """
+    if color_format == 'rgb':
+        return f'rgb({color.rgb})'
+    if color_format == 'hsl':
+        return f'hsl({color.hsl})'
+    if color_format == 'name':
+        name = _css_name(color.packed_hex)
+        if name is not None:
+            return name
+    return color.hex.lower() if lowercase else color.hex
+
+
+class StylesheetRewriter:
+    """
+    Rewrites the color literals of any number of files to one canonical format, remembering
+    the replacement of every distinct literal for the whole run
+    """
+
+    def __init__(self, color_format: str = 'hex', lowercase: bool = False):
+        """
+        :param color_format: Any of FORMATS
+        :param lowercase: If True, hex literals are written in lowercase
+        :raises ValueError: if the format is unknown
+        """
+        if color_format not in FORMATS:
+            raise ValueError(f'Unknown color format {color_format!r}, expected one of {FORMATS}!')
+        self.color_format = color_format
+        self.lowercase = lowercase
+        # Lowercase literal -> its replacement, or None to keep it
+        self._replacements = {}
+        self._found = self._rewritten = self._unchanged = self._kept = 0
+
+    def _replacement(self, kind: str, literal: bytes) -> bytes:
+        """
+        :return: The replacement of a literal, or None if it must be kept as it is
+        """
+        key = literal.lower()
+        try:
+            return self._replacements[key]
+        except KeyError:
+            pass
+        replacement = None
+        if not _has_alpha(kind, literal):
+            try:
+                # Names are read as CSS names, not as the X11 names known to convert()
+                color = convert(f'#{CSS_COLOR_NAMES[key.decode("ascii")]:06X}' if kind == 'name'
+                                else literal.decode('ascii'))
+            except (InvalidColorError, ValueError):
+                pass
+            else:
+                replacement = format_color(color, self.color_format,
+                                           self.lowercase).encode('ascii')
+        self._replacements[key] = replacement
+        return replacement
+
+    def rewrite(self, data, write=None, syntax: str = 'css') -> None:
+        """
+        Rewrites the color literals of a whole buffer
+        :param data: A bytes-like object or a mmap of the file
+        :param write: A function called with every piece of the rewritten file, in order
+                      (None to only count the literals)
+        :param syntax: Any of SYNTAXES: 'css' (also for SCSS) or 'json'
+        :raises ValueError: if the syntax is unknown
+        """
+        if syntax not in SYNTAXES:
+            raise ValueError(f'Unknown syntax {syntax!r}, expected one of {SYNTAXES}!')
+        with memoryview(data) as view:
+            self._rewrite(data, view, write, syntax)
+
+    @staticmethod
+    def _literals(data, syntax: str):
+        """
+        :return: A generator of the (kind, start, end) tuples of the literals of a buffer, in order
+        """
+        if syntax == 'json':
+            matches = JSON_LITERAL_PATTERN.finditer(data)
+        else:
+            matches = STYLESHEET_PATTERN.finditer(data)
+        for match in matches:
+            kind = match.lastgroup
+            if kind == 'value':
+                # Only looked up once the value holds a name
+                holds_colors = None
+                for literal in COLOR_LITERAL_PATTERN.finditer(data, *match.span(kind)):
+                    literal_kind = literal.lastgroup
+                    if literal_kind == 'name':
+                        if holds_colors is None:
+                            holds_colors = _holds_colors(data, match.start())
+                        if not holds_colors:
+                            continue
+                    if literal_kind is not None:
+                        yield (literal_kind, *literal.span(literal_kind))
+            elif kind is not None:
+                yield (kind, *match.span(kind))
+
+    def _rewrite(self, data, view: memoryview, write, syntax: str) -> None:
+        # The unchanged parts are written as views of the buffer, never copied
+        position = 0
+        for kind, start, end in self._literals(data, syntax):
+            self._found += 1
+            literal = bytes(view[start:end])
+            replacement = self._replacement(kind, literal)
+            if replacement is None:
+                self._kept += 1
+                continue
+            if replacement == literal:
+                self._unchanged += 1
+                continue
+            self._rewritten += 1
+            if write is not None:
+                write(view[position:start])
+                write(replacement)
+                position = end
+        if write is not None:
+            write(view[position:])
+
+    def rewrite_file(self, path: str, output, syntax: str = None) -> None:
+        """
+        Rewrites the color literals of a file through a memory map
+        :param path: The path of the file
+        :param output: A binary file object receiving the rewritten file (None to only count)
+        :param syntax: Any of SYNTAXES, or None to tell it from the extension of the file
+        """
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    # The pages already scanned can be dropped early
+                    data.madvise(mmap.MADV_SEQUENTIAL)
+                self.rewrite(data, output.write if output is not None else None,
+                             syntax or syntax_of(path))
+
+    def report(self) -> RewriteReport:
+        """
+        :return: The counts of the literals handled so far
+        """
+        return RewriteReport(self._found, self._rewritten, self._unchanged, self._kept,
+                             len(self._replacements))
+
+
+def _rewrite_in_place(rewriter: StylesheetRewriter, path: str, syntax: str = None) -> None:
+    """
+    Rewrites a file through a temporary file next to it, which then replaces it
+    """
+    temporary = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary, 'wb', buffering=WRITE_BUFFER_SIZE) as output:
+            rewriter.rewrite_file(path, output, syntax)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the rewriter from the command line
+    :param argv: The command line arguments (sys.argv[1:] by default)
+    :return: The exit status (with --check, 1 if any literal is not canonical)
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rewrites every color literal of CSS, SCSS and '
+                                                 'JSON files to one canonical format.')
+    parser.add_argument('files', nargs='+', help='the files to rewrite')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='hex',
+                        help='the canonical format (default: hex)')
+    parser.add_argument('--lowercase', action='store_true', help='write hex in lowercase')
+    parser.add_argument('--syntax', choices=SYNTAXES, default=None,
+                        help='the syntax of the files (default: json for .json files, else css)')
+    destination = parser.add_mutually_exclusive_group()
+    destination.add_argument('-o', '--output', default=None,
+                             help="where to write the rewritten file ('-' or nothing for stdout)")
+    destination.add_argument('--in-place', action='store_true', help='rewrite the files')
+    destination.add_argument('--check', action='store_true',
+                             help='only report, failing if any literal is not canonical')
+    args = parser.parse_args(argv)
+    if len(args.files) > 1 and not (args.in_place or args.check):
+        parser.error('several files can only be rewritten with --in-place or --check')
+
+    rewriter = StylesheetRewriter(args.format, args.lowercase)
+    try:
+        if args.check:
+            for path in args.files:
+                rewriter.rewrite_file(path, None, args.syntax)
+        elif args.in_place:
+            for path in args.files:
+                _rewrite_in_place(rewriter, path, args.syntax)
+        elif args.output and args.output != '-':
+            with open(args.output, 'wb', buffering=WRITE_BUFFER_SIZE) as output:
+                rewriter.rewrite_file(args.files[0], output, args.syntax)
+        else:
+            rewriter.rewrite_file(args.files[0], sys.stdout.buffer, args.syntax)
+    except OSError as error:
+        print(f'Cannot rewrite {error.filename}: {error.strerror}', file=sys.stderr)
+        return 2
+
+    report = rewriter.report()
+    print(f'{report.found} color literals found ({report.unique} distinct): '
+          f'{report.rewritten} rewritten, {report.unchanged} already canonical, '
+          f'{report.kept} kept.', file=sys.stderr)
+    return 1 if args.check and report.rewritten else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
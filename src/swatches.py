@@ -0,0 +1,305 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+A scrollable grid of color swatches for palettes of any size (Ex: the colors of a converted file
+or of an image). Only the swatches in view exist as canvas items: a pool of rows of rectangles,
+sized to the view and recycled while scrolling. The rows still in view are moved all at once by a
+single call, and the rows scrolled out are refilled with the colors of the rows scrolled in, so
+the number of items and the cost of a redraw depend on the size of the view, never on the size of
+the palette.
+"""
+import tkinter as tk
+
+from globals import DISCORD_DARK, DISCORD_LIGHT
+from service import ConvertedColumns, convert_many
+
+# The side of a swatch and the gap between two swatches, in pixels
+SWATCH_SIZE = 32
+SWATCH_GAP = 4
+
+# Pixels scrolled by one notch of the mouse wheel
+WHEEL_PIXELS = 48
+
+
+class _PoolRow:
+    """
+    A row of rectangles of the pool, showing one row of the palette (or none)
+    """
+    __slots__ = ('tag', 'items', 'fills', 'row', 'top')
+
+    def __init__(self, tag: str, items: list, top: int):
+        self.tag = tag
+        self.items = items
+        # The fill of every rectangle, or None while it is hidden
+        self.fills = [None] * len(items)
+        # The row of the palette shown, and the top of the row in the content (before scrolling)
+        self.row = None
+        self.top = top
+
+
+class SwatchGrid:
+    """
+    A virtualized grid of swatches, with a vertical scrollbar. Place it through its frame
+    """
+
+    def __init__(self, master, on_select=None, swatch_size: int = SWATCH_SIZE,
+                 gap: int = SWATCH_GAP):
+        """
+        :param master: The parent widget
+        :param on_select: Called with the index and the ConvertedColor of a clicked swatch
+        :param swatch_size: The side of a swatch, in pixels
+        :param gap: The gap between two swatches, in pixels
+        """
+        self.on_select = on_select
+        self.swatch_size = swatch_size
+        self.gap = gap
+        self.pitch = swatch_size + gap
+
+        self.frame = tk.Frame(master, bg=DISCORD_DARK)
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self.frame, bg=DISCORD_DARK, highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar = tk.Scrollbar(self.frame, orient='vertical', command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+
+        self._colors = ConvertedColumns()
+        self._hexes = self._colors.hex
+        self._width = self._height = 1
+        self._columns = 1
+        self._pool = []
+        # Pixels scrolled from the top, now and when the items were last placed
+        self._offset = 0
+        self._drawn_offset = 0
+        self._pending_redraw = None
+        self.selected = None
+        self._selection = self.canvas.create_rectangle(0, 0, 0, 0, outline=DISCORD_LIGHT,
+                                                       width=2, state='hidden',
+                                                       tags=('swatch',))
+
+        self.canvas.bind('<Configure>', self._on_configure)
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<MouseWheel>', self._on_mouse_wheel)
+        # X11 reports the mouse wheel as buttons 4 and 5
+        self.canvas.bind('<Button-4>', lambda event: self.scroll_pixels(-WHEEL_PIXELS))
+        self.canvas.bind('<Button-5>', lambda event: self.scroll_pixels(WHEEL_PIXELS))
+
+    def set_colors(self, colors) -> None:
+        """
+        Shows another palette, scrolled to the top
+        :param colors: A ConvertedColumns (Ex: from convert_many()), or an iterable of colors in
+                       any of the forms accepted by convert_many()
+        :raises InvalidColorError: if any of the colors is invalid
+        """
+        if not isinstance(colors, ConvertedColumns):
+            colors = convert_many(colors)
+        self._colors = colors
+        self._hexes = colors.hex
+        self._offset = 0
+        self.selected = None
+        self.canvas.itemconfigure(self._selection, state='hidden')
+        for pool_row in self._pool:
+            self._fill(pool_row, None)
+        self._redraw()
+
+    def __len__(self) -> int:
+        return len(self._hexes)
+
+    @property
+    def item_count(self) -> int:
+        """
+        :return: The number of canvas items of the grid, which only depends on the size of the view
+        """
+        return len(self.canvas.find_withtag('swatch'))
+
+    # <editor-fold desc="Layout">
+    def _rows(self) -> int:
+        return -(-len(self._hexes) // self._columns)
+
+    def _content_height(self) -> int:
+        return self.gap + self._rows() * self.pitch
+
+    def _on_configure(self, event) -> None:
+        """
+        Resizes the pool of rows to the view, keeping the first visible swatch in view
+        """
+        self._width, self._height = max(event.width, 1), max(event.height, 1)
+        columns = max(1, (self._width - self.gap) // self.pitch)
+        # A partial row can show at the top and at the bottom
+        rows = self._height // self.pitch + 2
+        if columns != self._columns:
+            first = self._offset // self.pitch * self._columns
+            self._offset = first // columns * self.pitch
+            self._columns = columns
+        if not self._pool or len(self._pool) != rows or len(self._pool[0].items) != columns:
+            self._build_pool(rows, columns)
+        self._redraw()
+
+    def _build_pool(self, rows: int, columns: int) -> None:
+        """
+        Replaces the pool with hidden rows of rectangles (only when the size of the view changes)
+        """
+        for pool_row in self._pool:
+            self.canvas.delete(pool_row.tag)
+        create_rectangle = self.canvas.create_rectangle
+        self._pool = []
+        for row in range(rows):
+            tag = f'row{row}'
+            top = self.gap + row * self.pitch
+            y_value = top - self._drawn_offset
+            items = [create_rectangle(self.gap + column * self.pitch, y_value,
+                                      self.gap + column * self.pitch + self.swatch_size,
+                                      y_value + self.swatch_size, width=0, state='hidden',
+                                      tags=('swatch', tag))
+                     for column in range(columns)]
+            self._pool.append(_PoolRow(tag, items, top))
+        self.canvas.tag_raise(self._selection)
+        self._place_selection()
+    # </editor-fold>
+
+    # <editor-fold desc="Scrolling">
+    def yview(self, *args) -> None:
+        """
+        The command of the scrollbar: ('moveto', fraction) or ('scroll', count, 'units'|'pages')
+        """
+        if args[0] == 'moveto':
+            offset = float(args[1]) * self._content_height()
+        elif args[0] == 'scroll':
+            step = self.pitch if args[2] == 'units' else max(self._height - self.pitch, self.pitch)
+            offset = self._offset + int(args[1]) * step
+        else:
+            return
+        self.scroll_to(offset)
+
+    def scroll_pixels(self, pixels: int) -> None:
+        self.scroll_to(self._offset + pixels)
+
+    def scroll_to(self, offset: float) -> None:
+        """
+        Scrolls to the given number of pixels from the top. Several scrolls in a row (Ex: fast
+        mouse wheel events) only redraw once, when the main loop is idle
+        """
+        offset = int(max(0, min(offset, self._content_height() - self._height)))
+        if offset == self._offset:
+            return
+        self._offset = offset
+        if self._pending_redraw is None:
+            self._pending_redraw = self.canvas.after_idle(self._redraw)
+
+    def scroll_to_index(self, index: int) -> None:
+        """
+        Scrolls the swatch of the given color into view, if it is not already
+        """
+        top = self.gap + index // self._columns * self.pitch
+        if top < self._offset:
+            self.scroll_to(top - self.gap)
+        elif top + self.swatch_size > self._offset + self._height:
+            self.scroll_to(top + self.swatch_size + self.gap - self._height)
+
+    def _on_mouse_wheel(self, event) -> None:
+        # Windows reports multiples of 120 per notch, macOS smaller deltas
+        notches = event.delta / 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_pixels(int(-notches * WHEEL_PIXELS))
+    # </editor-fold>
+
+    # <editor-fold desc="Drawing">
+    def _redraw(self) -> None:
+        """
+        Moves the rows still in view and refills the pool rows left over with the rows scrolled
+        into view, then updates the scrollbar
+        """
+        self._pending_redraw = None
+        delta = self._drawn_offset - self._offset
+        if delta:
+            self.canvas.move('swatch', 0, delta)
+            self._drawn_offset = self._offset
+
+        first = (max(self._offset - self.gap, 0)) // self.pitch
+        visible = range(first, min(self._rows(), first + len(self._pool)))
+        shown = {pool_row.row for pool_row in self._pool if pool_row.row in visible}
+        free = [pool_row for pool_row in self._pool if pool_row.row not in shown]
+        missing = [row for row in visible if row not in shown]
+        for pool_row, row in zip(free, missing):
+            self._fill(pool_row, row)
+        for pool_row in free[len(missing):]:
+            if pool_row.row is not None:
+                self._fill(pool_row, None)
+
+        height = self._content_height()
+        self.scrollbar.set(self._offset / height, min(1.0, (self._offset + self._height) / height))
+
+    def _fill(self, pool_row: _PoolRow, row) -> None:
+        """
+        Shows a row of the palette with a row of the pool, or hides it if the row is None.
+        Only the rectangles whose color changes are reconfigured
+        """
+        pool_row.row = row
+        itemconfigure = self.canvas.itemconfigure
+        fills = pool_row.fills
+        if row is None:
+            for column, item in enumerate(pool_row.items):
+                if fills[column] is not None:
+                    itemconfigure(item, state='hidden')
+                    fills[column] = None
+            return
+
+        top = self.gap + row * self.pitch
+        if top != pool_row.top:
+            self.canvas.move(pool_row.tag, 0, top - pool_row.top)
+            pool_row.top = top
+        hexes = self._hexes
+        start = row * self._columns
+        end = min(start + len(pool_row.items), len(hexes))
+        for column, item in enumerate(pool_row.items):
+            if start + column < end:
+                fill = hexes[start + column]
+                if fills[column] != fill:
+                    itemconfigure(item, fill=fill, state='normal')
+                    fills[column] = fill
+            elif fills[column] is not None:
+                itemconfigure(item, state='hidden')
+                fills[column] = None
+    # </editor-fold>
+
+    # <editor-fold desc="Selection">
+    def index_at(self, x_value: int, y_value: int):
+        """
+        :param x_value: A horizontal position in the canvas, in pixels
+        :param y_value: A vertical position in the canvas, in pixels
+        :return: The index of the color of the swatch there, or None if there is none (Ex: a gap)
+        """
+        column, x_inside = divmod(x_value - self.gap, self.pitch)
+        row, y_inside = divmod(y_value + self._offset - self.gap, self.pitch)
+        if column < 0 or row < 0 or column >= self._columns or x_inside >= self.swatch_size \
+                or y_inside >= self.swatch_size:
+            return None
+        index = row * self._columns + column
+        return index if index < len(self._hexes) else None
+
+    def select(self, index: int) -> None:
+        """
+        Outlines a swatch, scrolls it into view and calls on_select with its color
+        """
+        self.selected = index
+        self.scroll_to_index(index)
+        self._place_selection()
+        if self.on_select is not None:
+            self.on_select(index, self._colors.row(index))
+
+    def _place_selection(self) -> None:
+        if self.selected is None:
+            return
+        row, column = divmod(self.selected, self._columns)
+        x_value = self.gap + column * self.pitch
+        y_value = self.gap + row * self.pitch - self._drawn_offset
+        self.canvas.coords(self._selection, x_value - 2, y_value - 2,
+                           x_value + self.swatch_size + 2, y_value + self.swatch_size + 2)
+        self.canvas.itemconfigure(self._selection, state='normal')
+
+    def _on_click(self, event) -> None:
+        index = self.index_at(event.x, event.y)
+        if index is not None:
+            self.select(index)
+    # </editor-fold>
@@ -0,0 +1,165 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Precomputed conversion table for the whole 24-bit RGB space. Every color has a fixed-width
+record (its displayed HSL output), so a hex or RGB input can be converted with a single offset
+lookup into the memory-mapped file.
+
+Usage: python table.py build [PATH] [-j WORKERS]
+       python table.py verify [PATH]
+"""
+import mmap
+import struct
+import sys
+import zlib
+
+from exceptions import InvalidTableError
+from globals import CONVERSION_TABLE_FILE
+from rgbhsl import rgb_to_hsl
+
+MAGIC = b'CCTABLE\0'
+
+# Bumped whenever the layout of the file changes
+FORMAT_VERSION = 2
+
+# Magic, format version, conversion logic version, CRC32 of the records
+_HEADER = struct.Struct('<8sHHI')
+
+# Hue (0-359), saturation (0-100) and lightness (0-100), as displayed
+RECORD = struct.Struct('<HBB')
+
+RECORD_COUNT = 1 << 24
+
+
+def _build_plane(red: int) -> bytes:
+    """
+    Computes the records of every color with the given red value, the same way the exact
+    engine of service.convert() does for an RGB input
+    :param red: The red value (0-255)
+    :return: The 65536 records of the plane, packed
+    """
+    pack = RECORD.pack
+    return b''.join(pack(*rgb_to_hsl(red, green, blue))
+                    for green in range(256) for blue in range(256))
+
+
+def build_table(path: str, logic_version: int, workers: int = 1) -> None:
+    """
+    Builds the conversion table file
+    :param path: Where to write the table
+    :param logic_version: The version of the conversion logic the records are computed with
+    :param workers: The number of processes computing the records
+    """
+    checksum = 0
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, logic_version, 0))
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                planes = executor.map(_build_plane, range(256))
+                for plane in planes:
+                    checksum = zlib.crc32(plane, checksum)
+                    file.write(plane)
+        else:
+            for red in range(256):
+                plane = _build_plane(red)
+                checksum = zlib.crc32(plane, checksum)
+                file.write(plane)
+        # The header is only completed once every record was written
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, logic_version, checksum))
+
+
+class ConversionTable:
+    """
+    A memory-mapped conversion table
+    """
+
+    def __init__(self, path: str, logic_version: int):
+        """
+        :param path: The path of the table
+        :param logic_version: The conversion logic version the table must have been built with
+        :raises InvalidTableError: if the table is corrupted or was built by another version
+        :raises OSError: if the table cannot be read
+        """
+        with open(path, 'rb') as file:
+            header = file.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise InvalidTableError('The conversion table is truncated!')
+            magic, format_version, table_logic_version, checksum = _HEADER.unpack(header)
+            if magic != MAGIC or format_version != FORMAT_VERSION:
+                raise InvalidTableError('Not a conversion table, or one of another format!')
+            if table_logic_version != logic_version:
+                raise InvalidTableError('The conversion table was built by another version of '
+                                        'the conversion logic!')
+            self._offset = _HEADER.size
+            self._mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mapped) != self._offset + RECORD_COUNT * RECORD.size:
+            self.close()
+            raise InvalidTableError('The conversion table is truncated!')
+        with memoryview(self._mapped) as data, data[self._offset:] as records:
+            valid = zlib.crc32(records) == checksum
+        if not valid:
+            self.close()
+            raise InvalidTableError('The checksum of the conversion table does not match!')
+
+    def lookup(self, r_value: int, g_value: int, b_value: int) -> (int, int, int):
+        """
+        Reads the record of a color
+        :param r_value: The red value (0-255)
+        :param g_value: The green value (0-255)
+        :param b_value: The blue value (0-255)
+        :return: A tuple of the hue, saturation and lightness, as displayed
+        """
+        index = (r_value << 16) | (g_value << 8) | b_value
+        return RECORD.unpack_from(self._mapped, self._offset + RECORD.size * index)
+
+    def close(self) -> None:
+        """
+        Unmaps the table
+        """
+        self._mapped.close()
+
+
+def _parse_arguments(argv=None):
+    # Only imported when run as a script, since service imports this module
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Builds or verifies the precomputed conversion '
+                                                 'table used by convert() for hex and RGB inputs.')
+    parser.add_argument('command', choices=('build', 'verify'))
+    parser.add_argument('path', nargs='?', default=CONVERSION_TABLE_FILE,
+                        help=f'the table file (default: {CONVERSION_TABLE_FILE})')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='processes computing the records (default: 1)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the table builder from the command line
+    :param argv: The command line arguments (sys.argv[1:] by default)
+    :return: The exit status
+    """
+    # The conversion logic lives in service, which itself loads tables lazily
+    from service import CONVERSION_VERSION
+
+    args = _parse_arguments(argv)
+    if args.command == 'build':
+        build_table(args.path, CONVERSION_VERSION, args.workers)
+        print(f'Conversion table written to {args.path}.')
+    try:
+        ConversionTable(args.path, CONVERSION_VERSION).close()
+    except (InvalidTableError, OSError) as error:
+        print(f'Invalid conversion table {args.path}: {error}', file=sys.stderr)
+        return 1
+    print(f'Conversion table {args.path} is valid.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Runs long jobs of the GUI on background threads, so the Tk main loop never blocks. Tkinter
+must only be used from the thread running the main loop, so the workers never touch it: their
+progress and results go through a queue, which the main loop drains with after() while any job
+is running, calling the callbacks of the jobs there.
+"""
+import queue
+import threading
+import time
+
+from exceptions import TaskCancelled
+
+# Milliseconds between two drains of the queue while jobs are running (about 60 per second)
+POLL_MS = 16
+
+# Longest time (in seconds) the main loop spends running callbacks in one drain, so a burst of
+# results is spread over several frames instead of freezing one
+POLL_BUDGET = 0.008
+
+# Shortest time (in seconds) between two progress reports of a job: faster reports are dropped,
+# except the last one
+PROGRESS_INTERVAL = 1 / 30
+
+
+class Task:
+    """
+    A job submitted to a WorkerPool. The job receives it as its first argument, to report its
+    progress and notice when it is cancelled
+    """
+
+    def __init__(self, pool, on_done, on_error, on_progress, on_cancelled):
+        self._pool = pool
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_progress = on_progress
+        self._on_cancelled = on_cancelled
+        self._cancel_event = threading.Event()
+        self._last_report = 0.0
+        self.future = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """
+        Cancels the job: it is never started if it is still queued, and its next report() or
+        check() raises TaskCancelled if it is running. Its on_done callback is never called
+        afterwards, even if it completes anyway
+        """
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self) -> None:
+        """
+        Called by the job between two steps of its work
+        :raises TaskCancelled: if the job was cancelled
+        """
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report(self, done, total) -> None:
+        """
+        Called by the job to report its progress (at most every PROGRESS_INTERVAL seconds reach
+        the main loop, and only the latest one of every drain)
+        :param done: The amount of work done (Ex: lines or bytes)
+        :param total: The total amount of work, or None if it is unknown
+        :raises TaskCancelled: if the job was cancelled
+        """
+        self.check()
+        now = time.monotonic()
+        if now - self._last_report >= PROGRESS_INTERVAL or done == total:
+            self._last_report = now
+            self._pool._post(self, 'progress', (done, total))
+
+
+class WorkerPool:
+    """
+    A pool of threads running the long jobs of a Tk application, calling their callbacks from
+    the Tk main loop
+    """
+
+    def __init__(self, master, workers: int = 2, poll_ms: int = POLL_MS):
+        """
+        :param master: Any Tk widget, whose after() drains the results
+        :param workers: The number of jobs running at the same time (the others wait in line)
+        :param poll_ms: Milliseconds between two drains of the results while jobs are running
+        """
+        self.master = master
+        self.poll_ms = poll_ms
+        self.workers = workers
+        # The threads are only started (and concurrent.futures imported) with the first job
+        self._executor = None
+        self._events = queue.SimpleQueue()
+        self._tasks = set()
+        self._pending_poll = None
+
+    def submit(self, job, *args, on_done=None, on_error=None, on_progress=None,
+               on_cancelled=None) -> Task:
+        """
+        Runs a job on a worker thread. Every callback is called from the Tk main loop
+        :param job: A function called as job(task, *args). It must not use Tkinter
+        :param args: The other arguments of the job
+        :param on_done: Called with the result of the job
+        :param on_error: Called with the exception raised by the job (by default, it is
+                         re-raised in the main loop, which reports it)
+        :param on_progress: Called with the (done, total) progress of the job
+        :param on_cancelled: Called once a cancelled job has stopped (or was never started)
+        :return: The Task of the job, to cancel it
+        """
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='gui-worker')
+        task = Task(self, on_done, on_error, on_progress, on_cancelled)
+        self._tasks.add(task)
+        task.future = self._executor.submit(self._run, task, job, args)
+        task.future.add_done_callback(lambda future: self._on_future_done(task, future))
+        if self._pending_poll is None:
+            self._pending_poll = self.master.after(self.poll_ms, self._poll)
+        return task
+
+    def _run(self, task: Task, job, args) -> None:
+        try:
+            result = job(task, *args)
+        except TaskCancelled:
+            self._post(task, 'cancelled', None)
+        except BaseException as error:
+            self._post(task, 'error', error)
+        else:
+            self._post(task, 'done', result)
+
+    def _on_future_done(self, task: Task, future) -> None:
+        # A job cancelled before it started never reaches _run()
+        if future.cancelled():
+            self._post(task, 'cancelled', None)
+
+    def _post(self, task: Task, kind: str, value) -> None:
+        # Called from the worker threads: only the queue is thread-safe, never Tkinter
+        self._events.put((task, kind, value))
+
+    def _poll(self) -> None:
+        """
+        Drains the results of the workers from the main loop, then schedules the next drain if
+        any job is still running
+        """
+        self._pending_poll = None
+        deadline = time.perf_counter() + POLL_BUDGET
+        progress = {}
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    task, kind, value = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'progress':
+                    # Only the latest progress of every job is shown
+                    if task in self._tasks and not task.cancelled:
+                        progress[task] = value
+                    continue
+                progress.pop(task, None)
+                self._finish(task, kind, value)
+            for task, (done, total) in progress.items():
+                if task._on_progress is not None:
+                    task._on_progress(done, total)
+        finally:
+            if self._tasks:
+                self._pending_poll = self.master.after(self.poll_ms, self._poll)
+
+    def _finish(self, task: Task, kind: str, value) -> None:
+        if task not in self._tasks:
+            # Dropped by shutdown()
+            return
+        self._tasks.discard(task)
+        if kind == 'done' and task.cancelled:
+            kind = 'cancelled'
+        if kind == 'done':
+            if task._on_done is not None:
+                task._on_done(value)
+        elif kind == 'error':
+            if task._on_error is None:
+                raise value
+            task._on_error(value)
+        elif task._on_cancelled is not None:
+            task._on_cancelled()
+
+    @property
+    def busy(self) -> bool:
+        """
+        :return: True while any job is queued or running
+        """
+        return bool(self._tasks)
+
+    def cancel_all(self) -> None:
+        """
+        Cancels every queued or running job
+        """
+        for task in list(self._tasks):
+            task.cancel()
+
+    def shutdown(self) -> None:
+        """
+        Cancels every job and stops the workers, without waiting for the running jobs (which
+        stop at their next report() or check()). No callback is called afterwards
+        """
+        self.cancel_all()
+        self._tasks.clear()
+        if self._pending_poll is not None:
+            self.master.after_cancel(self._pending_poll)
+            self._pending_poll = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
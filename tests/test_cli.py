@@ -0,0 +1,66 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Tests of the options of the headless bulk conversion of cli.py
+
+Usage (from the repository root): python -m pytest tests
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cli import main  # noqa: E402
+
+
+def _run(argv: list, text: str) -> (int, str, str):
+    """
+    Runs the command line interface on a text given as stdin
+    :return: The exit status, stdout and stderr
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    old_stdin = sys.stdin
+    sys.stdin = io.StringIO(text)
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                status = main(argv)
+            except SystemExit as error:
+                status = error.code
+    finally:
+        sys.stdin = old_stdin
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+class TestCli(unittest.TestCase):
+
+    def test_chunk_sizes_below_one_are_rejected(self):
+        for chunk_size in ('0', '-1'):
+            status, stdout, stderr = _run(['--chunk-size', chunk_size], 'red\n')
+            self.assertEqual(status, 2, chunk_size)
+            self.assertEqual(stdout, '')
+            self.assertIn('--chunk-size must be at least 1', stderr)
+
+    def test_workers_below_one_are_rejected(self):
+        for workers in ('0', '-2'):
+            status, stdout, stderr = _run(['-j', workers], 'red\n')
+            self.assertEqual(status, 2, workers)
+            self.assertIn('-j/--workers must be at least 1', stderr)
+
+    def test_every_line_is_converted_with_small_chunks(self):
+        status, stdout, stderr = _run(['--chunk-size', '1'], 'red\n#abc\n\n10, 20, 30\n')
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout.splitlines()[1:],
+                         ['red,Red,#FF0000,"255, 0, 0","0, 100%, 50%"',
+                          '#abc,,#AABBCC,"170, 187, 204","210, 25%, 73%"',
+                          '"10, 20, 30",,#0A141E,"10, 20, 30","210, 50%, 8%"'])
+        self.assertIn('3 colors converted, 0 invalid.', stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Differential test of the 'exact' and 'colour' conversion engines (see
+benchmarks/compare_engines.py, which also compares the whole 24-bit hex space): every difference
+between them must be one of the intentional kinds documented there.
+
+The hex inputs compared are a deterministic sample: every color with a short hex form (#000 to
+#FFF, 4096 colors, including the corners and the greys of the cube) and HEX_SAMPLE colors drawn
+with a fixed seed. Every whole-number HSL color (0-360, 0-100%, 0-100%) is compared.
+
+Usage (from the repository root): python -m pytest tests
+"""
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import service  # noqa: E402
+from compare_engines import compare_hex, compare_hue  # noqa: E402
+
+# The random hex colors compared, on top of the short hex ones
+HEX_SAMPLE = 100000
+
+# The intentional kinds of differences documented in benchmarks/compare_engines.py
+INTENTIONAL = {'identical', 'rgb truncated', 'hex ties', 'hue rounded', 'percent rounded',
+               'float error'}
+
+
+def _hex_colors() -> list:
+    short = [(red, green, blue) for red in range(0, 256, 17) for green in range(0, 256, 17)
+             for blue in range(0, 256, 17)]
+    rng = random.Random(0)
+    return short + [(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+                    for _ in range(HEX_SAMPLE)]
+
+
+class TestEngines(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Without the table, the exact engine computes every conversion
+        service.load_conversion_table(None)
+        cls.executor = ProcessPoolExecutor()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        service.load_conversion_table()
+
+    def _assert_intentional(self, results, compared: int) -> None:
+        counts, examples = Counter(), {}
+        for part_counts, part_examples in results:
+            counts.update(part_counts)
+            for kind, kind_examples in part_examples.items():
+                examples.setdefault(kind, []).extend(kind_examples)
+        unexpected = {kind: examples[kind] for kind in counts if kind not in INTENTIONAL}
+        self.assertEqual(unexpected, {})
+        # Every color is either identical or differs in at least one way
+        self.assertGreaterEqual(sum(counts.values()), compared)
+        self.assertGreater(counts['identical'], 0)
+
+    def test_hex_sample(self):
+        colors = _hex_colors()
+        chunks = [colors[start:start + 5000] for start in range(0, len(colors), 5000)]
+        self._assert_intentional(self.executor.map(compare_hex, chunks), len(colors))
+
+    def test_every_whole_number_hsl_color(self):
+        self._assert_intentional(self.executor.map(compare_hue, range(361)), 361 * 101 * 101)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Tests of the keystroke-to-display latency of the GUI: a burst of edits of the input textbox goes
+through the trace_add('write', ...) -> after(debounce_ms, convert_input) path, and must trigger
+exactly one conversion, shown within LATENCY_BUDGET_MS of the last edit. Skipped without a
+display (or Xvfb).
+
+Usage (from the repository root): python -m pytest tests
+"""
+import os
+import sys
+import time
+import tkinter as tk
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from globals import INPUT_DEBOUNCE_MS  # noqa: E402
+from gui import GUI  # noqa: E402
+from service import convert  # noqa: E402
+
+# The longest time from the last keystroke until its conversion is shown, in milliseconds
+LATENCY_BUDGET_MS = INPUT_DEBOUNCE_MS + 50
+
+
+class TestGuiLatency(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError:
+            self.skipTest('No display')
+        self.gui = GUI(self.root, lambda string: string)
+        self.conversions = 0
+        convert_input = self.gui.convert_input
+
+        def counting_convert_input():
+            self.conversions += 1
+            convert_input()
+
+        # Scheduled by the trace of the input through the attribute, so the calls are counted
+        self.gui.convert_input = counting_convert_input
+        self.root.update()
+
+    def tearDown(self):
+        self.gui.workers.shutdown()
+        self.root.destroy()
+
+    def _wait_for(self, condition, timeout: float = 2.0) -> bool:
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                return False
+            self.root.update()
+        return True
+
+    def _type(self, text: str) -> float:
+        """
+        Replaces the input with the text, one key at a time
+        :return: The time of the last keystroke
+        """
+        self.gui.input_textbox.delete(0, 'end')
+        for key in text:
+            self.gui.input_textbox.insert('end', key)
+        return time.perf_counter()
+
+    def test_burst_converts_once_within_budget(self):
+        for sample in ('Light Goldenrod Yellow', '#8FBC8F', '143, 188, 143', 'hsl(200 40% 30%)'):
+            self.conversions = 0
+            expected = convert(sample).hex
+            last_keystroke = self._type(sample)
+            self.assertTrue(self._wait_for(lambda: self.gui.hex_value.get() == expected), sample)
+            latency = (time.perf_counter() - last_keystroke) * 1000
+            self.assertLessEqual(latency, LATENCY_BUDGET_MS, sample)
+            # Nothing else is left scheduled
+            self._wait_for(lambda: False, timeout=2 * INPUT_DEBOUNCE_MS / 1000)
+            self.assertEqual(self.conversions, 1, sample)
+
+    def test_no_conversion_while_typing(self):
+        self._type('#8FBC8')
+        self.root.update()
+        self.assertEqual(self.conversions, 0)
+        self._wait_for(lambda: self.conversions > 0)
+        self.assertEqual(self.conversions, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Tests of the startup budgets of benchmarks/bench_startup.py: 'import service' in fresh
+interpreters stays within IMPORT_BUDGET_MS and loads none of the lazily loaded modules, and the
+first frame of the application is painted within FIRST_FRAME_BUDGET_MS (skipped without a
+display).
+
+Usage (from the repository root): python -m pytest tests
+"""
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from bench_startup import FIRST_FRAME_BUDGET_MS, FIRST_FRAME_SNIPPET, IMPORT_BUDGET_MS, \
+    IMPORT_SNIPPET, LAZY_MODULES, SRC, measure  # noqa: E402
+
+# Fresh interpreters per measurement
+RUNS = 5
+
+LOADED_SNIPPET = f'''
+import json
+import sys
+import service
+print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))
+'''
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_import_budget(self):
+        median = measure(IMPORT_SNIPPET, RUNS)
+        self.assertLessEqual(median, IMPORT_BUDGET_MS)
+
+    def test_lazy_modules_are_not_imported(self):
+        output = subprocess.run([sys.executable, '-c', LOADED_SNIPPET], cwd=SRC, check=True,
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+        self.assertEqual(json.loads(output), [])
+
+    def test_first_frame_budget(self):
+        median = measure(FIRST_FRAME_SNIPPET, RUNS)
+        if median != median:
+            self.skipTest('No display')
+        self.assertLessEqual(median, FIRST_FRAME_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
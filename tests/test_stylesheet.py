@@ -0,0 +1,106 @@
+"""
+
+ColorConverter
+@author: Lung Alin-Sebastian
+
+Tests of the color literals found and rewritten by stylesheet.py
+
+Usage (from the repository root): python -m pytest tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from service import convert  # noqa: E402
+from stylesheet import CSS_COLOR_NAMES, StylesheetRewriter, format_color, syntax_of  # noqa: E402
+
+
+def _rewrite(text: str, color_format: str = 'hex', syntax: str = 'css') -> str:
+    pieces = []
+    StylesheetRewriter(color_format).rewrite(text.encode('utf-8'), pieces.append, syntax)
+    return b''.join(pieces).decode('utf-8')
+
+
+class TestStylesheet(unittest.TestCase):
+
+    def test_values_are_rewritten(self):
+        self.assertEqual(_rewrite('a { color: red; border: 1px solid rgb(0, 0, 255) }'),
+                         'a { color: #FF0000; border: 1px solid #0000FF }')
+        self.assertEqual(_rewrite('$primary: gold;'), '$primary: #FFD700;')
+
+    def test_url_bodies_are_kept(self):
+        self.assertEqual(_rewrite('a { background: url(images/red.png) red; }'),
+                         'a { background: url(images/red.png) #FF0000; }')
+        self.assertEqual(_rewrite('a { fill: url(#abc); background: url("data:a;red}") }'),
+                         'a { fill: url(#abc); background: url("data:a;red}") }')
+
+    def test_comments_are_kept(self):
+        self.assertEqual(_rewrite('/* the white theme */ a { color: white }'),
+                         '/* the white theme */ a { color: #FFFFFF }')
+        self.assertEqual(_rewrite('a { color: tan; } // the tan theme'),
+                         'a { color: #D2B48C; } // the tan theme')
+        self.assertEqual(_rewrite('a { color: /* not red */ blue }'),
+                         'a { color: /* not red */ #0000FF }')
+
+    def test_strings_are_kept(self):
+        self.assertEqual(_rewrite('a { font-family: "Gold Sans", serif; color: gold }'),
+                         'a { font-family: "Gold Sans", serif; color: #FFD700 }')
+        self.assertEqual(_rewrite("a { content: 'red;}'; color: red }"),
+                         "a { content: 'red;}'; color: #FF0000 }")
+
+    def test_names_outside_of_values_are_kept(self):
+        self.assertEqual(_rewrite('.red-button:hover, tan:focus { color: red }'),
+                         '.red-button:hover, tan:focus { color: #FF0000 }')
+        self.assertEqual(_rewrite('$map: (red: #F00);'), '$map: (red: #FF0000);')
+        self.assertEqual(_rewrite('#add { color: #add }'), '#add { color: #AADDDD }')
+
+    def test_json_only_whole_string_values(self):
+        self.assertEqual(_rewrite('{"description": "The red button", "red": {"value": "red"}}',
+                                  syntax='json'),
+                         '{"description": "The red button", "red": {"value": "#FF0000"}}')
+        self.assertEqual(_rewrite('["#f00", "rgb(0, 0, 255)", "a #fff"]', syntax='json'),
+                         '["#FF0000", "#0000FF", "a #fff"]')
+        self.assertEqual(syntax_of('tokens.JSON'), 'json')
+        self.assertEqual(syntax_of('theme.scss'), 'css')
+
+    def test_css_names(self):
+        self.assertEqual(_rewrite('a { color: aqua; fill: fuchsia; stroke: grey; '
+                                  'outline-color: darkgrey; --f: rebeccapurple }'),
+                         'a { color: #00FFFF; fill: #FF00FF; stroke: #808080; '
+                         'outline-color: #A9A9A9; --f: #663399 }')
+        # X11 names that are not CSS names
+        self.assertEqual(_rewrite('a { color: lightslateblue; fill: violetred }'),
+                         'a { color: lightslateblue; fill: violetred }')
+
+    def test_names_only_in_color_properties(self):
+        self.assertEqual(_rewrite('.a { grid-area: red; animation-name: tan; color: red; }'),
+                         '.a { grid-area: red; animation-name: tan; color: #FF0000; }')
+        self.assertEqual(_rewrite('a { border: 1px solid red; border-left-color: tan; '
+                                  'background: url(a.png) gold; -webkit-text-fill-color: navy; '
+                                  'box-shadow: 0 0 1px black; @accent: teal; $b: plum }'),
+                         'a { border: 1px solid #FF0000; border-left-color: #D2B48C; '
+                         'background: url(a.png) #FFD700; -webkit-text-fill-color: #000080; '
+                         'box-shadow: 0 0 1px #000000; @accent: #008080; $b: #DDA0DD }')
+        # Hex and functions are colors in any property
+        self.assertEqual(_rewrite('a { grid-area: red; b: #f00; c: rgb(0, 0, 255) }'),
+                         'a { grid-area: red; b: #FF0000; c: #0000FF }')
+        rewriter = StylesheetRewriter()
+        rewriter.rewrite(b'.a { grid-area: red; animation-name: tan; color: red; }')
+        self.assertEqual(rewriter.report().rewritten, 1)
+
+    def test_name_format_writes_css_names(self):
+        self.assertEqual(_rewrite('a { b: #00FFFF; c: #8470FF; d: #D02090 }', 'name'),
+                         'a { b: aqua; c: #8470FF; d: #D02090 }')
+        for name, packed in CSS_COLOR_NAMES.items():
+            written = format_color(convert(f'#{packed:06X}'), 'name')
+            self.assertEqual(CSS_COLOR_NAMES[written], packed, name)
+
+    def test_alpha_is_kept(self):
+        self.assertEqual(_rewrite('a { color: #FF000080; b: rgba(0, 0, 0, 0.5) }'),
+                         'a { color: #FF000080; b: rgba(0, 0, 0, 0.5) }')
+
+
+if __name__ == '__main__':
+    unittest.main()